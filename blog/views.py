@@ -16,20 +16,22 @@ class PostList(generic.ListView):
 from django.shortcuts import render
 from django.core.paginator import Paginator
 from .models import Post, CategoryPost
+from search.index import search_queryset
+from user_management.pagination import paginate_by_cursor
 
 def blog_list(request):
     query = request.GET.get("q")  # Manejo de búsqueda
     category = request.GET.get("category")  # Filtro de categorías
     blogs = Post.objects.filter(status=1).order_by("-created_on")
 
-    if query:
-        blogs = blogs.filter(title__icontains=query)  # Filtrar por título
     if category:
         blogs = blogs.filter(category_post__id=category)  # Filtrar por categoría
+    if query:
+        blogs = search_queryset('post', blogs, query)  # Título y contenido, por relevancia (search/)
 
-    paginator = Paginator(blogs, 3)  # 3 posts por página
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    # Paginación por cursor sobre (created_on, id), o por relevancia si hay búsqueda
+    ordering = ("search_rank", "id") if query else ("-created_on", "-id")
+    page_obj = paginate_by_cursor(request, blogs, 3, ordering)  # 3 posts por página
 
     categories = CategoryPost.objects.all()  # Obtener categorías
 
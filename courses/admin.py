@@ -17,4 +17,9 @@ admin.site.register(Resource)
 admin.site.register(LessonCompletion)
 admin.site.register(WishListType)
 admin.site.register(WishListUser)
+admin.site.register(CourseStats)
+admin.site.register(CourseSimilarity)
+admin.site.register(CourseRecommendation)
+admin.site.register(CourseInteraction)
+admin.site.register(RecommendationState)
 
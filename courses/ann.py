@@ -0,0 +1,257 @@
+import json
+import os
+import shutil
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import hnswlib  # opcional: pip install hnswlib
+except ImportError:
+    hnswlib = None
+
+# * |--------------------------------------------------------------------------
+# * | Índices de vecinos aproximados (ANN) para el recomendador
+# * |--------------------------------------------------------------------------
+#
+# Los índices se construyen en rebuild_recommendations, se guardan como ficheros .npy
+# en COURSE_ANN_INDEX_DIR y cada proceso los abre una sola vez con np.load(mmap_mode='r').
+# Todos los backends trabajan con similitud coseno sobre vectores normalizados.
+
+DEFAULT_BACKEND = 'ivf'
+
+_loaded_indexes = {}
+
+
+def get_index_dir():
+    return str(getattr(settings, 'COURSE_ANN_INDEX_DIR', os.path.join(settings.BASE_DIR, 'courses', 'ann_index')))
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def top_k(ids, scores, k):
+    if len(scores) > k:
+        best = np.argpartition(-scores, k)[:k]
+        ids, scores = ids[best], scores[best]
+    order = np.argsort(-scores, kind='stable')
+    return ids[order], scores[order]
+
+
+class ExactIndex:
+    # Búsqueda exacta por fuerza bruta; sirve de referencia y para colecciones pequeñas
+    backend = 'exact'
+
+    def __init__(self, ids, vectors):
+        self.ids = ids
+        self.vectors = vectors
+        self._sorted_ids = None
+
+    @classmethod
+    def build(cls, ids, vectors, **options):
+        return cls(np.asarray(ids, dtype=np.int64), normalize_rows(vectors))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vector_of(self, item_id):
+        if self._sorted_ids is None:
+            self._order = np.argsort(self.ids)
+            self._sorted_ids = self.ids[self._order]
+        position = np.searchsorted(self._sorted_ids, item_id)
+        if position < len(self._sorted_ids) and self._sorted_ids[position] == item_id:
+            return np.asarray(self.vectors[self._order[position]])
+        return None
+
+    def query(self, vector, k=10):
+        query = normalize_rows(vector)[0]
+        return top_k(np.asarray(self.ids), np.asarray(self.vectors @ query), k)
+
+    def arrays(self):
+        return {'ids': self.ids, 'vectors': self.vectors}
+
+    def meta(self):
+        return {}
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        return cls(arrays['ids'], arrays['vectors'])
+
+
+class IVFIndex(ExactIndex):
+    # Índice de ficheros invertidos: k-means sobre los vectores y, al consultar, solo se
+    # recorren las `nprobe` listas con el centroide más parecido. Los vectores se guardan
+    # ordenados por lista para que cada una sea un trozo contiguo del fichero mapeado.
+    backend = 'ivf'
+
+    def __init__(self, ids, vectors, centroids, offsets, nprobe=8):
+        super().__init__(ids, vectors)
+        self.centroids = centroids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, ids, vectors, n_lists=None, nprobe=8, iterations=10, sample_size=20000, seed=0, **options):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = normalize_rows(vectors)
+        n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, max(len(vectors), 1))
+
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)] if len(vectors) else vectors
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy() if len(sample) else np.zeros((0, vectors.shape[1]), np.float32)
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for position in range(n_lists):
+                members = sample[assignment == position]
+                if len(members):
+                    centroids[position] = members.mean(axis=0)
+            centroids = normalize_rows(centroids)
+
+        assignment = np.concatenate([
+            np.argmax(vectors[start:start + 10000] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), 10000)
+        ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        return cls(ids[order], vectors[order], centroids.astype(np.float32), offsets.astype(np.int64), nprobe)
+
+    def query(self, vector, k=10, nprobe=None):
+        query = normalize_rows(vector)[0]
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe] if nprobe else []
+        slices = [slice(self.offsets[position], self.offsets[position + 1]) for position in lists]
+        candidates = np.concatenate([np.asarray(self.ids[part]) for part in slices]) if slices else np.zeros(0, np.int64)
+        scores = np.concatenate([np.asarray(self.vectors[part] @ query) for part in slices]) if slices else np.zeros(0, np.float32)
+        return top_k(candidates, scores, k)
+
+    def arrays(self):
+        return {**super().arrays(), 'centroids': self.centroids, 'offsets': self.offsets}
+
+    def meta(self):
+        return {'nprobe': self.nprobe}
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        return cls(arrays['ids'], arrays['vectors'], arrays['centroids'], arrays['offsets'], meta.get('nprobe', 8))
+
+
+class HnswIndex(ExactIndex):
+    # Grafo HNSW de hnswlib (solo si la librería está instalada); los vectores se guardan igualmente en .npy
+    backend = 'hnsw'
+
+    def __init__(self, ids, vectors, graph, ef=64):
+        super().__init__(ids, vectors)
+        self.graph = graph
+        self.ef = ef
+        self.graph.set_ef(ef)
+
+    @classmethod
+    def build(cls, ids, vectors, ef=64, M=16, **options):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = normalize_rows(vectors)
+        graph = hnswlib.Index(space='cosine', dim=vectors.shape[1])
+        graph.init_index(max_elements=max(len(vectors), 1), ef_construction=max(ef, 100), M=M)
+        if len(vectors):
+            graph.add_items(vectors, ids)
+        return cls(ids, vectors, graph, ef)
+
+    def query(self, vector, k=10):
+        k = min(k, len(self.ids))
+        if not k:
+            return np.zeros(0, np.int64), np.zeros(0, np.float32)
+        labels, distances = self.graph.knn_query(normalize_rows(vector), k=k)
+        return labels[0].astype(np.int64), 1 - distances[0]
+
+    def meta(self):
+        return {'ef': self.ef}
+
+    def save_graph(self, directory):
+        self.graph.save_index(os.path.join(directory, 'graph.bin'))
+
+    @classmethod
+    def from_arrays(cls, arrays, meta, directory=None):
+        graph = hnswlib.Index(space='cosine', dim=arrays['vectors'].shape[1])
+        graph.load_index(os.path.join(directory, 'graph.bin'), max_elements=max(len(arrays['ids']), 1))
+        return cls(arrays['ids'], arrays['vectors'], graph, meta.get('ef', 64))
+
+
+BACKENDS = {
+    ExactIndex.backend: ExactIndex,
+    IVFIndex.backend: IVFIndex,
+}
+if hnswlib is not None:
+    BACKENDS[HnswIndex.backend] = HnswIndex
+
+
+def get_backend(name=None):
+    name = name or getattr(settings, 'COURSE_ANN_BACKEND', DEFAULT_BACKEND)
+    return BACKENDS.get(name, BACKENDS[DEFAULT_BACKEND])
+
+
+def build_index(ids, vectors, backend=None, **options):
+    return get_backend(backend).build(ids, vectors, **options)
+
+
+def save_index(name, index, **extra_arrays):
+    # Escribe en un directorio temporal y lo intercambia para que los lectores nunca vean un índice a medias
+    directory = os.path.join(get_index_dir(), name)
+    temporary = directory + '.tmp'
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+
+    for array_name, array in {**index.arrays(), **extra_arrays}.items():
+        np.save(os.path.join(temporary, f'{array_name}.npy'), np.asarray(array))
+    if isinstance(index, HnswIndex):
+        index.save_graph(temporary)
+    with open(os.path.join(temporary, 'meta.json'), 'w') as handle:
+        json.dump({'backend': index.backend, 'extra': sorted(extra_arrays), **index.meta()}, handle)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temporary, directory)
+    _loaded_indexes.pop(name, None)
+
+
+def load_index(name):
+    # Devuelve (índice, arrays extra) mapeados en memoria, o (None, {}) si no se ha construido todavía.
+    # Se vuelve a abrir solo si meta.json ha cambiado (otro proceso ha reconstruido el índice).
+    directory = os.path.join(get_index_dir(), name)
+    meta_path = os.path.join(directory, 'meta.json')
+    try:
+        modified = os.stat(meta_path).st_mtime_ns
+    except FileNotFoundError:
+        return None, {}
+
+    cached = _loaded_indexes.get(name)
+    if cached and cached[0] == modified:
+        return cached[1], cached[2]
+
+    with open(meta_path) as handle:
+        meta = json.load(handle)
+    backend = BACKENDS.get(meta['backend'])
+    if backend is None:
+        return None, {}
+
+    arrays = {
+        file_name[:-4]: np.load(os.path.join(directory, file_name), mmap_mode='r')
+        for file_name in os.listdir(directory) if file_name.endswith('.npy')
+    }
+    if backend is HnswIndex:
+        index = backend.from_arrays(arrays, meta, directory)
+    else:
+        index = backend.from_arrays(arrays, meta)
+
+    extra = {array_name: arrays[array_name] for array_name in meta.get('extra', [])}
+    _loaded_indexes[name] = (modified, index, extra)
+    return index, extra
+
+
+def warm_indexes(*names):
+    for name in names:
+        load_index(name)
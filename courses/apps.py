@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoursesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "courses"
+
+    def ready(self):
+        import courses.signals  # noqa
+        from courses.ann import warm_indexes
+        from courses.recommendations import COURSE_INDEX, USER_INDEX
+
+        # Abre (mmap) los índices ANN una sola vez por proceso
+        warm_indexes(USER_INDEX, COURSE_INDEX)
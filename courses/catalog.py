@@ -0,0 +1,68 @@
+from django.db.models import Case, ExpressionWrapper, F, FloatField, IntegerField, Value, When
+from django.db.models.functions import Coalesce, Round
+
+from courses.models import Course
+from search.index import search_queryset
+from user_management.pagination import CursorPaginator
+
+# * |--------------------------------------------------------------------------
+# * | Catálogo de cursos
+# * |--------------------------------------------------------------------------
+#
+# Queryset del listado de cursos: la búsqueda va al índice de texto completo, los
+# contadores y la media de valoraciones se resuelven en SQL (a partir de CourseStats)
+# y la paginación es por cursor, así que solo se cargan los cursos de la página actual.
+
+CATALOG_PAGE_SIZE = 9
+
+
+def search_courses(queryset, query):
+    # Índice de texto completo (search/): título, descripción y hardskills, ordenado por relevancia
+    return search_queryset('course', queryset, query)
+
+
+def annotate_course_stats(queryset):
+    # Contadores y media desde la tabla CourseStats (LEFT JOIN 1 a 1, no multiplica filas)
+    return queryset.annotate(
+        completed_users_count=Coalesce(F('stats__completed_users_count'), Value(0), output_field=IntegerField()),
+        course_wishlist_count=Coalesce(F('stats__wishlist_count'), Value(0), output_field=IntegerField()),
+        course_reviews_count=Coalesce(F('stats__reviews_count'), Value(0), output_field=IntegerField()),
+        average_rating=Case(
+            When(
+                stats__reviews_count__gt=0,
+                then=ExpressionWrapper(
+                    Round(F('stats__rating_sum') * 10.0 / F('stats__reviews_count')) / 10.0,
+                    output_field=FloatField(),
+                ),
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def catalog_queryset(query=''):
+    courses = Course.objects.filter(is_active=True)
+    courses = search_courses(courses, query)
+    return annotate_course_stats(courses).select_related('profile_teacher__user')
+
+
+def catalog_ordering(query=''):
+    # Clave de la paginación por cursor: relevancia si hay búsqueda, id si no
+    return ('search_rank', 'id') if query else ('id',)
+
+
+def catalog_page(queryset, params, ordering=('id',), per_page=CATALOG_PAGE_SIZE):
+    # Paginación por cursor: un SELECT con LIMIT sobre la clave, sin COUNT ni OFFSET
+    page_obj = CursorPaginator(queryset, per_page, ordering).page(params)
+    page_obj.object_list = [
+        {
+            'course': course,
+            'completed_users_count': course.completed_users_count,
+            'course_wishlist_count': course.course_wishlist_count,
+            'course_reviews_count': course.course_reviews_count,
+            'average_rating': course.average_rating,
+        }
+        for course in page_obj.object_list
+    ]
+    return page_obj
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import pickle
+import numpy as np
+import nltk
+from nltk.stem import WordNetLemmatizer
+from tensorflow.keras.models import load_model
+
+# Exporta chatbot_model.keras a un grafo de inferencia solo NumPy (chatbot_numpy.npz + chatbot_numpy.json)
+# y comprueba que las predicciones coinciden con las del modelo Keras en todos los patterns de intents.json.
+# Ejecutar después de salaentreno.py, desde esta misma carpeta: python export_numpy.py
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from courses.chatbot_numpy import SPEC_FILE, WEIGHTS_FILE, NumpyChatbotModel, pad_sequences  # noqa: E402
+
+model = load_model('chatbot_model.keras')
+with open('tokenizer.pickle', 'rb') as handle:
+    tokenizer = pickle.load(handle)
+with open('label_encoder.pickle', 'rb') as handle:
+    label_encoder = pickle.load(handle)
+with open('intents.json') as file:
+    intents = json.load(file)
+
+# Capas y pesos
+layers = []
+weights = {}
+for position, layer in enumerate(model.layers):
+    config = layer.get_config()
+    layer_type = type(layer).__name__
+    layer_weights = layer.get_weights()
+
+    if layer_type == 'LSTM':
+        layers.append({
+            'type': 'LSTM',
+            'units': config['units'],
+            'activation': config['activation'],
+            'recurrent_activation': config['recurrent_activation'],
+            'return_sequences': config['return_sequences'],
+        })
+        weights[f'{position}_kernel'] = layer_weights[0]
+        weights[f'{position}_recurrent_kernel'] = layer_weights[1]
+        weights[f'{position}_bias'] = layer_weights[2] if len(layer_weights) > 2 else np.zeros(layer_weights[0].shape[1])
+    elif layer_type == 'Dense':
+        layers.append({'type': 'Dense', 'activation': config['activation']})
+        weights[f'{position}_kernel'] = layer_weights[0]
+        weights[f'{position}_bias'] = layer_weights[1] if len(layer_weights) > 1 else np.zeros(layer_weights[0].shape[1])
+    elif layer_type == 'Dropout':
+        layers.append({'type': 'Dropout'})
+    else:
+        raise SystemExit(f"Capa no soportada por la exportación NumPy: {layer_type}")
+
+spec = {
+    'layers': layers,
+    'max_len': model.input_shape[1],
+    'classes': [str(label) for label in label_encoder.classes_],
+    'tokenizer': {
+        'word_index': tokenizer.word_index,
+        'num_words': tokenizer.num_words,
+        'oov_token': tokenizer.oov_token,
+        'filters': tokenizer.filters,
+        'lower': tokenizer.lower,
+        'split': tokenizer.split,
+    },
+}
+
+np.savez(WEIGHTS_FILE, **weights)
+with open(SPEC_FILE, 'w') as handle:
+    json.dump(spec, handle, ensure_ascii=False)
+
+# Paridad con el modelo Keras sobre los patterns de entrenamiento
+lemmatizer = WordNetLemmatizer()
+sentences = []
+labels = []
+for intent in intents['intents']:
+    for pattern in intent['patterns']:
+        word_list = nltk.word_tokenize(pattern.lower())
+        sentences.append(' '.join([lemmatizer.lemmatize(word) for word in word_list]))
+        labels.append(intent['tag'])
+
+numpy_model = NumpyChatbotModel.load('.')
+padded = pad_sequences(tokenizer.texts_to_sequences(sentences), maxlen=spec['max_len'])
+keras_probabilities = model.predict(np.expand_dims(padded, -1), verbose=0)
+numpy_probabilities = numpy_model.predict(pad_sequences(numpy_model.texts_to_sequences(sentences), maxlen=spec['max_len']))
+
+keras_tags = label_encoder.inverse_transform(np.argmax(keras_probabilities, axis=1))
+numpy_tags = [spec['classes'][index] for index in np.argmax(numpy_probabilities, axis=1)]
+
+agreement = np.mean([keras_tag == numpy_tag for keras_tag, numpy_tag in zip(keras_tags, numpy_tags)])
+keras_accuracy = np.mean([tag == label for tag, label in zip(keras_tags, labels)])
+numpy_accuracy = np.mean([tag == label for tag, label in zip(numpy_tags, labels)])
+max_difference = np.abs(keras_probabilities - numpy_probabilities).max()
+
+print(f"Patterns: {len(sentences)}")
+print(f"Keras accuracy: {keras_accuracy:.4f} | NumPy accuracy: {numpy_accuracy:.4f}")
+print(f"Agreement: {agreement:.4f} | Max probability difference: {max_difference:.2e}")
+
+if agreement < 1.0:
+    raise SystemExit("La exportación NumPy no reproduce las predicciones del modelo Keras.")
+
+print("Exportación completada: " + WEIGHTS_FILE + ", " + SPEC_FILE)
@@ -0,0 +1,145 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# * |--------------------------------------------------------------------------
+# * | Micro-batching del chatbot
+# * |--------------------------------------------------------------------------
+#
+# Los mensajes que llegan a la vez se acumulan durante unos milisegundos y se
+# procesan en una única llamada a model.predict; cada petición espera su Future
+# como mucho timeout segundos (concurrent.futures.TimeoutError). Si el hilo del
+# batcher termina por un error inesperado, los mensajes pendientes fallan en lugar
+# de esperar para siempre y el siguiente mensaje arranca un hilo nuevo.
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5
+DEFAULT_TIMEOUT_SECONDS = 10
+
+
+class BatcherStopped(RuntimeError):
+    pass
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        predict_batch,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms=DEFAULT_MAX_WAIT_MS,
+        timeout=DEFAULT_TIMEOUT_SECONDS,
+    ):
+        # predict_batch recibe una lista de entradas y devuelve una lista de resultados en el mismo orden
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+            'last_batch_size': 0,
+            'timeouts': 0,
+            'worker_restarts': 0,
+        }
+
+    def start(self):
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='chatbot-batcher', daemon=True)
+                self._worker.start()
+
+    def submit(self, item):
+        self.start()
+        future = Future()
+        self.queue.put((item, future))
+        depth = self.queue.qsize()
+        with self._stats_lock:
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], depth)
+        return future
+
+    def predict(self, item, timeout=None):
+        future = self.submit(item)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            # Si aún no ha entrado en un lote, el batcher lo descarta (set_running_or_notify_cancel)
+            future.cancel()
+            with self._stats_lock:
+                self._stats['timeouts'] += 1
+            raise
+
+    def _collect(self):
+        # Espera al primer mensaje y luego junta los que lleguen durante max_wait (hasta max_batch_size)
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        batch = []
+        try:
+            while True:
+                # Los mensajes cuya espera ya se ha cancelado por timeout no se procesan
+                batch = [(item, future) for item, future in self._collect() if future.set_running_or_notify_cancel()]
+                if not batch:
+                    continue
+                items = [item for item, _ in batch]
+                try:
+                    results = self.predict_batch(items)
+                except Exception as error:
+                    for _, future in batch:
+                        future.set_exception(error)
+                    continue
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+                with self._stats_lock:
+                    self._stats['requests'] += len(batch)
+                    self._stats['batches'] += 1
+                    self._stats['last_batch_size'] = len(batch)
+        except BaseException as error:
+            logger.exception("Chatbot batcher stopped")
+            self._fail_pending(batch, error)
+
+    def _fail_pending(self, batch, error):
+        # El lote en curso y lo que quede en la cola fallan ya; submit() arrancará otro hilo
+        stopped = BatcherStopped(f"Chatbot batcher stopped: {error!r}")
+        with self._stats_lock:
+            self._stats['worker_restarts'] += 1
+        pending = [future for _, future in batch]
+        while True:
+            try:
+                pending.append(self.queue.get_nowait()[1])
+            except queue.Empty:
+                break
+        for future in pending:
+            if future.done():
+                continue
+            if future.running() or future.set_running_or_notify_cancel():
+                future.set_exception(stopped)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        batches = stats['batches'] or 1
+        stats['queue_depth'] = self.queue.qsize()
+        stats['max_batch_size'] = self.max_batch_size
+        stats['max_wait_ms'] = self.max_wait * 1000
+        stats['avg_batch_size'] = round(stats['requests'] / batches, 2)
+        stats['avg_batch_fill'] = round(stats['requests'] / batches / self.max_batch_size, 3)
+        return stats
@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import OrderedDict
+
+# * |--------------------------------------------------------------------------
+# * | Caché de respuestas del chatbot
+# * |--------------------------------------------------------------------------
+#
+# LRU acotada con caducidad (TTL). La clave es el mensaje ya preprocesado
+# (minúsculas + lematizado) y el valor el tag del intent predicho, así que las
+# preguntas repetidas no pasan por el tokenizer ni por el modelo.
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL_SECONDS = 3600
+
+
+class TTLCache:
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evicted'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['max_size'] = self.max_size
+        stats['ttl_seconds'] = self.ttl
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,147 @@
+import json
+import os
+
+import numpy as np
+
+# * |--------------------------------------------------------------------------
+# * | Inferencia del chatbot solo con NumPy
+# * |--------------------------------------------------------------------------
+#
+# Reproduce el modelo Keras exportado por courses/chatbot/export_numpy.py (LSTM + Dense)
+# sin importar TensorFlow. El tokenizer y las clases del label encoder se guardan en JSON
+# para no tener que deserializar objetos de Keras/sklearn con pickle.
+
+WEIGHTS_FILE = 'chatbot_numpy.npz'
+SPEC_FILE = 'chatbot_numpy.json'
+
+KERAS_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0, 1)
+
+
+def softmax(x):
+    exp = np.exp(x - x.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': sigmoid,
+    'hard_sigmoid': hard_sigmoid,
+    'softmax': softmax,
+}
+
+
+def pad_sequences(sequences, maxlen, padding='post', truncating='pre', value=0):
+    # Misma semántica que keras.preprocessing.sequence.pad_sequences
+    padded = np.full((len(sequences), maxlen), value, dtype=np.int32)
+    for row, sequence in enumerate(sequences):
+        sequence = sequence[-maxlen:] if truncating == 'pre' else sequence[:maxlen]
+        if not len(sequence):
+            continue
+        if padding == 'post':
+            padded[row, :len(sequence)] = sequence
+        else:
+            padded[row, -len(sequence):] = sequence
+    return padded
+
+
+class JsonTokenizer:
+    # Equivalente de Tokenizer.texts_to_sequences de Keras a partir de su word_index
+    def __init__(self, word_index, num_words=None, oov_token=None, filters=KERAS_FILTERS, lower=True, split=' '):
+        self.word_index = word_index
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self._translate = str.maketrans({character: split for character in filters})
+
+    def words(self, text):
+        if self.lower:
+            text = text.lower()
+        return [word for word in text.translate(self._translate).split(self.split) if word]
+
+    def texts_to_sequences(self, texts):
+        oov_index = self.word_index.get(self.oov_token) if self.oov_token is not None else None
+        sequences = []
+        for text in texts:
+            sequence = []
+            for word in self.words(text):
+                index = self.word_index.get(word)
+                if index is not None and not (self.num_words and index >= self.num_words):
+                    sequence.append(index)
+                elif oov_index is not None:
+                    sequence.append(oov_index)
+            sequences.append(sequence)
+        return sequences
+
+
+class NumpyChatbotModel:
+    def __init__(self, layers, weights, tokenizer, classes, max_len):
+        self.layers = layers
+        self.weights = weights
+        self.tokenizer = tokenizer
+        self.classes = classes
+        self.max_len = max_len
+
+    @classmethod
+    def load(cls, chatbot_dir):
+        with open(os.path.join(chatbot_dir, SPEC_FILE)) as handle:
+            spec = json.load(handle)
+        with np.load(os.path.join(chatbot_dir, WEIGHTS_FILE)) as archive:
+            weights = {name: archive[name].astype(np.float32) for name in archive.files}
+        return cls(spec['layers'], weights, JsonTokenizer(**spec['tokenizer']), spec['classes'], spec['max_len'])
+
+    @classmethod
+    def exists(cls, chatbot_dir):
+        return all(os.path.exists(os.path.join(chatbot_dir, name)) for name in (WEIGHTS_FILE, SPEC_FILE))
+
+    def texts_to_sequences(self, texts):
+        return self.tokenizer.texts_to_sequences(texts)
+
+    def lstm(self, x, position, layer):
+        kernel = self.weights[f'{position}_kernel']
+        recurrent_kernel = self.weights[f'{position}_recurrent_kernel']
+        bias = self.weights[f'{position}_bias']
+        activation = ACTIVATIONS[layer['activation']]
+        recurrent_activation = ACTIVATIONS[layer['recurrent_activation']]
+        units = layer['units']
+
+        hidden = np.zeros((x.shape[0], units), dtype=np.float32)
+        cell = np.zeros((x.shape[0], units), dtype=np.float32)
+        outputs = []
+        for step in range(x.shape[1]):
+            # Orden de las puertas en Keras: input, forget, cell, output
+            gates = x[:, step, :] @ kernel + hidden @ recurrent_kernel + bias
+            input_gate = recurrent_activation(gates[:, :units])
+            forget_gate = recurrent_activation(gates[:, units:2 * units])
+            candidate = activation(gates[:, 2 * units:3 * units])
+            output_gate = recurrent_activation(gates[:, 3 * units:])
+            cell = forget_gate * cell + input_gate * candidate
+            hidden = output_gate * activation(cell)
+            outputs.append(hidden)
+        return np.stack(outputs, axis=1) if layer['return_sequences'] else hidden
+
+    def dense(self, x, position, layer):
+        return ACTIVATIONS[layer['activation']](x @ self.weights[f'{position}_kernel'] + self.weights[f'{position}_bias'])
+
+    def predict(self, padded):
+        # Entrada (lote, max_len) de ids de tokens, igual que en el entrenamiento (expand_dims(-1))
+        x = np.asarray(padded, dtype=np.float32)[..., None]
+        for position, layer in enumerate(self.layers):
+            if layer['type'] == 'LSTM':
+                x = self.lstm(x, position, layer)
+            elif layer['type'] == 'Dense':
+                x = self.dense(x, position, layer)
+            elif layer['type'] != 'Dropout':
+                raise ValueError(f"Unsupported layer in exported chatbot model: {layer['type']}")
+        return x
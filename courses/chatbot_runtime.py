@@ -0,0 +1,231 @@
+import asyncio
+import json
+import logging
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import numpy as np
+from django.conf import settings
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+
+from courses.chatbot_batching import (
+    DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, DEFAULT_TIMEOUT_SECONDS, BatcherStopped, MicroBatcher,
+)
+from courses.chatbot_cache import DEFAULT_MAX_SIZE, DEFAULT_TTL_SECONDS, TTLCache
+from courses.chatbot_numpy import NumpyChatbotModel, pad_sequences
+
+logger = logging.getLogger(__name__)
+
+# * |--------------------------------------------------------------------------
+# * | Chatbot Runtime
+# * |--------------------------------------------------------------------------
+#
+# Carga el modelo, el tokenizer, el label encoder y los intents una sola vez por
+# proceso. Cada mensaje solo hace la tokenización; la inferencia se agrupa en lotes
+# con los mensajes concurrentes (courses/chatbot_batching.py) y los mensajes
+# repetidos se resuelven desde la caché de tags (courses/chatbot_cache.py).
+#
+# Con CHATBOT_BACKEND = 'auto' se usa el modelo exportado a NumPy si existe
+# (courses/chatbot/export_numpy.py) y TensorFlow no llega a importarse; si no, Keras.
+
+DEFAULT_RESPONSES = ["Pedro", "No entiendo"]
+UNKNOWN_RESPONSE = "Lo siento, no entiendo tu mensaje."
+
+DEFAULT_EXECUTOR_WORKERS = 4
+DEFAULT_EXECUTOR_MAX_PENDING = 64
+
+
+class ChatbotBusy(Exception):
+    pass
+
+
+def get_chatbot_dir():
+    return str(getattr(settings, 'CHATBOT_DIR', os.path.join(settings.BASE_DIR, 'courses', 'chatbot')))
+
+
+class KerasChatbotModel:
+    # Modelo original de salaentreno.py; importa TensorFlow solo al cargarse
+    def __init__(self, model, tokenizer, classes):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.classes = classes
+        self.max_len = model.input_shape[1]
+
+    @classmethod
+    def load(cls, chatbot_dir):
+        from keras.models import load_model  # type: ignore
+
+        model = load_model(os.path.join(chatbot_dir, 'chatbot_model.keras'))
+        with open(os.path.join(chatbot_dir, 'tokenizer.pickle'), 'rb') as handle:
+            tokenizer = pickle.load(handle)
+        with open(os.path.join(chatbot_dir, 'label_encoder.pickle'), 'rb') as handle:
+            label_encoder = pickle.load(handle)
+        return cls(model, tokenizer, [str(label) for label in label_encoder.classes_])
+
+    def texts_to_sequences(self, texts):
+        return self.tokenizer.texts_to_sequences(texts)
+
+    def predict(self, padded):
+        padded = np.asarray(padded)
+        if len(self.model.input_shape) == 3:
+            # Se entrenó con X_train = np.expand_dims(X_train, -1)
+            padded = padded[..., None]
+        return self.model.predict(padded, verbose=0)
+
+
+def load_chatbot_model(chatbot_dir):
+    backend = getattr(settings, 'CHATBOT_BACKEND', 'auto')
+    if backend == 'numpy' or (backend == 'auto' and NumpyChatbotModel.exists(chatbot_dir)):
+        return NumpyChatbotModel.load(chatbot_dir)
+    return KerasChatbotModel.load(chatbot_dir)
+
+
+class ChatbotRuntime:
+    def __init__(self, chatbot_dir=None):
+        self.chatbot_dir = chatbot_dir or get_chatbot_dir()
+        self.lemmatizer = WordNetLemmatizer()
+        self.model = None
+        self.responses_by_tag = {}
+        self.max_len = None
+        self.batcher = MicroBatcher(
+            self.predict_tags,
+            max_batch_size=getattr(settings, 'CHATBOT_BATCH_MAX_SIZE', DEFAULT_MAX_BATCH_SIZE),
+            max_wait_ms=getattr(settings, 'CHATBOT_BATCH_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS),
+            timeout=getattr(settings, 'CHATBOT_BATCH_TIMEOUT_SECONDS', DEFAULT_TIMEOUT_SECONDS),
+        )
+        self.cache = TTLCache(
+            max_size=getattr(settings, 'CHATBOT_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE),
+            ttl_seconds=getattr(settings, 'CHATBOT_CACHE_TTL', DEFAULT_TTL_SECONDS),
+        )
+
+    def path(self, file_name):
+        return os.path.join(self.chatbot_dir, file_name)
+
+    def load(self):
+        self.model = load_chatbot_model(self.chatbot_dir)
+        self.max_len = self.model.max_len
+        with open(self.path('intents.json')) as file:
+            intents = json.load(file)
+
+        # Índice tag -> respuestas en lugar de recorrer intents['intents'] en cada mensaje
+        self.responses_by_tag = {
+            intent['tag']: intent.get('responses') or DEFAULT_RESPONSES
+            for intent in intents['intents']
+        }
+        return self
+
+    def warm(self):
+        # Primera inferencia en vacío para que el modelo (y TensorFlow, con Keras) esté listo antes de la primera petición
+        self.predict_padded(np.zeros((1, self.max_len)))
+        self.lemmatizer.lemmatize('warm')
+        return self
+
+    def preprocess(self, message):
+        # Tokenizar, lematizar y reconstruir el texto (mismo preprocesado que salaentreno.py)
+        tokens = word_tokenize(message.lower())
+        return ' '.join(self.lemmatizer.lemmatize(token) for token in tokens)
+
+    def pad(self, processed_messages):
+        sequences = self.model.texts_to_sequences(processed_messages)
+        # El modelo se entrenó con padding='post' (salaentreno.py)
+        return pad_sequences(sequences, padding='post', maxlen=self.max_len)
+
+    def predict_padded(self, padded):
+        return self.model.predict(padded)
+
+    def tags_from_predictions(self, predictions):
+        return [self.model.classes[index] for index in np.argmax(predictions, axis=1)]
+
+    def predict_tags(self, processed_messages):
+        # Un solo pad_sequences y un solo model.predict para todo el lote
+        return self.tags_from_predictions(self.predict_padded(self.pad(processed_messages)))
+
+    def predict_tag(self, message):
+        processed = self.preprocess(message)
+        tag = self.cache.get(processed)
+        if tag is None:
+            try:
+                tag = self.batcher.predict(processed)
+            except (FutureTimeoutError, BatcherStopped):
+                # Cola del batcher saturada o hilo caído: la petición no espera más
+                raise ChatbotBusy()
+            self.cache.set(processed, tag)
+        return tag
+
+    def response_for_tag(self, tag):
+        responses = self.responses_by_tag.get(tag)
+        if not responses:
+            return UNKNOWN_RESPONSE
+        return np.random.choice(responses)
+
+    def respond(self, message):
+        return self.response_for_tag(self.predict_tag(message))
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_chatbot_runtime():
+    # Instancia única por proceso, creada la primera vez que se necesita
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = ChatbotRuntime().load()
+    return _runtime
+
+
+_executor = None
+_executor_slots = None
+_executor_lock = threading.Lock()
+
+
+def get_chatbot_executor():
+    # Pool acotado para la inferencia desde el código async (consumer websocket)
+    global _executor, _executor_slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor_slots = threading.BoundedSemaphore(
+                    getattr(settings, 'CHATBOT_EXECUTOR_MAX_PENDING', DEFAULT_EXECUTOR_MAX_PENDING)
+                )
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'CHATBOT_EXECUTOR_WORKERS', DEFAULT_EXECUTOR_WORKERS),
+                    thread_name_prefix='chatbot',
+                )
+    return _executor
+
+
+async def respond_async(message):
+    # Ejecuta respond() fuera del event loop; si ya hay demasiadas peticiones pendientes falla en lugar de encolar sin límite
+    executor = get_chatbot_executor()
+    if not _executor_slots.acquire(blocking=False):
+        raise ChatbotBusy()
+    try:
+        future = executor.submit(lambda: get_chatbot_runtime().respond(message))
+    except BaseException:
+        _executor_slots.release()
+        raise
+    future.add_done_callback(lambda _: _executor_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+def chatbot_metrics():
+    # Métricas del batcher y de la caché sin forzar la carga del modelo
+    if _runtime is None:
+        return {'loaded': False}
+    return {'loaded': True, **_runtime.batcher.stats(), 'cache': _runtime.cache.stats()}
+
+
+def warm_chatbot_runtime():
+    # Se llama al arrancar el servidor (wsgi/asgi); si faltan los artefactos del modelo no bloquea el arranque
+    # Cualquier error (Keras lanza ValueError con un modelo corrupto o incompatible) se registra
+    # con su traza: el servidor arranca igual y el chatbot se carga en el primer mensaje.
+    try:
+        get_chatbot_runtime().warm()
+    except Exception:
+        logger.exception("Chatbot runtime not warmed")
@@ -0,0 +1,172 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from courses.models import LessonCompletion
+from courses.recommendations import update_user_interactions
+from courses.sequence import set_completion_bits
+
+logger = logging.getLogger(__name__)
+
+# * |--------------------------------------------------------------------------
+# * | Eventos de lecciones completadas (escritura por lotes)
+# * |--------------------------------------------------------------------------
+#
+# Abrir una lección ya no escribe en la base de datos en la propia petición: el
+# evento queda en un buffer en memoria del proceso y un hilo lo vuelca cada
+# LESSON_COMPLETION_FLUSH_INTERVAL_MS con un único bulk_create(ignore_conflicts=True).
+# Como bulk_create no dispara señales, el volcado aplica él mismo los bits de
+# courses/sequence.py y la actualización del recomendador.
+#
+# Las lecturas del propio usuario suman sus eventos pendientes (pending_lessons).
+# El buffer es por proceso: con varios workers, un evento solo es visible desde el
+# worker que lo recibió hasta que se vuelca.
+
+DEFAULT_FLUSH_INTERVAL_MS = 500
+DEFAULT_MAX_PENDING = 1000
+
+
+class CompletionBuffer:
+    def __init__(self, flush_interval_ms=DEFAULT_FLUSH_INTERVAL_MS, max_pending=DEFAULT_MAX_PENDING):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        # (course_user_id, lesson_id) -> (user_id, course_id, finished_at)
+        self._pending = {}
+        # Lote que se está escribiendo: sigue siendo visible para las lecturas hasta que termina
+        self._flushing = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._stats = {'events': 0, 'flushes': 0, 'written': 0, 'errors': 0}
+
+    def start(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='lesson-completions', daemon=True)
+                self._worker.start()
+
+    def record(self, course_user, lesson_id, finished_at=None):
+        self.start()
+        with self._lock:
+            self._pending[(course_user.id, lesson_id)] = (course_user.user_id, course_user.course_id, finished_at or timezone.now())
+            self._stats['events'] += 1
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wakeup.set()
+
+    def pending_lessons(self, user_id, course_id):
+        with self._lock:
+            return {
+                lesson_id
+                for events in (self._flushing, self._pending)
+                for (_, lesson_id), (event_user_id, event_course_id, _) in events.items()
+                if event_user_id == user_id and event_course_id == course_id
+            }
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._flushing, self._pending = self._pending, {}
+            try:
+                written = self.write(self._flushing)
+            except Exception:
+                logger.exception("Lesson completion flush failed; events kept for the next flush")
+                with self._lock:
+                    # Los eventos nuevos del mismo (inscripción, lección) tienen preferencia
+                    self._pending = {**self._flushing, **self._pending}
+                    self._flushing = {}
+                    self._stats['errors'] += 1
+                return 0
+            with self._lock:
+                self._flushing = {}
+                self._stats['flushes'] += 1
+                self._stats['written'] += written
+            return written
+
+    def write(self, events):
+        with transaction.atomic():
+            LessonCompletion.objects.bulk_create(
+                [
+                    LessonCompletion(course_user_id=course_user_id, lesson_id=lesson_id, finished_at=finished_at)
+                    for (course_user_id, lesson_id), (_, _, finished_at) in events.items()
+                ],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+            # ignore_conflicts se salta las filas que ya existían, también las que tienen
+            # finished_at vacío: los bits salen solo de las filas terminadas tras la escritura
+            finished = LessonCompletion.objects.filter(
+                course_user_id__in={course_user_id for course_user_id, _ in events},
+                lesson_id__in={lesson_id for _, lesson_id in events},
+                finished_at__isnull=False,
+            ).values_list('course_user_id', 'lesson_id')
+            lessons_by_enrollment = {}
+            for course_user_id, lesson_id in finished.iterator():
+                if (course_user_id, lesson_id) in events:
+                    lessons_by_enrollment.setdefault(course_user_id, set()).add(lesson_id)
+            if lessons_by_enrollment:
+                set_completion_bits(lessons_by_enrollment)
+
+        for user_id in {user_id for user_id, _, _ in events.values()}:
+            update_user_interactions(user_id)
+        return len(events)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'pending': len(self._pending) + len(self._flushing)}
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_completion_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = CompletionBuffer(
+                    flush_interval_ms=getattr(settings, 'LESSON_COMPLETION_FLUSH_INTERVAL_MS', DEFAULT_FLUSH_INTERVAL_MS),
+                    max_pending=getattr(settings, 'LESSON_COMPLETION_MAX_PENDING', DEFAULT_MAX_PENDING),
+                )
+                # Lo que quede pendiente al parar el proceso se escribe antes de salir
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_lesson_completion(course_user, lesson_id):
+    if not getattr(settings, 'LESSON_COMPLETION_BUFFERED', True):
+        # Escritura inmediata (p. ej. en tests): las señales de LessonCompletion ponen el bit
+        _, created = LessonCompletion.objects.get_or_create(
+            course_user=course_user, lesson_id=lesson_id, defaults={'finished_at': timezone.now()}
+        )
+        if created:
+            transaction.on_commit(lambda: update_user_interactions(course_user.user_id))
+        return
+    get_completion_buffer().record(course_user, lesson_id)
+
+
+def pending_lessons(user_id, course_id):
+    # Lecciones que el usuario ha completado en este curso y aún no están en la base de datos
+    if _buffer is None:
+        return set()
+    return _buffer.pending_lessons(user_id, course_id)
+
+
+def flush_lesson_completions():
+    if _buffer is not None:
+        _buffer.flush()
@@ -0,0 +1,38 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from courses.chatbot_runtime import ChatbotBusy, respond_async
+
+# * |--------------------------------------------------------------------------
+# * | Chatbot por websocket
+# * |--------------------------------------------------------------------------
+#
+# La inferencia se hace en el pool acotado de chatbot_runtime, así que el event
+# loop sigue atendiendo otras conexiones mientras el modelo predice. La respuesta
+# se envía por trozos: start -> chunk... -> end.
+
+EMPTY_MESSAGE_RESPONSE = "Por favor, escribe un mensaje válido."
+BUSY_RESPONSE = "El chatbot está muy ocupado ahora mismo, inténtalo de nuevo en unos segundos."
+CHUNK_WORDS = 4
+
+
+def iter_chunks(text, size=CHUNK_WORDS):
+    words = text.split(' ')
+    for start in range(0, len(words), size):
+        chunk = ' '.join(words[start:start + size])
+        yield chunk if start + size >= len(words) else chunk + ' '
+
+
+class ChatbotConsumer(AsyncJsonWebsocketConsumer):
+    async def receive_json(self, content, **kwargs):
+        message = str(content.get('message', '')).strip()
+        await self.send_json({'type': 'start'})
+        if not message:
+            response = EMPTY_MESSAGE_RESPONSE
+        else:
+            try:
+                response = await respond_async(message)
+            except ChatbotBusy:
+                response = BUSY_RESPONSE
+        for chunk in iter_chunks(response):
+            await self.send_json({'type': 'chunk', 'text': chunk})
+        await self.send_json({'type': 'end'})
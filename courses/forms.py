@@ -28,12 +28,12 @@ class CertificateForm(forms.ModelForm):
 class ModuleForm(forms.ModelForm):
     class Meta:
         model = Module
-        fields = ['title', 'description', 'is_active']
+        fields = ['title', 'description', 'is_active', 'order']
 
 class LessonForm(forms.ModelForm):
     class Meta:
         model = Lesson
-        fields = ['name', 'description', 'duration']
+        fields = ['name', 'description', 'duration', 'order']
 
 class ReviewForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from courses.ann import BACKENDS, ExactIndex, IVFIndex, normalize_rows
+
+
+def synthetic_vectors(n_vectors, dim, n_clusters, seed):
+    # Vectores agrupados alrededor de unos cuantos centros, como los perfiles de usuario reales
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim))
+    labels = rng.integers(0, n_clusters, n_vectors)
+    return normalize_rows(centers[labels] + 0.6 * rng.standard_normal((n_vectors, dim)))
+
+
+def measure(index, queries, k, **options):
+    results = []
+    started = time.perf_counter()
+    for query in queries:
+        results.append(index.query(query, k, **options)[0])
+    latency = (time.perf_counter() - started) / len(queries)
+    return results, latency
+
+
+def recall(results, expected):
+    hits = sum(len(np.intersect1d(found, truth)) for found, truth in zip(results, expected))
+    return hits / sum(len(truth) for truth in expected)
+
+
+class Command(BaseCommand):
+    help = "Recall vs latency of the ANN backends against the exact cosine search"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vectors', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--dim', type=int, default=64)
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        k = options['k']
+        for n_vectors in options['vectors']:
+            vectors = synthetic_vectors(n_vectors, options['dim'], max(10, n_vectors // 1000), options['seed'])
+            ids = np.arange(1, n_vectors + 1)
+            queries = vectors[np.random.default_rng(options['seed'] + 1).choice(n_vectors, options['queries'], replace=False)]
+
+            exact = ExactIndex.build(ids, vectors)
+            expected, exact_latency = measure(exact, queries, k)
+            self.stdout.write(f"\n{n_vectors} vectors x {options['dim']} dims, recall@{k}")
+            self.stdout.write(f"{'backend':>16} | {'recall':>7} | {'latency':>10}")
+            self.stdout.write(f"{'exact':>16} | {1.0:>7.3f} | {exact_latency * 1000:>8.3f}ms")
+
+            started = time.perf_counter()
+            ivf = IVFIndex.build(ids, vectors)
+            self.stdout.write(f"{'ivf build':>16} | {'':>7} | {time.perf_counter() - started:>9.2f}s")
+            for nprobe in options['nprobe']:
+                results, latency = measure(ivf, queries, k, nprobe=nprobe)
+                self.stdout.write(f"{f'ivf nprobe={nprobe}':>16} | {recall(results, expected):>7.3f} | {latency * 1000:>8.3f}ms")
+
+            if 'hnsw' in BACKENDS:
+                hnsw = BACKENDS['hnsw'].build(ids, vectors)
+                results, latency = measure(hnsw, queries, k)
+                self.stdout.write(f"{'hnsw':>16} | {recall(results, expected):>7.3f} | {latency * 1000:>8.3f}ms")
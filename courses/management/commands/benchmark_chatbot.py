@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Código que se ejecuta en un proceso nuevo para medir el arranque de cada backend por separado
+PROBE = """
+import json, resource, time
+started = time.perf_counter()
+from django.test.utils import override_settings
+from courses.chatbot_runtime import ChatbotRuntime
+backend = {backend!r}
+if backend:
+    with override_settings(CHATBOT_BACKEND=backend):
+        runtime = ChatbotRuntime().load().warm()
+loaded = time.perf_counter() - started
+latency = None
+if backend:
+    processed = runtime.preprocess('¿Cómo me inscribo en un curso?')
+    started = time.perf_counter()
+    for _ in range({messages}):
+        runtime.predict_tags([processed])
+    latency = (time.perf_counter() - started) / {messages}
+print(json.dumps({{
+    'startup': loaded,
+    'latency': latency,
+    'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'tensorflow': __import__('sys').modules.get('tensorflow') is not None,
+}}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Compare startup time, RSS and latency of the NumPy and Keras chatbot backends"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=['numpy', 'keras'])
+        parser.add_argument('--messages', type=int, default=100)
+
+    def probe(self, backend, messages):
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        code = PROBE.format(backend=backend, messages=messages)
+        result = subprocess.run([sys.executable, manage, 'shell', '-c', code], capture_output=True, text=True)
+        if result.returncode:
+            return None, result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'
+        return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+    def handle(self, *args, **options):
+        baseline, error = self.probe(None, 0)
+        if error:
+            self.stderr.write(f"Baseline failed: {error}")
+            return
+
+        self.stdout.write(f"{'backend':>8} | {'startup':>9} | {'RSS (MB)':>9} | {'+RSS (MB)':>9} | {'latency':>9} | tensorflow")
+        self.stdout.write(f"{'django':>8} | {baseline['startup']:>8.2f}s | {baseline['maxrss_mb']:>9.0f} | {0:>9.0f} | {'-':>9} | {baseline['tensorflow']}")
+        for backend in options['backends']:
+            result, error = self.probe(backend, options['messages'])
+            if error:
+                self.stdout.write(f"{backend:>8} | failed: {error}")
+                continue
+            self.stdout.write(
+                f"{backend:>8} | {result['startup']:>8.2f}s | {result['maxrss_mb']:>9.0f} | "
+                f"{result['maxrss_mb'] - baseline['maxrss_mb']:>9.0f} | {result['latency'] * 1000:>7.2f}ms | {result['tensorflow']}"
+            )
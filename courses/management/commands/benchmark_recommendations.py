@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from sklearn.metrics.pairwise import cosine_similarity
+
+from courses.recommendations import (
+    InteractionMatrix, compute_course_similarity, compute_recommendations, score_user_row,
+)
+
+
+def synthetic_interactions(n_users, n_courses, per_user, seed):
+    # Wishlist sintética con popularidad sesgada (unos pocos cursos acumulan la mayoría de interacciones)
+    rng = np.random.default_rng(seed)
+    popularity = 1 / np.arange(1, n_courses + 1)
+    popularity /= popularity.sum()
+    counts = rng.poisson(per_user, n_users).clip(1, n_courses)
+    users = np.repeat(np.arange(1, n_users + 1), counts)
+    courses = rng.choice(np.arange(1, n_courses + 1), size=len(users), p=popularity)
+    return users, courses
+
+
+def legacy_recommendation(users, courses, n_users, n_courses, user_id):
+    # Reproduce el camino anterior de courses.views: DataFrame denso + cosine_similarity usuario x usuario
+    matrix = pd.DataFrame(0, index=range(1, n_users + 1), columns=range(1, n_courses + 1))
+    for wish_user, wish_course in zip(users.tolist(), courses.tolist()):
+        matrix.at[wish_user, wish_course] = 1
+
+    user_similarity = cosine_similarity(matrix)
+    user_similarity_df = pd.DataFrame(user_similarity, index=matrix.index, columns=matrix.index)
+
+    already_rated = matrix.loc[user_id]
+    already_rated = already_rated[already_rated > 0].index
+    similar_users = user_similarity_df[user_id]
+    recommendations = matrix.T.dot(similar_users) / similar_users.sum()
+    recommendations = recommendations.sort_values(ascending=False).drop(already_rated, errors='ignore')
+    return recommendations.head(2).index.tolist()
+
+
+class Command(BaseCommand):
+    help = "Compare the legacy per-request recommendation path with the precomputed sparse engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--per-user', type=float, default=5, help="Average wishlist size per user.")
+        parser.add_argument('--max-dense-gb', type=float, default=2.0,
+                            help="Skip the legacy path when its user x user matrix would exceed this size.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        n_courses = options['courses']
+        self.stdout.write(f"{'users':>8} | {'legacy/request':>15} | {'engine build':>13} | {'engine/user':>12} | {'matrix nnz':>10}")
+        for n_users in options['users']:
+            users, courses = synthetic_interactions(n_users, n_courses, options['per_user'], options['seed'])
+
+            dense_gb = n_users * n_users * 8 / 1024 ** 3
+            if dense_gb > options['max_dense_gb']:
+                legacy = f"skip ({dense_gb:.0f} GB)"
+            else:
+                started = time.perf_counter()
+                legacy_recommendation(users, courses, n_users, n_courses, user_id=1)
+                legacy = f"{time.perf_counter() - started:.3f}s"
+
+            started = time.perf_counter()
+            interactions = InteractionMatrix.from_entries(users, courses, np.ones(len(users)), range(1, n_courses + 1))
+            similarity = compute_course_similarity(interactions.matrix)
+            for _ in compute_recommendations(interactions, similarity):
+                pass
+            build = time.perf_counter() - started
+
+            sample = range(min(1000, interactions.matrix.shape[0]))
+            started = time.perf_counter()
+            for row in sample:
+                score_user_row(interactions.matrix[row], similarity)
+            per_user = (time.perf_counter() - started) / max(len(sample), 1)
+
+            self.stdout.write(
+                f"{n_users:>8} | {legacy:>15} | {build:>12.3f}s | {per_user * 1000:>10.3f}ms | {interactions.matrix.nnz:>10}"
+            )
+        self.stdout.write("Views only read CourseRecommendation rows (one indexed query) once the engine has been built.")
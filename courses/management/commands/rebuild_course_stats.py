@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.stats import find_course_stats_drift, rebuild_course_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized CourseStats table or check it for drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only compare the stored stats against the live tables, without rewriting them.",
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = find_course_stats_drift()
+            if not drift:
+                self.stdout.write(self.style.SUCCESS("CourseStats is in sync."))
+                return
+            for course_id, fields in sorted(drift.items()):
+                changes = ", ".join(f"{field}: {stored} != {actual}" for field, (stored, actual) in fields.items())
+                self.stdout.write(f"Course {course_id}: {changes}")
+            raise CommandError(f"{len(drift)} course(s) with stale stats. Run rebuild_course_stats to fix them.")
+
+        total = rebuild_course_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {total} course(s)."))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.recommendations import RECOMMENDATIONS_PER_USER, TOP_K_SIMILAR_COURSES, rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed course recommendations (run it from cron or with --interval as a worker)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K_SIMILAR_COURSES,
+                            help="Number of similar courses kept per course.")
+        parser.add_argument('--per-user', type=int, default=RECOMMENDATIONS_PER_USER,
+                            help="Number of recommendations stored per user.")
+        parser.add_argument('--interval', type=int, default=0,
+                            help="Keep running and rebuild every N seconds (0 = run once).")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            result = rebuild_recommendations(top_k=options['top_k'], per_user=options['per_user'])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt recommendations in {elapsed:.2f}s: {result['users']} users, {result['courses']} courses, "
+                f"{result['interactions']} interactions, {result['similarities']} similarities, "
+                f"{result['recommendations']} recommendations."
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
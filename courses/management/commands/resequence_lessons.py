@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.sequence import resequence_course
+
+
+class Command(BaseCommand):
+    help = "Recompute lesson ordinals and the per-enrollment completion bitmaps"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, nargs='+', help="Only these course ids.")
+
+    def handle(self, *args, **options):
+        course_ids = options['course'] or Course.objects.values_list('id', flat=True)
+        total = 0
+        for course_id in course_ids:
+            resequence_course(course_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f"Resequenced {total} course(s)."))
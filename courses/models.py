@@ -36,6 +36,7 @@ class Course(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'), null=True, blank=True)
     category = models.ForeignKey(Category, blank=True, null=True, on_delete=models.CASCADE)
     hardskills = models.ManyToManyField(HardSkill, blank=True)
+    outline_version = models.PositiveIntegerField(default=1)  # Versión del temario cacheado (courses/outline.py)
 
     def __str__(self):
         return self.title
@@ -104,6 +105,7 @@ class Module(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
     is_active = models.BooleanField(default=False)
+    order = models.PositiveIntegerField(default=0) # posición del módulo dentro del curso
 
     def __str__(self):
         return self.title
@@ -114,6 +116,8 @@ class Lesson(models.Model):
     description = models.TextField(null=True, blank=True)
     is_member = models.BooleanField(default=False)
     duration = models.IntegerField(null=True, blank=True, default=10)
+    order = models.PositiveIntegerField(default=0) # posición de la lección dentro del módulo
+    ordinal = models.PositiveIntegerField(default=0, db_index=True) # posición en todo el curso, mantenida por courses/sequence.py
 
     def __str__(self):
         return f'{self.module} - {self.name}'
@@ -125,6 +129,7 @@ class CourseUser(models.Model):
     start_date = models.DateTimeField(auto_now_add=True)
     end_date = models.DateTimeField(null=True, blank=True)
     certified = models.BooleanField(default=False)
+    completion_bitmap = models.BinaryField(default=b'') # bit n = lección con ordinal n completada (courses/sequence.py)
 
     class Meta:
         constraints = [
@@ -178,5 +183,94 @@ class LessonCompletion(models.Model):
         return f"{self.course_user.user.username} - {self.lesson.name}"
 
 
+class CourseStats(models.Model):
+    # Tabla desnormalizada con los contadores de cada curso, mantenida por las señales de courses/signals.py
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name="stats") # para usar la query --> course.stats
+    enrolled_users_count = models.PositiveIntegerField(default=0)
+    completed_users_count = models.PositiveIntegerField(default=0)
+    wishlist_count = models.PositiveIntegerField(default=0)
+    reviews_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
+    @property
+    def average_rating(self):
+        if not self.reviews_count:
+            return 0
+        return round(self.rating_sum / self.reviews_count, 1)
 
+    def __str__(self):
+        return f'{self.course} - stats'
+
+
+class CourseSimilarity(models.Model):
+    # Vecinos más parecidos de cada curso, precalculados por courses/recommendations.py
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="similar_courses") # para usar la query --> course.similar_courses.all()
+    similar_course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'similar_course'], name='unique_course_similarity')
+        ]
+
+    def __str__(self):
+        return f'{self.course} ~ {self.similar_course} ({self.score:.3f})'
+
+
+class CourseRecommendation(models.Model):
+    # Recomendaciones precalculadas por usuario, las vistas solo hacen la consulta
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="course_recommendations") # para usar la query --> user.course_recommendations.all()
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="recommendations")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['user', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'course'], name='unique_user_course_recommendation')
+        ]
+
+    def __str__(self):
+        return f'{self.user.username} - {self.course} (#{self.rank})'
+
+
+class CourseInteraction(models.Model):
+    # Almacén de interacciones usuario-curso (fila dispersa de la matriz) que se actualiza por eventos
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="course_interactions") # para usar la query --> user.course_interactions.all()
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="interactions")
+    weight = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'course'], name='unique_user_course_interaction')
+        ]
+
+    def __str__(self):
+        return f'{self.user.username} - {self.course} ({self.weight})'
+
+
+class CourseCooccurrence(models.Model):
+    # Producto escalar entre las columnas de dos cursos (la diagonal guarda la norma al cuadrado)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="cooccurrences")
+    other_course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="+")
+    value = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'other_course'], name='unique_course_cooccurrence')
+        ]
+
+    def __str__(self):
+        return f'{self.course} x {self.other_course} ({self.value})'
+
+
+class RecommendationState(models.Model):
+    # Marca las recomendaciones de un usuario como obsoletas para recalcularlas en la siguiente lectura
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="recommendation_state")
+    is_stale = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.user.username} - {"stale" if self.is_stale else "fresh"}'
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from courses.models import Course, Lesson, Module, Resource
+
+# * |--------------------------------------------------------------------------
+# * | Temario del curso (módulos -> lecciones -> recursos) cacheado
+# * |--------------------------------------------------------------------------
+#
+# El árbol se serializa a dicts junto con los totales y la duración formateada.
+# La clave lleva la versión del curso (columna Course.outline_version, en la base de
+# datos para que la compartan todos los procesos): las vistas que crean, editan o
+# borran módulos, lecciones o recursos llaman a invalidate_course_outline, que sube
+# la versión y deja las entradas antiguas sin uso hasta que caduquen.
+
+DEFAULT_OUTLINE_TTL = 60 * 60 * 24
+
+
+def invalidate_course_outline(course_id):
+    # UPDATE sin señales; todos los procesos ven la nueva versión en su siguiente lectura del curso
+    Course.objects.filter(id=course_id).update(outline_version=F('outline_version') + 1)
+
+
+def format_duration(total_minutes):
+    hours = total_minutes // 60
+    minutes = total_minutes % 60
+    return f"{hours} hours {minutes} minutes"
+
+
+def build_course_outline(course_id):
+    # Tres consultas planas (módulos, lecciones, recursos) en lugar del prefetch de modelos completos
+    modules = [
+        {'id': module['id'], 'title': module['title'], 'lessons': []}
+        for module in Module.objects.filter(course_id=course_id).order_by('order', 'id').values('id', 'title')
+    ]
+    modules_by_id = {module['id']: module for module in modules}
+
+    lessons_by_id = {}
+    for lesson in (
+        Lesson.objects.filter(module__course_id=course_id)
+        .order_by('ordinal', 'id')
+        .values('id', 'module_id', 'name', 'description', 'duration')
+    ):
+        lesson['resources'] = []
+        lessons_by_id[lesson['id']] = lesson
+        modules_by_id[lesson['module_id']]['lessons'].append(lesson)
+
+    total_resources = 0
+    for resource in Resource.objects.filter(lesson__module__course_id=course_id).order_by('id').values('id', 'name', 'lesson_id'):
+        lessons_by_id[resource.pop('lesson_id')]['resources'].append(resource)
+        total_resources += 1
+
+    total_duration = sum(lesson['duration'] or 0 for lesson in lessons_by_id.values())
+    return {
+        'modules': modules,
+        # sequence[ordinal] -> lección (courses/sequence.py)
+        'sequence': [{'id': lesson['id'], 'module_id': lesson['module_id']} for lesson in lessons_by_id.values()],
+        'total_lessons': len(lessons_by_id),
+        'total_resources': total_resources,
+        'total_duration_minutes': total_duration,
+        'formatted_duration': format_duration(total_duration),
+    }
+
+
+def get_course_outline(course):
+    # course es la instancia que ya ha cargado la vista: su outline_version forma parte de la clave
+    key = f'course_outline:{course.id}:{course.outline_version}'
+    outline = cache.get(key)
+    if outline is None:
+        outline = build_course_outline(course.id)
+        cache.set(key, outline, getattr(settings, 'COURSE_OUTLINE_CACHE_TTL', DEFAULT_OUTLINE_TTL))
+    return outline
@@ -0,0 +1,43 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from courses.models import CourseUser, Lesson
+
+# * |--------------------------------------------------------------------------
+# * | Progreso de los alumnos
+# * |--------------------------------------------------------------------------
+#
+# total_lessons y completed_lessons se anotan sobre el queryset de CourseUser, así
+# que el progreso de todas las inscripciones de un usuario sale en una sola consulta
+# agrupada en lugar de dos count() por curso.
+
+
+def with_progress(queryset):
+    course_lessons = (
+        Lesson.objects.filter(module__course=OuterRef('course_id'))
+        .values('module__course')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return queryset.annotate(
+        total_lessons=Coalesce(Subquery(course_lessons, output_field=IntegerField()), 0),
+        completed_lessons=Count(
+            'lessons_completed',
+            filter=Q(
+                lessons_completed__finished_at__isnull=False,
+                lessons_completed__lesson__module__course=F('course_id'),
+            ),
+            distinct=True,
+        ),
+    )
+
+
+def progress_percentage(course_user):
+    if not course_user.total_lessons:
+        return 0
+    return min(course_user.completed_lessons / course_user.total_lessons, 1) * 100
+
+
+def get_course_user_with_progress(user, course):
+    # La inscripción del usuario en el curso con su progreso ya anotado (o None)
+    return with_progress(CourseUser.objects.filter(user=user, course=course)).first()
@@ -0,0 +1,532 @@
+import heapq
+import math
+from collections import defaultdict
+from operator import itemgetter
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, Value, When
+
+from courses.ann import build_index, load_index, normalize_rows, save_index
+from courses.models import (
+    Course, CourseCooccurrence, CourseInteraction, CourseRecommendation, CourseSimilarity, CourseUser, Lesson,
+    LessonCompletion, RecommendationState, Review, WishListUser,
+)
+
+# * |--------------------------------------------------------------------------
+# * | Motor de recomendaciones (KNN sobre cursos, precalculado offline)
+# * |--------------------------------------------------------------------------
+#
+# La matriz usuarios x cursos se construye dispersa (CSR) con unas pocas consultas
+# agregadas que combinan wishlist, matrículas, progreso en lecciones y reviews.
+# A partir de ella se calculan los K cursos más parecidos a cada curso (similitud
+# coseno entre columnas) y, con esos vecinos, las recomendaciones de cada usuario.
+# Todo se guarda en CourseSimilarity / CourseRecommendation y las vistas solo leen.
+#
+# Entre reconstrucciones completas, cada evento (wishlist, matrícula, review) solo
+# reescribe la fila del usuario en CourseInteraction, ajusta CourseCooccurrence para
+# los pares de cursos de esa fila, recalcula el vecindario de los cursos que cambian
+# y marca al usuario como obsoleto; sus recomendaciones se recalculan al leerlas.
+
+# Peso de cada señal en la matriz; se pueden sobrescribir con COURSE_INTERACTION_WEIGHTS en settings.py
+DEFAULT_INTERACTION_WEIGHTS = {
+    'wishlist': 1.0,         # curso en la wishlist
+    'enrolled': 2.0,         # matriculado (en curso)
+    'completed': 3.0,        # matriculado y completado
+    'lesson_progress': 2.0,  # multiplicado por la fracción de lecciones terminadas
+    'rating': 0.5,           # multiplicado por las estrellas de la review (1-5)
+}
+
+TOP_K_SIMILAR_COURSES = 20
+RECOMMENDATIONS_PER_USER = 6
+BULK_BATCH_SIZE = 1000
+
+# Índices ANN (courses/ann.py): usuarios parecidos por sus interacciones y cursos parecidos por contenido
+USER_INDEX = 'users'
+COURSE_INDEX = 'courses'
+USER_VECTOR_DIM = 64
+SIMILAR_USERS = 20
+
+
+class InteractionMatrix:
+    def __init__(self, matrix, user_ids, course_ids):
+        self.matrix = matrix.tocsr()            # usuarios x cursos
+        self.user_ids = np.asarray(user_ids)    # id de usuario de cada fila (ordenados)
+        self.course_ids = np.asarray(course_ids)  # id de curso de cada columna (ordenados)
+
+    @classmethod
+    def from_entries(cls, users, courses, weights, course_ids):
+        # users/courses/weights son arrays paralelos; los pares repetidos se suman
+        users = np.asarray(users, dtype=np.int64)
+        courses = np.asarray(courses, dtype=np.int64)
+        course_ids = np.asarray(sorted(course_ids), dtype=np.int64)
+        user_ids = np.unique(users)
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(weights, dtype=np.float64), (np.searchsorted(user_ids, users), np.searchsorted(course_ids, courses))),
+            shape=(len(user_ids), len(course_ids)),
+        )
+        matrix.sum_duplicates()
+        return cls(matrix, user_ids, course_ids)
+
+    def row_of(self, user_id):
+        position = np.searchsorted(self.user_ids, user_id)
+        if position < len(self.user_ids) and self.user_ids[position] == user_id:
+            return position
+        return None
+
+
+def get_interaction_weights():
+    return {**DEFAULT_INTERACTION_WEIGHTS, **getattr(settings, 'COURSE_INTERACTION_WEIGHTS', {})}
+
+
+def as_entries(rows):
+    # Convierte filas (user_id, course_id, peso) en tres arrays paralelos
+    array = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    return array[:, 0].astype(np.int64), array[:, 1].astype(np.int64), array[:, 2]
+
+
+def load_interaction_entries(user_id=None, weights=None):
+    # Devuelve (usuarios, cursos, pesos) desde las tablas de origen, de todos los usuarios o de uno.
+    # Cada señal es una consulta agregada con el peso calculado en SQL; los pares repetidos se suman después.
+    weights = weights or get_interaction_weights()
+    user_filter = {} if user_id is None else {'user_id': user_id}
+    rows = []
+
+    if weights['wishlist']:
+        rows += (
+            WishListUser.objects.filter(type_wish__name='Course', id_wish__in=Course.objects.values('id'), **user_filter)
+            .annotate(weight=Value(weights['wishlist'], output_field=FloatField()))
+            .values_list('user_id', 'id_wish', 'weight')
+            .distinct()
+        )
+
+    if weights['enrolled'] or weights['completed']:
+        rows += (
+            CourseUser.objects.filter(**user_filter)
+            .annotate(weight=Case(
+                When(status__name='completed', then=Value(weights['completed'])),
+                default=Value(weights['enrolled']),
+                output_field=FloatField(),
+            ))
+            .values_list('user_id', 'course_id', 'weight')
+        )
+
+    if weights['lesson_progress']:
+        completions = LessonCompletion.objects.filter(finished_at__isnull=False)
+        if user_id is not None:
+            completions = completions.filter(course_user__user_id=user_id)
+        finished = list(
+            completions.values('course_user__user_id', 'course_user__course_id')
+            .annotate(finished=Count('id'))
+            .values_list('course_user__user_id', 'course_user__course_id', 'finished')
+        )
+        totals = dict(
+            Lesson.objects.filter(module__course_id__in={course_id for _, course_id, _ in finished})
+            .values('module__course_id')
+            .annotate(total=Count('id'))
+            .values_list('module__course_id', 'total')
+        ) if finished else {}
+        rows += [
+            (user, course_id, weights['lesson_progress'] * count / totals[course_id])
+            for user, course_id, count in finished if totals.get(course_id)
+        ]
+
+    if weights['rating']:
+        rows += (
+            Review.objects.filter(course__isnull=False, **user_filter)
+            .annotate(weight=ExpressionWrapper(F('rating') * weights['rating'], output_field=FloatField()))
+            .values_list('user_id', 'course_id', 'weight')
+        )
+
+    return as_entries(rows)
+
+
+def load_user_interactions(user_id):
+    # Fila de un único usuario como {course_id: peso}
+    row = defaultdict(float)
+    for _, course_id, weight in zip(*load_interaction_entries(user_id)):
+        row[course_id] += float(weight)
+    return dict(row)
+
+
+def create_interaction_matrix():
+    # Matriz completa con unas pocas consultas; solo se guardan las celdas con interacción
+    course_ids = list(Course.objects.order_by('id').values_list('id', flat=True))
+    users, courses, weights = load_interaction_entries()
+    return InteractionMatrix.from_entries(users, courses, weights, course_ids)
+
+
+def top_k_per_row(matrix, k):
+    # Conserva solo los k valores más altos de cada fila de una matriz CSR
+    matrix = matrix.tocsr()
+    indptr, indices, data = [0], [], []
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        row_indices, row_data = matrix.indices[start:end], matrix.data[start:end]
+        if len(row_data) > k:
+            keep = np.argpartition(-row_data, k)[:k]
+            row_indices, row_data = row_indices[keep], row_data[keep]
+        indices.append(row_indices)
+        data.append(row_data)
+        indptr.append(indptr[-1] + len(row_data))
+    return sparse.csr_matrix(
+        (np.concatenate(data) if data else [], np.concatenate(indices) if indices else [], indptr),
+        shape=matrix.shape,
+    )
+
+
+def compute_course_similarity(matrix, top_k=TOP_K_SIMILAR_COURSES):
+    # Similitud coseno entre cursos (columnas) limitada a los top_k vecinos de cada curso
+    if matrix.shape[1] == 0:
+        return sparse.csr_matrix((0, 0))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1
+    normalized = (matrix @ sparse.diags(1 / norms)).tocsc()
+
+    similarity = (normalized.T @ normalized).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return top_k_per_row(similarity, top_k)
+
+
+def rank_scores(columns, values, rated_columns, limit):
+    # Descarta los cursos ya vistos por el usuario y devuelve los `limit` mejores [(columna, puntuación)]
+    keep = (values > 0) & ~np.isin(columns, rated_columns)
+    columns, values = columns[keep], values[keep]
+    if len(values) > limit:
+        best = np.argpartition(-values, limit)[:limit]
+        columns, values = columns[best], values[best]
+    order = np.argsort(-values, kind='stable')
+    return list(zip(columns[order].tolist(), values[order].tolist()))
+
+
+def score_user_row(user_row, similarity, limit=RECOMMENDATIONS_PER_USER):
+    # user_row es una fila CSR (1 x cursos) de un único usuario
+    scores = (user_row @ similarity).tocsr()
+    return rank_scores(scores.indices, scores.data, user_row.indices, limit)
+
+
+def merge_scores(columns, values):
+    # Suma las puntuaciones de columnas repetidas
+    columns, positions = np.unique(columns, return_inverse=True)
+    return columns, np.bincount(positions, weights=values)
+
+
+def compute_recommendations(interactions, similarity, limit=RECOMMENDATIONS_PER_USER, user_index=None, user_vectors=None):
+    # Generador de (user_id, [(course_id, score), ...]) para todos los usuarios con interacciones.
+    # Si se pasa el índice de usuarios, se suman también los cursos de los usuarios más parecidos.
+    matrix = interactions.matrix
+    scores = (matrix @ similarity).tocsr()
+    for row in range(matrix.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        columns, values = scores.indices[start:end], scores.data[start:end]
+        if user_index is not None:
+            neighbour_columns, neighbour_values = neighbour_scores(interactions, user_index, user_vectors[row], row)
+            columns, values = merge_scores(
+                np.concatenate([columns, neighbour_columns]), np.concatenate([values, neighbour_values])
+            )
+        rated = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        ranked = rank_scores(columns, values, rated, limit)
+        if ranked:
+            yield int(interactions.user_ids[row]), [
+                (int(interactions.course_ids[column]), score) for column, score in ranked
+            ]
+
+
+def iter_similarity_rows(interactions, similarity):
+    course_ids = interactions.course_ids
+    for row in range(similarity.shape[0]):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        for column, score in zip(similarity.indices[start:end], similarity.data[start:end]):
+            yield CourseSimilarity(
+                course_id=int(course_ids[row]), similar_course_id=int(course_ids[column]), score=float(score)
+            )
+
+
+def iter_recommendation_rows(recommendations):
+    for user_id, ranked in recommendations:
+        for rank, (course_id, score) in enumerate(ranked, start=1):
+            yield CourseRecommendation(user_id=user_id, course_id=course_id, score=score, rank=rank)
+
+
+def bulk_create_in_batches(model, rows, batch_size=BULK_BATCH_SIZE):
+    total, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def iter_interaction_rows(interactions):
+    matrix = interactions.matrix
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        for column, weight in zip(matrix.indices[start:end], matrix.data[start:end]):
+            yield CourseInteraction(
+                user_id=int(interactions.user_ids[row]), course_id=int(interactions.course_ids[column]), weight=float(weight)
+            )
+
+
+def iter_cooccurrence_rows(interactions):
+    course_ids = interactions.course_ids
+    cooccurrence = (interactions.matrix.T @ interactions.matrix).tocsr()
+    for row in range(cooccurrence.shape[0]):
+        start, end = cooccurrence.indptr[row], cooccurrence.indptr[row + 1]
+        for column, value in zip(cooccurrence.indices[start:end], cooccurrence.data[start:end]):
+            yield CourseCooccurrence(
+                course_id=int(course_ids[row]), other_course_id=int(course_ids[column]), value=float(value)
+            )
+
+
+# * |--------------------------------------------------------------------------
+# * | Índices ANN de usuarios y cursos
+# * |--------------------------------------------------------------------------
+
+def random_projection(n_courses, dim=USER_VECTOR_DIM, seed=0):
+    # Proyección aleatoria cursos -> dim (conserva aproximadamente el coseno); sin proyección si ya es pequeño
+    if n_courses <= dim:
+        return np.eye(n_courses, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal((n_courses, dim)) / np.sqrt(dim)).astype(np.float32)
+
+
+def build_user_vectors(interactions, projection):
+    return normalize_rows(interactions.matrix @ projection)
+
+
+def project_user_row(row, projection, course_ids):
+    # Vector de un usuario a partir de su fila {course_id: peso}, con la proyección guardada en el índice
+    vector = np.zeros(projection.shape[1], dtype=np.float32)
+    for course_id, weight in row.items():
+        position = np.searchsorted(course_ids, course_id)
+        if position < len(course_ids) and course_ids[position] == course_id:
+            vector += weight * projection[position]
+    return vector
+
+
+def neighbour_scores(interactions, user_index, vector, row):
+    # Cursos de los usuarios más parecidos ponderados por su similitud (versión sobre la matriz completa)
+    user_ids, similarities = user_index.query(vector, SIMILAR_USERS + 1)
+    keep = (user_ids != interactions.user_ids[row]) & (similarities > 0)
+    user_ids, similarities = user_ids[keep], similarities[keep]
+    if not len(user_ids):
+        return np.zeros(0, dtype=np.int32), np.zeros(0)
+    rows = np.searchsorted(interactions.user_ids, user_ids)
+    contribution = np.asarray(interactions.matrix[rows].T @ similarities).ravel()
+    columns = np.flatnonzero(contribution)
+    return columns, contribution[columns]
+
+
+def build_course_content_vectors():
+    # Vectores de contenido de los cursos: hardskills + categoría (one-hot)
+    course_ids = np.array(sorted(Course.objects.values_list('id', flat=True)), dtype=np.int64)
+    skills = list(Course.hardskills.through.objects.values_list('course_id', 'hardskill_id'))
+    categories = list(Course.objects.filter(category__isnull=False).values_list('id', 'category_id'))
+
+    skill_ids = sorted({skill_id for _, skill_id in skills})
+    category_ids = sorted({category_id for _, category_id in categories})
+    vectors = np.zeros((len(course_ids), len(skill_ids) + len(category_ids)), dtype=np.float32)
+    for course_id, skill_id in skills:
+        vectors[np.searchsorted(course_ids, course_id), skill_ids.index(skill_id)] = 1
+    for course_id, category_id in categories:
+        vectors[np.searchsorted(course_ids, course_id), len(skill_ids) + category_ids.index(category_id)] = 1
+    return course_ids, vectors
+
+
+def build_recommendation_indexes(interactions):
+    projection = random_projection(len(interactions.course_ids))
+    user_vectors = build_user_vectors(interactions, projection)
+    user_index = build_index(interactions.user_ids, user_vectors)
+    save_index(USER_INDEX, user_index, projection=projection, course_ids=interactions.course_ids)
+
+    course_ids, course_vectors = build_course_content_vectors()
+    save_index(COURSE_INDEX, build_index(course_ids, course_vectors))
+    return user_index, user_vectors
+
+
+def similar_user_scores(user_id, row):
+    # Versión de neighbour_scores para un solo usuario usando el índice mapeado en memoria
+    user_index, extra = load_index(USER_INDEX)
+    if user_index is None or not row:
+        return {}
+    vector = project_user_row(row, extra['projection'], extra['course_ids'])
+    user_ids, similarities = user_index.query(vector, SIMILAR_USERS + 1)
+    neighbours = {int(other_id): float(similarity) for other_id, similarity in zip(user_ids, similarities)
+                  if other_id != user_id and similarity > 0}
+
+    scores = defaultdict(float)
+    for other_id, course_id, weight in CourseInteraction.objects.filter(user_id__in=list(neighbours)).values_list('user_id', 'course_id', 'weight'):
+        scores[course_id] += neighbours[other_id] * weight
+    return scores
+
+
+def similar_courses_for_course(course_id, limit=2):
+    # Cursos con hardskills/categoría más parecidos según el índice de contenido
+    course_index, _ = load_index(COURSE_INDEX)
+    if course_index is None:
+        return []
+    vector = course_index.vector_of(course_id)
+    if vector is None or not vector.any():
+        return []
+    course_ids, similarities = course_index.query(vector, limit + 1)
+    ranked = [int(other_id) for other_id, similarity in zip(course_ids, similarities) if other_id != course_id and similarity > 0][:limit]
+    courses = Course.objects.filter(id__in=ranked).select_related('stats', 'profile_teacher__user').in_bulk()
+    return [courses[other_id] for other_id in ranked if other_id in courses]
+
+
+@transaction.atomic
+def rebuild_recommendations(top_k=TOP_K_SIMILAR_COURSES, per_user=RECOMMENDATIONS_PER_USER):
+    # Recalcula todo el modelo y sustituye las tablas en una sola transacción
+    interactions = create_interaction_matrix()
+    similarity = compute_course_similarity(interactions.matrix, top_k)
+    user_index, user_vectors = build_recommendation_indexes(interactions)
+
+    CourseInteraction.objects.all().delete()
+    bulk_create_in_batches(CourseInteraction, iter_interaction_rows(interactions))
+
+    CourseCooccurrence.objects.all().delete()
+    bulk_create_in_batches(CourseCooccurrence, iter_cooccurrence_rows(interactions))
+
+    CourseSimilarity.objects.all().delete()
+    similarity_count = bulk_create_in_batches(CourseSimilarity, iter_similarity_rows(interactions, similarity))
+
+    CourseRecommendation.objects.all().delete()
+    recommendation_count = bulk_create_in_batches(
+        CourseRecommendation,
+        iter_recommendation_rows(compute_recommendations(interactions, similarity, per_user, user_index, user_vectors)),
+    )
+    RecommendationState.objects.all().delete()
+
+    return {
+        'users': len(interactions.user_ids),
+        'courses': len(interactions.course_ids),
+        'interactions': interactions.matrix.nnz,
+        'similarities': similarity_count,
+        'recommendations': recommendation_count,
+    }
+
+
+# * |--------------------------------------------------------------------------
+# * | Actualizaciones incrementales
+# * |--------------------------------------------------------------------------
+
+def apply_cooccurrence_delta(old_row, new_row):
+    # Ajusta los productos escalares de los pares de cursos de la fila del usuario (|fila|^2 celdas como máximo)
+    courses = set(old_row) | set(new_row)
+    deltas = {}
+    for course_id in courses:
+        for other_id in courses:
+            delta = (
+                new_row.get(course_id, 0) * new_row.get(other_id, 0)
+                - old_row.get(course_id, 0) * old_row.get(other_id, 0)
+            )
+            if delta:
+                deltas[(course_id, other_id)] = delta
+    if not deltas:
+        return
+
+    existing = CourseCooccurrence.objects.filter(course_id__in=courses, other_course_id__in=courses)
+    to_update = []
+    for cell in existing:
+        delta = deltas.pop((cell.course_id, cell.other_course_id), None)
+        if delta is not None:
+            cell.value += delta
+            to_update.append(cell)
+    CourseCooccurrence.objects.bulk_update(to_update, ['value'])
+    CourseCooccurrence.objects.bulk_create([
+        CourseCooccurrence(course_id=course_id, other_course_id=other_id, value=delta)
+        for (course_id, other_id), delta in deltas.items()
+    ])
+    CourseCooccurrence.objects.filter(course_id__in=courses, value__lte=1e-9).delete()
+
+
+def refresh_course_neighbourhood(course_id, top_k=TOP_K_SIMILAR_COURSES):
+    # Recalcula los vecinos de un curso y su puntuación en los vecindarios que ya lo incluían
+    row = dict(CourseCooccurrence.objects.filter(course_id=course_id).values_list('other_course_id', 'value'))
+    own_norm = row.pop(course_id, 0)
+    norms = dict(
+        CourseCooccurrence.objects.filter(course_id__in=list(row), other_course_id=F('course_id'))
+        .values_list('course_id', 'value')
+    )
+    similarities = {
+        other_id: value / math.sqrt(own_norm * norms[other_id])
+        for other_id, value in row.items()
+        if own_norm > 0 and value > 0 and norms.get(other_id, 0) > 0
+    }
+
+    CourseSimilarity.objects.filter(course_id=course_id).delete()
+    CourseSimilarity.objects.bulk_create([
+        CourseSimilarity(course_id=course_id, similar_course_id=other_id, score=score)
+        for other_id, score in heapq.nlargest(top_k, similarities.items(), key=itemgetter(1))
+    ])
+
+    reverse = list(CourseSimilarity.objects.filter(similar_course_id=course_id))
+    for similarity in reverse:
+        similarity.score = similarities.get(similarity.course_id, 0)
+    CourseSimilarity.objects.bulk_update([similarity for similarity in reverse if similarity.score > 0], ['score'])
+    CourseSimilarity.objects.filter(id__in=[similarity.id for similarity in reverse if similarity.score <= 0]).delete()
+
+
+@transaction.atomic
+def update_user_interactions(user_id):
+    # Aplica un evento de un usuario: su fila, los vecindarios afectados y la marca de obsoleto
+    old_row = dict(CourseInteraction.objects.filter(user_id=user_id).values_list('course_id', 'weight'))
+    new_row = load_user_interactions(user_id)
+    if old_row == new_row:
+        return False
+
+    apply_cooccurrence_delta(old_row, new_row)
+
+    CourseInteraction.objects.filter(user_id=user_id).delete()
+    CourseInteraction.objects.bulk_create([
+        CourseInteraction(user_id=user_id, course_id=course_id, weight=weight)
+        for course_id, weight in new_row.items()
+    ])
+
+    changed = {course_id for course_id in set(old_row) | set(new_row) if old_row.get(course_id) != new_row.get(course_id)}
+    for course_id in changed:
+        refresh_course_neighbourhood(course_id)
+
+    RecommendationState.objects.update_or_create(user_id=user_id, defaults={'is_stale': True})
+    return True
+
+
+@transaction.atomic
+def refresh_user_recommendations(user_id, limit=RECOMMENDATIONS_PER_USER):
+    # Recalcula las recomendaciones de un usuario a partir de su fila y los vecinos de sus cursos
+    row = dict(CourseInteraction.objects.filter(user_id=user_id).values_list('course_id', 'weight'))
+    scores = defaultdict(float)
+    neighbours = CourseSimilarity.objects.filter(course_id__in=list(row)).values_list('course_id', 'similar_course_id', 'score')
+    for course_id, similar_id, score in neighbours:
+        if similar_id not in row:
+            scores[similar_id] += row[course_id] * score
+    for course_id, score in similar_user_scores(user_id, row).items():
+        if course_id not in row:
+            scores[course_id] += score
+    ranked = heapq.nlargest(limit, ((course_id, score) for course_id, score in scores.items() if score > 0), key=itemgetter(1))
+
+    CourseRecommendation.objects.filter(user_id=user_id).delete()
+    CourseRecommendation.objects.bulk_create(iter_recommendation_rows([(user_id, ranked)]))
+    RecommendationState.objects.update_or_create(user_id=user_id, defaults={'is_stale': False})
+
+
+def recommend_courses_for_user(user, limit=2):
+    # Lectura de las recomendaciones ya calculadas; si el usuario está marcado como obsoleto se recalculan antes
+    if RecommendationState.objects.filter(user=user, is_stale=True).exists():
+        refresh_user_recommendations(user.id)
+
+    recommendations = (
+        CourseRecommendation.objects.filter(user=user)
+        .select_related('course__stats', 'course__profile_teacher__user')
+        .order_by('rank')[:limit]
+    )
+    return [recommendation.course for recommendation in recommendations]
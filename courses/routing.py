@@ -0,0 +1,7 @@
+from django.urls import path
+
+from courses.consumers import ChatbotConsumer
+
+websocket_urlpatterns = [
+    path('ws/courses/chatbot/', ChatbotConsumer.as_asgi()),
+]
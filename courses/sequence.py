@@ -0,0 +1,125 @@
+from django.db import transaction
+
+from courses.models import CourseUser, Lesson, LessonCompletion
+from courses.outline import invalidate_course_outline
+
+# * |--------------------------------------------------------------------------
+# * | Secuencia de lecciones y mapa de bits de lecciones completadas
+# * |--------------------------------------------------------------------------
+#
+# Lesson.ordinal es la posición de la lección en todo el curso (orden del módulo,
+# orden de la lección, id). CourseUser.completion_bitmap guarda un bit por ordinal,
+# así que el progreso, la siguiente lección y "es la última" salen del propio
+# CourseUser sin consultar LessonCompletion.
+#
+# Cuando cambia la estructura del curso se recalculan los ordinales y los mapas
+# de bits de sus inscripciones (resequence_course, desde courses/signals.py).
+
+
+def has_bit(bitmap, index):
+    byte = index // 8
+    return byte < len(bitmap) and bool(bitmap[byte] & (1 << (index % 8)))
+
+
+def set_bit(bitmap, index):
+    bitmap = bytearray(bitmap)
+    if index // 8 >= len(bitmap):
+        bitmap.extend(b'\x00' * (index // 8 + 1 - len(bitmap)))
+    bitmap[index // 8] |= 1 << (index % 8)
+    return bytes(bitmap)
+
+
+def clear_bit(bitmap, index):
+    if not has_bit(bitmap, index):
+        return bytes(bitmap)
+    bitmap = bytearray(bitmap)
+    bitmap[index // 8] &= ~(1 << (index % 8)) & 0xFF
+    return bytes(bitmap.rstrip(b'\x00'))
+
+
+def count_bits(bitmap):
+    return bin(int.from_bytes(bytes(bitmap), 'little')).count('1')
+
+
+def first_missing(bitmap, total):
+    # Primer ordinal < total sin completar, o None si están todos
+    value = int.from_bytes(bytes(bitmap), 'little')
+    index = (~value & (value + 1)).bit_length() - 1
+    return index if index < total else None
+
+
+def bitmap_of(ordinals):
+    value = 0
+    for ordinal in ordinals:
+        value |= 1 << ordinal
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def course_lessons_in_order(course_id):
+    return Lesson.objects.filter(module__course_id=course_id).order_by('module__order', 'module_id', 'order', 'id')
+
+
+@transaction.atomic
+def rebuild_completion_bitmaps(course_id):
+    completed = {}
+    for course_user_id, ordinal in LessonCompletion.objects.filter(
+        course_user__course_id=course_id,
+        lesson__module__course_id=course_id,
+        finished_at__isnull=False,
+    ).values_list('course_user_id', 'lesson__ordinal'):
+        completed.setdefault(course_user_id, []).append(ordinal)
+
+    enrollments = list(CourseUser.objects.filter(course_id=course_id).only('id', 'completion_bitmap'))
+    for course_user in enrollments:
+        course_user.completion_bitmap = bitmap_of(completed.get(course_user.id, ()))
+    # bulk_update no dispara las señales de CourseUser (estadísticas y recomendador)
+    CourseUser.objects.bulk_update(enrollments, ['completion_bitmap'], batch_size=500)
+
+
+@transaction.atomic
+def resequence_course(course_id):
+    lessons = list(course_lessons_in_order(course_id).only('id', 'ordinal'))
+    changed = []
+    for ordinal, lesson in enumerate(lessons):
+        if lesson.ordinal != ordinal:
+            lesson.ordinal = ordinal
+            changed.append(lesson)
+    if changed:
+        Lesson.objects.bulk_update(changed, ['ordinal'], batch_size=500)
+    # También si no cambia ningún ordinal: al borrar la última lección su bit tiene que desaparecer
+    rebuild_completion_bitmaps(course_id)
+    invalidate_course_outline(course_id)
+
+
+@transaction.atomic
+def update_completion_bit(course_user_id, lesson_id, completed):
+    ordinal = Lesson.objects.filter(id=lesson_id).values_list('ordinal', flat=True).first()
+    course_user = CourseUser.objects.select_for_update().filter(id=course_user_id).only('id', 'completion_bitmap').first()
+    if ordinal is None or course_user is None:
+        return
+    bitmap = bytes(course_user.completion_bitmap)
+    updated = set_bit(bitmap, ordinal) if completed else clear_bit(bitmap, ordinal)
+    if updated != bitmap:
+        CourseUser.objects.filter(id=course_user_id).update(completion_bitmap=updated)
+
+
+@transaction.atomic
+def set_completion_bits(lessons_by_enrollment):
+    # Versión por lotes de update_completion_bit para el volcado de courses/completion_events.py
+    lesson_ids = {lesson_id for lesson_ids in lessons_by_enrollment.values() for lesson_id in lesson_ids}
+    ordinals = dict(Lesson.objects.filter(id__in=lesson_ids).values_list('id', 'ordinal'))
+    enrollments = list(
+        CourseUser.objects.select_for_update().filter(id__in=list(lessons_by_enrollment)).only('id', 'completion_bitmap')
+    )
+    changed = []
+    for course_user in enrollments:
+        bitmap = bytes(course_user.completion_bitmap)
+        updated = bitmap
+        for lesson_id in lessons_by_enrollment[course_user.id]:
+            if lesson_id in ordinals:
+                updated = set_bit(updated, ordinals[lesson_id])
+        if updated != bitmap:
+            course_user.completion_bitmap = updated
+            changed.append(course_user)
+    if changed:
+        CourseUser.objects.bulk_update(changed, ['completion_bitmap'], batch_size=500)
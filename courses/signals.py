@@ -0,0 +1,134 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from courses.models import Course, CourseUser, Lesson, LessonCompletion, Module, Review, WishListUser
+from courses.recommendations import update_user_interactions
+from courses.sequence import resequence_course, update_completion_bit
+from courses.stats import refresh_course_stats
+
+
+def schedule_course_stats_refresh(course_id):
+    # Se recalcula al confirmar la transacción para no recrear filas de un curso que se está borrando en cascada
+    transaction.on_commit(lambda: refresh_course_stats(course_id))
+
+
+def schedule_interaction_update(user_id):
+    # Actualiza solo la fila del usuario en el recomendador y marca sus recomendaciones como obsoletas
+    transaction.on_commit(lambda: update_user_interactions(user_id))
+
+
+def schedule_resequence(course_id):
+    # Ordinales de las lecciones y mapas de bits del curso, con la estructura ya confirmada
+    if course_id is not None:
+        transaction.on_commit(lambda: resequence_course(course_id))
+
+
+@receiver(post_save, sender=Course)
+def create_course_stats(sender, instance, created, **kwargs):
+    if created:
+        schedule_course_stats_refresh(instance.id)
+
+
+@receiver(post_save, sender=CourseUser)
+@receiver(post_delete, sender=CourseUser)
+def update_stats_on_enrollment(sender, instance, **kwargs):
+    schedule_course_stats_refresh(instance.course_id)
+    schedule_interaction_update(instance.user_id)
+
+
+@receiver(post_save, sender=WishListUser)
+@receiver(post_delete, sender=WishListUser)
+def update_stats_on_wishlist(sender, instance, **kwargs):
+    if instance.type_wish.name == 'Course':
+        schedule_course_stats_refresh(instance.id_wish)
+        schedule_interaction_update(instance.user_id)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_stats_on_review(sender, instance, **kwargs):
+    if instance.course_id:
+        schedule_course_stats_refresh(instance.course_id)
+        schedule_interaction_update(instance.user_id)
+
+
+# El progreso de lecciones llega al recomendador una vez por usuario y volcado desde
+# courses/completion_events.py (no en cada LessonCompletion); lo que no pase por ahí,
+# como los borrados en cascada, lo recoge el rebuild_recommendations periódico.
+
+
+@receiver(post_save, sender=LessonCompletion)
+def set_completion_bit(sender, instance, **kwargs):
+    update_completion_bit(instance.course_user_id, instance.lesson_id, instance.finished_at is not None)
+
+
+@receiver(post_delete, sender=LessonCompletion)
+def clear_completion_bit(sender, instance, **kwargs):
+    update_completion_bit(instance.course_user_id, instance.lesson_id, False)
+
+
+# Solo cambian los ordinales (y los mapas de bits) si cambia el orden, el contenedor o el
+# conjunto de lecciones: se recuerda el estado con el que se cargó cada objeto (post_init).
+# Con .only()/.defer() de esos campos no se conoce (None) y se recalcula al guardar.
+SEQUENCE_FIELDS = {
+    Module: ('course_id', 'order'),
+    Lesson: ('module_id', 'order'),
+}
+
+
+def sequence_state(instance):
+    return tuple(getattr(instance, field) for field in SEQUENCE_FIELDS[type(instance)])
+
+
+def sequence_changed(instance, created, update_fields):
+    previous = instance._sequence_state
+    instance._sequence_state = sequence_state(instance)
+    if created or previous is None:
+        return True, previous
+    if update_fields is not None:
+        # update_fields usa el nombre del campo ('module'), no la columna ('module_id')
+        names = {field[:-3] if field.endswith('_id') else field for field in SEQUENCE_FIELDS[type(instance)]}
+        if not names & set(update_fields):
+            return False, previous
+    return previous != instance._sequence_state, previous
+
+
+@receiver(post_init, sender=Module)
+@receiver(post_init, sender=Lesson)
+def remember_sequence_state(sender, instance, **kwargs):
+    if instance.pk is not None and set(SEQUENCE_FIELDS[sender]) & instance.get_deferred_fields():
+        instance._sequence_state = None
+    else:
+        instance._sequence_state = sequence_state(instance)
+
+
+@receiver(post_save, sender=Module)
+def resequence_on_module_save(sender, instance, created, update_fields=None, **kwargs):
+    changed, previous = sequence_changed(instance, created, update_fields)
+    if changed:
+        schedule_resequence(instance.course_id)
+        if previous is not None and previous[0] != instance.course_id:
+            schedule_resequence(previous[0])
+
+
+@receiver(post_delete, sender=Module)
+def resequence_on_module_delete(sender, instance, **kwargs):
+    schedule_resequence(instance.course_id)
+
+
+@receiver(post_save, sender=Lesson)
+def resequence_on_lesson_save(sender, instance, created, update_fields=None, **kwargs):
+    changed, previous = sequence_changed(instance, created, update_fields)
+    if not changed:
+        return
+    # Si la lección cambia de módulo también hay que renumerar el curso del módulo anterior
+    module_ids = {instance.module_id} | ({previous[0]} if previous is not None else set())
+    for course_id in set(Module.objects.filter(id__in=module_ids).values_list('course_id', flat=True)):
+        schedule_resequence(course_id)
+
+
+@receiver(post_delete, sender=Lesson)
+def resequence_on_lesson_delete(sender, instance, **kwargs):
+    course_id = Module.objects.filter(id=instance.module_id).values_list('course_id', flat=True).first()
+    schedule_resequence(course_id)
@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from courses.models import Course, CourseStats, CourseUser, Review, WishListUser
+
+# * |--------------------------------------------------------------------------
+# * | Course Stats (tabla desnormalizada courses.CourseStats)
+# * |--------------------------------------------------------------------------
+
+STATS_FIELDS = (
+    'enrolled_users_count',
+    'completed_users_count',
+    'wishlist_count',
+    'reviews_count',
+    'rating_sum',
+)
+
+
+def compute_course_stats(course_ids=None):
+    # Calcula los contadores de los cursos indicados (o de todos) con tres consultas agrupadas
+    if course_ids is None:
+        course_ids = list(Course.objects.values_list('id', flat=True))
+    course_ids = list(course_ids)
+
+    stats = {course_id: dict.fromkeys(STATS_FIELDS, 0) for course_id in course_ids}
+    if not stats:
+        return stats
+
+    enrolled = (
+        CourseUser.objects.filter(course_id__in=course_ids)
+        .values('course_id')
+        .annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status__name='completed')),
+        )
+    )
+    for row in enrolled:
+        stats[row['course_id']]['enrolled_users_count'] = row['total']
+        stats[row['course_id']]['completed_users_count'] = row['completed']
+
+    wishlist = (
+        WishListUser.objects.filter(type_wish__name='Course', id_wish__in=course_ids)
+        .values('id_wish')
+        .annotate(total=Count('id'))
+    )
+    for row in wishlist:
+        stats[row['id_wish']]['wishlist_count'] = row['total']
+
+    reviews = (
+        Review.objects.filter(course_id__in=course_ids)
+        .values('course_id')
+        .annotate(total=Count('id'), rating_sum=Sum('rating'))
+    )
+    for row in reviews:
+        stats[row['course_id']]['reviews_count'] = row['total']
+        stats[row['course_id']]['rating_sum'] = row['rating_sum'] or 0
+
+    return stats
+
+
+def refresh_course_stats(course_id):
+    # Recalcula la fila de un único curso (usado por las señales)
+    values = compute_course_stats([course_id]).get(course_id)
+    if values is None or not Course.objects.filter(id=course_id).exists():
+        return None
+    course_stats, _ = CourseStats.objects.update_or_create(course_id=course_id, defaults=values)
+    return course_stats
+
+
+def get_course_stats(course):
+    # Devuelve las estadísticas del curso; si la fila aún no existe se crea al vuelo
+    try:
+        return course.stats
+    except CourseStats.DoesNotExist:
+        return refresh_course_stats(course.id)
+
+
+@transaction.atomic
+def rebuild_course_stats():
+    # Reconstruye la tabla entera desde cero
+    stats = compute_course_stats()
+    CourseStats.objects.all().delete()
+    CourseStats.objects.bulk_create(
+        [CourseStats(course_id=course_id, **values) for course_id, values in stats.items()],
+        batch_size=500,
+    )
+    return len(stats)
+
+
+def find_course_stats_drift():
+    # Compara la tabla con los valores reales y devuelve {course_id: {campo: (guardado, real)}}
+    expected = compute_course_stats()
+    stored = {row['course_id']: row for row in CourseStats.objects.values('course_id', *STATS_FIELDS)}
+
+    drift = {}
+    for course_id, values in expected.items():
+        row = stored.get(course_id)
+        if row is None:
+            drift[course_id] = {field: (None, value) for field, value in values.items()}
+            continue
+        diff = {field: (row[field], value) for field, value in values.items() if row[field] != value}
+        if diff:
+            drift[course_id] = diff
+    return drift
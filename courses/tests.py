@@ -1,3 +1,63 @@
-from django.test import TestCase
+import importlib.util
+import json
+import os
+import unittest
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase
+from nltk import word_tokenize
+from nltk.stem import WordNetLemmatizer
+
+from courses.chatbot_numpy import NumpyChatbotModel, pad_sequences
+from courses.chatbot_runtime import KerasChatbotModel, get_chatbot_dir
+
+KERAS_FILES = ('chatbot_model.keras', 'tokenizer.pickle', 'label_encoder.pickle')
+
+
+def chatbot_files_exist():
+    chatbot_dir = get_chatbot_dir()
+    return NumpyChatbotModel.exists(chatbot_dir) and all(
+        os.path.exists(os.path.join(chatbot_dir, name)) for name in KERAS_FILES
+    )
+
+
+@unittest.skipUnless(importlib.util.find_spec('tensorflow'), "TensorFlow is not installed")
+class ChatbotNumpyParityTests(SimpleTestCase):
+    # Misma comprobación que courses/chatbot/export_numpy.py, sobre los artefactos desplegados
+
+    def setUp(self):
+        if not chatbot_files_exist():
+            self.skipTest("Chatbot model artifacts are missing (run salaentreno.py and export_numpy.py)")
+        chatbot_dir = get_chatbot_dir()
+        self.keras_model = KerasChatbotModel.load(chatbot_dir)
+        self.numpy_model = NumpyChatbotModel.load(chatbot_dir)
+
+        lemmatizer = WordNetLemmatizer()
+        with open(os.path.join(chatbot_dir, 'intents.json')) as handle:
+            intents = json.load(handle)
+        self.sentences, self.labels = [], []
+        for intent in intents['intents']:
+            for pattern in intent['patterns']:
+                tokens = word_tokenize(pattern.lower())
+                self.sentences.append(' '.join(lemmatizer.lemmatize(token) for token in tokens))
+                self.labels.append(intent['tag'])
+
+    def predict(self, model):
+        padded = pad_sequences(model.texts_to_sequences(self.sentences), maxlen=model.max_len)
+        probabilities = model.predict(padded)
+        return probabilities, [model.classes[index] for index in np.argmax(probabilities, axis=1)]
+
+    def test_numpy_backend_matches_keras_predictions(self):
+        keras_probabilities, keras_tags = self.predict(self.keras_model)
+        numpy_probabilities, numpy_tags = self.predict(self.numpy_model)
+
+        self.assertEqual(numpy_tags, keras_tags)
+        self.assertLess(np.abs(keras_probabilities - numpy_probabilities).max(), 1e-4)
+
+    def test_numpy_backend_keeps_keras_accuracy(self):
+        _, keras_tags = self.predict(self.keras_model)
+        _, numpy_tags = self.predict(self.numpy_model)
+
+        keras_accuracy = np.mean([tag == label for tag, label in zip(keras_tags, self.labels)])
+        numpy_accuracy = np.mean([tag == label for tag, label in zip(numpy_tags, self.labels)])
+        self.assertGreaterEqual(numpy_accuracy, keras_accuracy)
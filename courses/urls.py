@@ -66,4 +66,5 @@ urlpatterns = [
 
     # ----------- Chatbot URL patterns --------------
     path('courses/chatbot/', chat_view, name='chatbot'),
+    path('courses/chatbot/metrics/', chat_metrics_view, name='chatbot-metrics'),
 ]
\ No newline at end of file
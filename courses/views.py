@@ -7,8 +7,14 @@ from django.db.models import Prefetch, Sum
 from django.core.paginator import Paginator
 from courses.models import *
 from courses.forms import *
-import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
+from courses.stats import get_course_stats
+from courses.catalog import catalog_ordering, catalog_page, catalog_queryset
+from courses.outline import get_course_outline, invalidate_course_outline
+from courses.sequence import first_missing, has_bit, set_bit
+from courses.completion_events import flush_lesson_completions, pending_lessons, record_lesson_completion
+from courses.progress import get_course_user_with_progress, progress_percentage, with_progress
+from search.index import search_queryset
+from courses.recommendations import recommend_courses_for_user, similar_courses_for_course
 from django.db.models import Q
 
 # * |--------------------------------------------------------------------------
@@ -26,7 +32,8 @@ def group_required(group_name):
     def decorator(view_func):
         def wrapper(request, *args, **kwargs):
             user = request.user
-            if not user.groups.filter(name=group_name).exists():
+            # request.roles lo carga RolesMiddleware una vez por petición (cacheado en sesión)
+            if group_name not in request.roles:
                 return render(request, 'role_management/access_denied.html', {
                     'message': 'You do not have permission to access this page.',
                 })
@@ -38,230 +45,98 @@ def group_required(group_name):
         return wrapper
     return decorator
 
-def create_interaction_matrix():
-    users = User.objects.all()
-    courses = Course.objects.all()
-
-    # Crear un DataFrame vacío con usuarios como índices y cursos como columnas
-    matrix = pd.DataFrame(0, index=[user.id for user in users], columns=[course.id for course in courses])
-
-    wishlist = WishListUser.objects.filter(type_wish__name = 'Course')
-    # Llenar la matriz con datos de WishlistUser
-    for wish in wishlist: 
-        user_id = wish.user.id
-        course_id = wish.id_wish
-        if course_id in matrix.columns:
-            matrix.at[user_id, course_id] = 1
-
-    return matrix
-
-def recommend_courses_for_user(request, interaction_matrix, user_similarity_df):
-    # Obtener el ID del usuario actual
-    user_id = request.user.id
-
-    # Obtener los cursos ya valorados por el usuario actual
-    already_rated = interaction_matrix.loc[user_id]
-    already_rated = already_rated[already_rated > 0].index
-
-    # Obtener las similitudes del usuario actual con otros usuarios
-    similar_users = user_similarity_df[user_id]
-
-    # Ponderar las interacciones de otros usuarios por la similitud
-    weighted_scores = interaction_matrix.T.dot(similar_users)
-
-    # Normalizar por las similitudes totales
-    similarity_sums = similar_users.sum()
-    recommendations = weighted_scores / similarity_sums
-
-    # Ordenar las recomendaciones en orden descendente
-    recommendations_sorted = recommendations.sort_values(ascending=False)
-
-    # Excluir los cursos que el usuario ya ha valorado
-    recommendations_sorted = recommendations_sorted.drop(already_rated, errors='ignore')
-
-    recommended_courses = recommendations_sorted.head(2).index.tolist()
-
-    # Devolver los dos mejores cursos recomendados
-    return Course.objects.filter(id__in=recommended_courses)
-
-
 # * |--------------------------------------------------------------------------
 # * | Course Views
 # * |--------------------------------------------------------------------------
 
 
 def courses_list_view(request):
-    # Obtener todos los cursos activos
+    # Cursos activos filtrados, anotados y paginados por cursor en la base de datos (courses/catalog.py)
     query = request.GET.get('query','')
-    courses = Course.objects.filter(is_active=True)
-
-    courses = courses.filter(
-    Q(title__icontains=query) | 
-    Q(description__icontains=query) | 
-    Q(hardskills__name_hard_skill__icontains=query)
-    )
-
-    completed_courses = []
-    for course in courses:
-        # Contar los usuarios que han completado el curso
-        completed_users_count = course.enrolled_users.filter(status__name="completed").count()
-
-        # Contar las veces que el curso ha sido añadido a la wishlist
-        course_wishlist_count = WishListUser.objects.filter(type_wish__name="Course", id_wish=course.id).count()
-
-        #Contar las reviews que tiene el curso
-        course_reviews_count = course.reviews.count()
-
-        reviews = course.reviews.all()
-        if reviews.exists():
-            average_rating = reviews.aggregate(Avg('rating'))['rating__avg']
-
-        else:
-            average_rating = 0  # Si no hay calificaciones, el promedio es 0
-
-        # Agregar el curso y los resultados de los contadores a la lista
-        completed_courses.append({
-            'course': course,
-            'completed_users_count': completed_users_count,
-            'course_wishlist_count': course_wishlist_count,
-            'course_reviews_count': course_reviews_count,
-            'average_rating': round(average_rating, 1)
-        })
-
-    paginator = Paginator(completed_courses, 9)
-    page_number = request.GET.get('page')  # Obtén el número de página actual
-    page_obj = paginator.get_page(page_number)
+    courses = catalog_queryset(query)
+    page_obj = catalog_page(courses, request.GET, catalog_ordering(query))
 
     recommended_context = None
     if request.user.is_authenticated:
-        # Crear la matriz de interacción
-        interaction_matrix = create_interaction_matrix()
-        
-        # Calcular la similitud entre usuarios
-        user_similarity = cosine_similarity(interaction_matrix)
-        user_similarity_df = pd.DataFrame(user_similarity, index=interaction_matrix.index, columns=interaction_matrix.index)
-
-        # Obtener las recomendaciones para el usuario actual
-        recommended_courses = recommend_courses_for_user(request, interaction_matrix, user_similarity_df)
+        # Obtener las recomendaciones precalculadas para el usuario actual (manage.py rebuild_recommendations)
+        recommended_courses = recommend_courses_for_user(request.user)
 
         # Inicializar el diccionario para almacenar la información de wishlist, completados y promedio de reseñas
         recommended_context = []
 
         # Iterar sobre los cursos recomendados
         for course in recommended_courses:
-            # Obtener el recuento de WishListUser para cada curso
-            wishlist_count = WishListUser.objects.filter(type_wish__name='Course', id_wish=course.id).count()
-            
-            # Obtener las reseñas del curso
-            reviews = course.reviews.all()
-            if reviews.exists():
-                # Calcular el promedio de las reseñas
-                average_recommended = reviews.aggregate(Avg('rating'))['rating__avg']
-            else:
-                # Si no hay reseñas, establecer el promedio como 0
-                average_recommended = 0
-
-            # Obtener el número de usuarios que han completado el curso
-            completed_count = CourseUser.objects.filter(status__name='completed', course=course).count()
-
-            course_reviews_count = course.reviews.count()
+            course_stats = get_course_stats(course)
 
             # Agregar los resultados al diccionario recomendado_context
             recommended_context.append({
                 'recommended_course': course,
-                'wishlist_count': wishlist_count,
-                'completed_count': completed_count,
-                'average_recommended': average_recommended,
-                'course_reviews_count': course_reviews_count,
+                'wishlist_count': course_stats.wishlist_count,
+                'completed_count': course_stats.completed_users_count,
+                'average_recommended': course_stats.average_rating,
+                'course_reviews_count': course_stats.reviews_count,
             })
 
         # Pasar los datos al contexto para renderizarlos en el template
     return render(request, 'courses_list.html', {
         'page_obj': page_obj,
-        'total_courses': courses.count(),
         'recommended_context': recommended_context,
         'query': query,
     })
 
 def course_detail_view(request, course_id):
     course = get_object_or_404(
-        Course.objects.prefetch_related(
-            Prefetch("modules__lessons__resources"),
+        Course.objects.select_related('stats').prefetch_related(
             Prefetch("certificates"),
             Prefetch("reviews")
         ),
         id=course_id
     )
 
-    # Calcular estadísticas del curso
-    total_lessons = course.modules.aggregate(lesson_count=Count('lessons'))['lesson_count'] or 0
-    total_resources = course.modules.aggregate(
-        resource_count=Count('lessons__resources')
-    )['resource_count'] or 0
-
-    average_rating = course.reviews.aggregate(Avg('rating'))['rating__avg']
-    total_duration_minutes = course.modules.aggregate(
-        total_duration=Sum('lessons__duration')
-    )['total_duration'] or 0
+    # Temario, totales y duración desde la caché versionada del curso (courses/outline.py)
+    outline = get_course_outline(course)
 
-    # Formatear duración
-    hours = total_duration_minutes // 60
-    minutes = total_duration_minutes % 60
-    formatted_duration = f"{hours} hours {minutes} minutes"
-
-    completed_users_count = course.enrolled_users.filter(status__name="completed").count()
-    course_wishlist_count = WishListUser.objects.filter(type_wish__name="Course", id_wish=course.id).count()
-    course_reviews_count = course.reviews.count()
+    course_stats = get_course_stats(course)
+    average_rating = course_stats.average_rating
+    completed_users_count = course_stats.completed_users_count
+    course_wishlist_count = course_stats.wishlist_count
+    course_reviews_count = course_stats.reviews_count
 
     recommended_context = None
+    recommended_courses = []
 
     if request.user.is_authenticated:
-        # Crear la matriz de interacción y calcular similitudes
-        interaction_matrix = create_interaction_matrix()    
-        user_similarity = cosine_similarity(interaction_matrix)
-        user_similarity_df = pd.DataFrame(user_similarity, index=interaction_matrix.index, columns=interaction_matrix.index)
+        # Obtener las recomendaciones precalculadas para el usuario actual (manage.py rebuild_recommendations)
+        recommended_courses = recommend_courses_for_user(request.user)
 
-        # Obtener las recomendaciones para el usuario actual
-        recommended_courses = recommend_courses_for_user(request, interaction_matrix, user_similarity_df)
+    if not recommended_courses:
+        # Sin historial del usuario: cursos con hardskills/categoría parecidos según el índice ANN de contenido
+        recommended_courses = similar_courses_for_course(course.id)
 
+    if recommended_courses:
         # Inicializar el diccionario para almacenar la información de wishlist, completados y promedio de reseñas
         recommended_context = []
 
         # Iterar sobre los cursos recomendados
         for recommended_course in recommended_courses:
-            # Obtener el recuento de WishListUser para cada curso
-            wishlist_count = WishListUser.objects.filter(type_wish__name='Course', id=recommended_course.id).count()
-            
-            # Obtener las reseñas del curso
-            reviews = recommended_course.reviews.all()
-
-            if reviews.exists():
-                # Calcular el promedio de las reseñas
-                average_recommended = sum([review.rating for review in reviews]) / len(reviews)
-            else:
-                # Si no hay reseñas, establecer el promedio como 0
-                average_recommended = 0
-
-            # Obtener el número de usuarios que han completado el curso
-            completed_count = recommended_course.enrolled_users.filter(status__name='completed').count()
-
-            course_reviews_count = recommended_course.reviews.count()
+            recommended_stats = get_course_stats(recommended_course)
 
             # Agregar los resultados al diccionario recomendado_context
             recommended_context.append({
                 'recommended_course': recommended_course,
-                'wishlist_count': wishlist_count,
-                'completed_count': completed_count,
-                'average_recommended': average_recommended,
-                'course_reviews_count': course_reviews_count,
+                'wishlist_count': recommended_stats.wishlist_count,
+                'completed_count': recommended_stats.completed_users_count,
+                'average_recommended': recommended_stats.average_rating,
+                'course_reviews_count': recommended_stats.reviews_count,
             })
 
     context = {
         'course': course,
-        'total_lessons': total_lessons,
-        'total_resources': total_resources,
+        'outline': outline,
+        'total_lessons': outline['total_lessons'],
+        'total_resources': outline['total_resources'],
         'average_rating': average_rating,
-        'formatted_duration': formatted_duration,
+        'formatted_duration': outline['formatted_duration'],
         'recommended_context': recommended_context,
         'course_reviews_count': course_reviews_count,
         'average_rating': average_rating,
@@ -273,22 +148,32 @@ def course_detail_view(request, course_id):
 
 @login_required
 def course_user_list_view(request):
-    user_courses = CourseUser.objects.filter(user=request.user).select_related('course')
+    # Progreso de todas las inscripciones en una sola consulta agrupada (courses/progress.py)
+    user_courses = with_progress(
+        CourseUser.objects.filter(user=request.user).select_related('course', 'status')
+    )
+
+    # Lecciones completadas que siguen en el buffer de escritura. Solo suman las que aún no están
+    # en la base de datos: el lote que se está volcando aparece en los dos sitios hasta que termina.
+    user_courses = list(user_courses)
+    pending = {
+        course_user.id: pending_lessons(course_user.user_id, course_user.course_id) for course_user in user_courses
+    }
+    if any(pending.values()):
+        for course_user_id, lesson_id in LessonCompletion.objects.filter(
+            course_user_id__in=[course_user_id for course_user_id, lesson_ids in pending.items() if lesson_ids],
+            lesson_id__in=set().union(*pending.values()),
+            finished_at__isnull=False,
+        ).values_list('course_user_id', 'lesson_id'):
+            pending[course_user_id].discard(lesson_id)
 
     user_courses_list = []
     for course_user in user_courses:
-        total_lessons = Lesson.objects.filter(module__course=course_user.course).count()
-        completed_lessons = LessonCompletion.objects.filter(course_user=course_user, finished_at__isnull=False).count()
-
-        if total_lessons > 0:
-            progress_percentage = (completed_lessons / total_lessons) * 100
-        else:
-            progress_percentage = 0
-
+        course_user.completed_lessons += len(pending[course_user.id])
         user_courses_list.append({
             "course": course_user.course,
             "status": course_user.status,
-            "progress": progress_percentage,
+            "progress": progress_percentage(course_user),
         })
 
     return render(request, 'user_course_list.html', {'user_courses_list': user_courses_list})
@@ -297,7 +182,6 @@ def course_user_list_view(request):
 def course_user_detail_view(request, course_id):
     course = get_object_or_404(
         Course.objects.prefetch_related(
-            Prefetch("modules__lessons__resources"),
             Prefetch("certificates"),
             Prefetch("reviews")
         ),
@@ -311,27 +195,27 @@ def course_user_detail_view(request, course_id):
 
     return render(request, 'user_course_detail.html', {
         'course': course,
-        'completed_lessons': set(completed_lessons),  # Convertir a conjunto para fácil verificación
+        'outline': get_course_outline(course),
+        # Convertir a conjunto para fácil verificación, junto con las completadas aún en el buffer
+        'completed_lessons': set(completed_lessons) | pending_lessons(request.user.id, course.id),
     })
 
 @login_required
 @group_required('teacher')
 def course_teacher_list_view(request):
     profile_teacher = getattr(request.user, 'profile_teacher', None)
-    teacher_courses = profile_teacher.courses.all()
+    teacher_courses = profile_teacher.courses.select_related('stats')
     
     # Agregamos los totales
     teacher_courses_list = []
     for course in teacher_courses:
-        total_users = course.enrolled_users.count()
-        total_completed = course.enrolled_users.filter(course=course, status__name="completed").count()
-        total_wishlist = WishListUser.objects.filter(type_wish__name="Course", id_wish=course.id).count()
+        course_stats = get_course_stats(course)
         
         teacher_courses_list.append({
             'course': course,
-            'total_users': total_users,
-            'total_completed': total_completed,
-            'total_wishlist': total_wishlist,
+            'total_users': course_stats.enrolled_users_count,
+            'total_completed': course_stats.completed_users_count,
+            'total_wishlist': course_stats.wishlist_count,
         })
     
     context = {
@@ -401,16 +285,15 @@ def course_delete_view(request, course_id):
 @group_required('freemium')
 def course_complete_view(request, course_id):
     course = get_object_or_404(Course, id=course_id)
-    course_user = CourseUser.objects.filter(user=request.user, course=course).first()
+    # Escribir los eventos pendientes antes de comprobar que están todas las lecciones
+    flush_lesson_completions()
+    course_user = get_course_user_with_progress(request.user, course)
 
     if not course_user:
         messages.error(request, "No estás inscrito en este curso.")
         return redirect('courses:course-detail', course_id=course_id)
 
-    total_lessons = Lesson.objects.filter(module__course=course).count()
-    completed_lessons = LessonCompletion.objects.filter(course_user=course_user, lesson__module__course=course, finished_at__isnull=False).count()
-
-    if total_lessons == completed_lessons:
+    if course_user.total_lessons == course_user.completed_lessons:
         course_user.status = Status.objects.get(name="completed")
         course_user.save()
         messages.success(request, "¡Has finalizado el curso!")
@@ -429,19 +312,18 @@ def course_teacher_detail_view(request, course_id):
     profile_teacher = request.user.profile_teacher
     course = get_object_or_404(
         profile_teacher.courses.prefetch_related(
-            Prefetch("modules__lessons__resources"),
             Prefetch("certificates"),
             Prefetch("reviews")
         ),
         id=course_id
     )
 
-    return render(request, "teacher_course_detail.html", {"course": course})
+    return render(request, "teacher_course_detail.html", {"course": course, "outline": get_course_outline(course)})
 
 @login_required
 def teacher_profile_create_or_update_view(request):
     user = request.user
-    if not user.groups.filter(name='teacher').exists():
+    if 'teacher' not in request.roles:
         return render(request, 'role_management/access_denied.html', {
             'message': 'You do not have permission to access this page.',
         })
@@ -488,6 +370,7 @@ def module_create_or_update_view(request, course_id=None, module_id=None):
             module = form.save(commit=False)
             module.course = course
             module.save()
+            invalidate_course_outline(course.id)
 
             # Mensaje de éxito
             messages.success(request, "El módulo ha sido guardado correctamente.")
@@ -518,27 +401,25 @@ def lesson_detail_view(request, course_id, module_id, lesson_id):
 
     resources = lesson.resources.all()
 
-    # Registrar la lección como iniciada
-    lesson_completion, created = LessonCompletion.objects.get_or_create(course_user=course_user, lesson=lesson)
-    if created:
-        lesson_completion.finished_at = timezone.now()
-        lesson_completion.save()
+    # Mapa de bits guardado + eventos del usuario aún en el buffer (courses/completion_events.py)
+    sequence = get_course_outline(course)['sequence']
+    ordinals = {item['id']: ordinal for ordinal, item in enumerate(sequence)}
+    pending = pending_lessons(course_user.user_id, course_user.course_id)
+    completion_bitmap = bytes(course_user.completion_bitmap)
+    for pending_lesson_id in pending:
+        if pending_lesson_id in ordinals:
+            completion_bitmap = set_bit(completion_bitmap, ordinals[pending_lesson_id])
 
-    # Total de lecciones del curso y lecciones completadas
-    total_lessons = Lesson.objects.filter(module__course=course).count()
-    completed_lessons = LessonCompletion.objects.filter(
-        course_user=course_user, finished_at__isnull=False
-    ).count()
-
-    # Determinar la siguiente lección no completada
-    next_lesson = (
-        Lesson.objects.filter(module__course=course)
-        .exclude(id__in=LessonCompletion.objects.filter(course_user=course_user, finished_at__isnull=False).values_list('lesson__id', flat=True))
-        .order_by('id')
-        .first()
-    )
+    # Registrar la lección como completada (se escribe por lotes; solo si es nueva)
+    if not has_bit(completion_bitmap, lesson.ordinal) and lesson.id not in pending:
+        record_lesson_completion(course_user, lesson.id)
+        completion_bitmap = set_bit(completion_bitmap, lesson.ordinal)
 
-    is_last_lesson = next_lesson is None and total_lessons == completed_lessons
+    # Siguiente lección sin completar según la secuencia del curso y el mapa de bits (courses/sequence.py)
+    next_ordinal = first_missing(completion_bitmap, len(sequence))
+    next_lesson = sequence[next_ordinal] if next_ordinal is not None else None
+
+    is_last_lesson = next_lesson is None
 
     context = {
         'course': course,
@@ -573,6 +454,7 @@ def lesson_create_or_update_view(request, course_id=None, module_id=None, lesson
             lesson = form.save(commit=False)
             lesson.module = module
             lesson.save()
+            invalidate_course_outline(course.id)
 
             # Mensaje de éxito
             messages.success(request, "La lección se ha guardado correctamente.")
@@ -610,6 +492,7 @@ def resource_course_create_or_update_view(request, course_id=None, module_id=Non
             resource = form.save(commit=False)
             resource.lesson = lesson
             resource.save()
+            invalidate_course_outline(course.id)
 
             # Mensaje de éxito
             messages.success(request, "El recurso se ha guardado correctamente.")
@@ -633,6 +516,7 @@ def resource_course_create_or_update_view(request, course_id=None, module_id=Non
 def module_delete_view(request, course_id, module_id):
     module = get_object_or_404(Module, id=module_id, course=course_id)
     module.delete()
+    invalidate_course_outline(course_id)
     messages.success(request, "El módulo se ha eliminado correctamente.")
     return redirect('courses:teacher-course-detail', course_id=course_id)
 
@@ -647,6 +531,7 @@ def lesson_delete_view(request, course_id, module_id, lesson_id):
     )
 
     lesson.delete()
+    invalidate_course_outline(course_id)
     messages.success(request, "La lección se ha eliminado correctamente.")
     return redirect('courses:teacher-course-detail', course_id=course_id)
 
@@ -659,8 +544,8 @@ def resources_list_view(request):
     resource_type = WishListType.objects.get(name="Resource")
     query = request.GET.get('query', '')
 
-    if query:
-        resources = resources.filter(Q(name__icontains=query) | Q(hardskill_icontains=query))
+    # Búsqueda por nombre y hardskills en el índice de texto completo, ordenada por relevancia
+    resources = search_queryset('resource', resources, query)
 
     resources_list = []
     for resource in resources:
@@ -695,6 +580,7 @@ def resource_course_delete_view(request, course_id, module_id, lesson_id, resour
     )
     
     resource.delete()
+    invalidate_course_outline(course_id)
     messages.success(request, "El Recurso se ha eliminado correctamente.")
     return redirect('courses:teacher-course-detail', course_id=course_id)
 
@@ -787,55 +673,17 @@ def create_or_update_course_review_view(request, course_id, review_id=None):
 
 # ------------- Imports Chatbot ---------------
 
-import os
-import json
-import numpy as np
-import pickle
-from django.shortcuts import render
-from keras.models import load_model # type: ignore
-from keras.preprocessing.sequence import pad_sequences # type: ignore
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
 from django.http import JsonResponse
+from courses.chatbot_runtime import ChatbotBusy, chatbot_metrics, get_chatbot_runtime
 
 # ------------- Funciones Chatbot ---------------
 
-def load_chatbot_resourses():
-    lemmatizer = WordNetLemmatizer()
-    model = load_model('courses/chatbot/chatbot_model.keras')
-    with open('courses/chatbot/tokenizer.pickle', 'rb') as handle:
-        tokenizer = pickle.load(handle)
-    with open('courses/chatbot/label_encoder.pickle', 'rb') as handle:
-        label_encoder = pickle.load(handle)
-    with open('courses/chatbot/intents.json') as file:
-        intents = json.load(file)
-    return lemmatizer, model, tokenizer, intents, label_encoder
-
-def preprocess_message(message, lemmatizer):
-    # Tokenizar el mensaje en palabras
-    tokens = word_tokenize(message.lower())
-
-    # Lematizar cada token
-    lemmatized_tokens = [lemmatizer.lemmatize(token) for token in tokens]
-
-    # Reconstruir el texto después de la lematización
-    return ' '.join(lemmatized_tokens)
+def preprocess_message(message):
+    return get_chatbot_runtime().preprocess(message)
 
 def get_chatbot_response(message):
-    lemmatizer, model, tokenizer, intents, label_encoder = load_chatbot_resourses()
-    
-    processed_message = preprocess_message(message, lemmatizer)
-    input_sequence = tokenizer.texts_to_sequences([processed_message])
-    input_padded = pad_sequences(input_sequence, maxlen=model.input_shape[1])  # Normalizar longitud
-    predictions = model.predict(input_padded)
-
-    predicted_label = label_encoder.inverse_transform([np.argmax(predictions)])
-
-    for intent in intents['intents']:
-        if intent['tag'] == predicted_label[0]:
-            return np.random.choice(intent.get('responses', ["Pedro","No entiendo"]))
-
-    return "Lo siento, no entiendo tu mensaje."
+    # El modelo y los recursos se cargan una vez por proceso (courses/chatbot_runtime.py)
+    return get_chatbot_runtime().respond(message)
 
 # ------------- Chatbot Views ---------------
 
@@ -845,8 +693,16 @@ def chat_view(request):
         if not user_message:
             response = "Por favor, escribe un mensaje válido."
         else:
-            response = get_chatbot_response(user_message)
+            try:
+                response = get_chatbot_response(user_message)
+            except ChatbotBusy:
+                response = "El chatbot está muy ocupado ahora mismo, inténtalo de nuevo en unos segundos."
         return JsonResponse({'response': response})
     return render(request, 'chatbot.html')
 
-
+@login_required
+def chat_metrics_view(request):
+    # Profundidad de la cola, llenado de los lotes y aciertos de la caché del chatbot (solo staff)
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'forbidden'}, status=403)
+    return JsonResponse(chatbot_metrics())
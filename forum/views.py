@@ -2,10 +2,14 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from .models import Topic, Reply
 from .forms import TopicForm, ReplyForm
+from search.index import search_queryset
 
 def forum_home(request):
+    query = request.GET.get('q', '')
     topics = Topic.objects.all().order_by('-created_at')
-    return render(request, 'forum/home.html', {'topics': topics})
+    # Busca en el título y en las respuestas de cada topic (search/)
+    topics = search_queryset('topic', topics, query)
+    return render(request, 'forum/home.html', {'topics': topics, 'query': query})
 
 @login_required
 def create_topic(request):
@@ -1,9 +1,5 @@
-from gaming.models import DuckyCoin
+from user_management.header_data import lazy_header_value
 
 def user_duckycoins(request):
-    if request.user.is_authenticated:
-        try:
-            return {'user_duckycoins': request.user.duckycoins.balance}
-        except DuckyCoin.DoesNotExist:
-            return {'user_duckycoins': 0}
-    return {'user_duckycoins': None}
+    # Se evalúa solo si la plantilla usa user_duckycoins (user_management/header_data.py)
+    return {'user_duckycoins': lazy_header_value(request, 'duckycoins')}
@@ -1,9 +1,17 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
+from user_management.header_data import invalidate_header_data
 from .models import DuckyCoin
 
 @receiver(post_save, sender=User)
 def create_duckycoins(sender, instance, created, **kwargs):
     if created:
         DuckyCoin.objects.create(user=instance)
+
+
+@receiver(post_save, sender=DuckyCoin)
+def invalidate_header_duckycoins(sender, instance, **kwargs):
+    # El saldo de la cabecera se vuelve a leer en la siguiente petición
+    transaction.on_commit(lambda: invalidate_header_data(instance.user_id))
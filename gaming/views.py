@@ -4,13 +4,18 @@ from django.shortcuts import get_object_or_404, redirect
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from .models import DuckyCoin, DuckyCoinTransaction
+from user_management.pagination import paginate_by_cursor
+
+TRANSACTIONS_PER_PAGE = 20
 
 #http://127.0.0.1:8000/gaming/increment-coins/?amount=10&reason=Completed%20profile
 
 @login_required
 def transaction_list(request):
-    transactions = DuckyCoinTransaction.objects.filter(user=request.user).order_by('-timestamp')
-    return render(request, 'gaming/transaction_list.html', {'transactions': transactions})
+    transactions = DuckyCoinTransaction.objects.filter(user=request.user)
+    # Paginación por cursor sobre (timestamp, id)
+    page_obj = paginate_by_cursor(request, transactions, TRANSACTIONS_PER_PAGE, ('-timestamp', '-id'))
+    return render(request, 'gaming/transaction_list.html', {'transactions': page_obj.object_list, 'page_obj': page_obj})
 
 @login_required
 def increment_duckycoins(request):
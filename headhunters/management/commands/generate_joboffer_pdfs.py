@@ -0,0 +1,48 @@
+import os
+import time
+import zipfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from headhunters.models import JobOffer, ManagementCandidates
+from profile_cv.pdf import generate_cv_pdfs, pdf_metrics
+
+
+class Command(BaseCommand):
+    help = "Generate the CV PDFs of every candidate of a JobOffer through the PDF worker pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_offer_id', type=int)
+        parser.add_argument('--zip', metavar='PATH', help="Also bundle the generated PDFs into this zip file.")
+        parser.add_argument('--timeout', type=float, default=None, help="Seconds to wait for each PDF.")
+
+    def handle(self, *args, **options):
+        try:
+            job_offer = JobOffer.objects.get(id=options['job_offer_id'])
+        except JobOffer.DoesNotExist:
+            raise CommandError(f"JobOffer {options['job_offer_id']} does not exist")
+
+        profile_ids = list(
+            ManagementCandidates.objects.filter(job_offer=job_offer).values_list('candidate_id', flat=True).distinct()
+        )
+        started = time.perf_counter()
+        results = generate_cv_pdfs(profile_ids, timeout=options['timeout'])
+        elapsed = time.perf_counter() - started
+
+        generated = [result for result in results if 'path' in result]
+        for result in results:
+            if 'error' in result:
+                self.stdout.write(f"Profile {result['profile_id']}: {result['error']}")
+
+        if options['zip'] and generated:
+            with zipfile.ZipFile(options['zip'], 'w', zipfile.ZIP_DEFLATED) as archive:
+                for result in generated:
+                    archive.write(result['path'], f"candidate_{result['profile_id']}_cv_{result['user_cv_id']}.pdf")
+
+        metrics = pdf_metrics()
+        self.stdout.write(self.style.SUCCESS(
+            f"{job_offer}: {len(generated)}/{len(profile_ids)} PDF(s) in {elapsed:.2f}s "
+            f"(cache hits {metrics.get('cache_hits', 0)}, avg render {metrics.get('avg_render_ms', 0)}ms)"
+        ))
+        if options['zip'] and generated:
+            self.stdout.write(f"Zip written to {os.path.abspath(options['zip'])}")
@@ -7,6 +7,7 @@ from ..forms import HeadHunterForm
 from django.shortcuts import render,redirect,get_object_or_404
 from profile_cv.models import Profile_CV
 from django.views import View
+from user_management.pagination import CursorPaginationMixin
 
 
 
@@ -43,12 +44,13 @@ class HeadhunterDeleteView(DeleteView):
     success_url = reverse_lazy('headhunter_list')
     
     
-class LandingHeadHuntersView(ListView):
+class LandingHeadHuntersView(CursorPaginationMixin, ListView):
     model = Profile_CV
     template_name = 'headhunters/landing_headhunters.html'
     context_object_name = 'candidates'
-    #manejar la paginacion
+    #manejar la paginacion (por cursor sobre id, sin COUNT ni OFFSET)
     paginate_by = 9
+    cursor_ordering = ('id',)
     
 
     def get_queryset(self):
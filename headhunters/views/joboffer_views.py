@@ -16,10 +16,10 @@ class JobOfferListView(ListView):
     template_name = 'joboffers/joboffer_list.html'
     context_object_name = 'job_offers'
     def get_queryset(self):
-        groups = list(self.request.user.groups.all())
-        if 'premium' in [group.name for group in groups] or 'freemium' in [group.name for group in groups]:
+        roles = self.request.roles
+        if 'premium' in roles or 'freemium' in roles:
             return JobOffer.objects.all()
-        if 'headhunter' in [group.name for group in groups]:
+        if 'headhunter' in roles:
             headhunter = get_object_or_404(HeadHunterUser, user=self.request.user)
             return JobOffer.objects.filter(headhunter=headhunter)
 
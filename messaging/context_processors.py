@@ -1,8 +1,5 @@
-from .models import Message
+from user_management.header_data import lazy_header_value
 
 def unread_messages_count(request):
-    if request.user.is_authenticated:
-        unread_count = Message.objects.filter(recipient=request.user, is_read=False, is_active=True).count()
-    else:
-        unread_count = 0
-    return {'unread_messages_count': unread_count}
+    # Se evalúa solo si la plantilla usa unread_messages_count (user_management/header_data.py)
+    return {'unread_messages_count': lazy_header_value(request, 'unread_messages_count')}
@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Message, MessageCounter
+
+# * |--------------------------------------------------------------------------
+# * | Contador de mensajes no leídos (tabla desnormalizada messaging.MessageCounter)
+# * |--------------------------------------------------------------------------
+
+
+def compute_unread_counts(user_ids=None):
+    messages = Message.objects.filter(is_read=False, is_active=True)
+    if user_ids is not None:
+        messages = messages.filter(recipient_id__in=list(user_ids))
+    return {
+        row['recipient_id']: row['total']
+        for row in messages.values('recipient_id').annotate(total=Count('id'))
+    }
+
+
+def refresh_unread_count(user_id):
+    # Recalcula la fila de un único usuario (primer uso o contador perdido)
+    unread_count = compute_unread_counts([user_id]).get(user_id, 0)
+    MessageCounter.objects.update_or_create(user_id=user_id, defaults={'unread_count': unread_count})
+    return unread_count
+
+
+def adjust_unread_count(user_id, delta):
+    # Suma/resta en la base de datos (F) para no perder actualizaciones concurrentes.
+    # Si el usuario aún no tiene fila no se crea aquí: se calcula la primera vez que se lee.
+    counters = MessageCounter.objects.filter(user_id=user_id)
+    if delta < 0:
+        # Nunca por debajo de 0 (CHECK de PositiveIntegerField); lo corrige rebuild_message_counters
+        counters = counters.filter(unread_count__gte=-delta)
+    counters.update(unread_count=F('unread_count') + delta)
+
+
+def mark_message_read(message):
+    # UPDATE condicional: si dos peticiones abren el mismo mensaje a la vez, solo una lo marca
+    # y solo esa resta del contador. Devuelve True si este proceso lo ha marcado como leído.
+    marked = Message.objects.filter(pk=message.pk, is_read=False).update(is_read=True) == 1
+    if marked and message.is_active:
+        from user_management.header_data import invalidate_header_data
+
+        adjust_unread_count(message.recipient_id, -1)
+        transaction.on_commit(lambda: invalidate_header_data(message.recipient_id))
+    message.is_read = True
+    message._unread_state = (message.recipient_id, False)
+    return marked
+
+
+@transaction.atomic
+def rebuild_message_counters():
+    counts = compute_unread_counts()
+    MessageCounter.objects.all().delete()
+    MessageCounter.objects.bulk_create(
+        [MessageCounter(user_id=user_id, unread_count=unread_count) for user_id, unread_count in counts.items()],
+        batch_size=500,
+    )
+    return len(counts)
+
+
+def find_message_counter_drift():
+    # {user_id: (guardado, real)} para los contadores que no coinciden
+    expected = compute_unread_counts()
+    stored = dict(MessageCounter.objects.values_list('user_id', 'unread_count'))
+    drift = {}
+    for user_id in set(expected) | set(stored):
+        actual = expected.get(user_id, 0)
+        if stored.get(user_id, 0) != actual:
+            drift[user_id] = (stored.get(user_id), actual)
+    return drift
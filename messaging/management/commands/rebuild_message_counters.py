@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from messaging.counters import find_message_counter_drift, rebuild_message_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuild the unread MessageCounter table or check it for drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only compare the stored counters against the messages, without rewriting them.",
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = find_message_counter_drift()
+            if not drift:
+                self.stdout.write(self.style.SUCCESS("MessageCounter is in sync."))
+                return
+            for user_id, (stored, actual) in sorted(drift.items()):
+                self.stdout.write(f"User {user_id}: unread_count {stored} != {actual}")
+            raise CommandError(f"{len(drift)} user(s) with stale counters. Run rebuild_message_counters to fix them.")
+
+        total = rebuild_message_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt unread counters for {total} user(s)."))
@@ -17,3 +17,16 @@ class Message(models.Model):
 
 
 
+
+    @property
+    def counts_as_unread(self):
+        return self.is_active and not self.is_read
+
+
+class MessageCounter(models.Model):
+    # Mensajes no leídos (activos) de cada usuario, mantenido por las señales de messaging/signals.py
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="message_counter")
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} - {self.unread_count} unread"
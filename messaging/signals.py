@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from user_management.header_data import invalidate_header_data
+from .counters import adjust_unread_count, refresh_unread_count
+from .models import Message
+
+UNREAD_FIELDS = {'recipient_id', 'is_read', 'is_active'}
+
+
+def schedule_header_invalidation(user_id):
+    transaction.on_commit(lambda: invalidate_header_data(user_id))
+
+
+def unread_state(instance):
+    return instance.recipient_id, instance.counts_as_unread
+
+
+@receiver(post_init, sender=Message)
+def remember_unread_state(sender, instance, **kwargs):
+    # Estado con el que se cargó el mensaje, para saber en post_save si cambia el contador.
+    # Con .only()/.defer() de esos campos no se conoce (None) y se recalcula al guardar.
+    if instance.pk is None:
+        instance._unread_state = (None, False)
+    elif UNREAD_FIELDS & instance.get_deferred_fields():
+        instance._unread_state = None
+    else:
+        instance._unread_state = unread_state(instance)
+
+
+@receiver(post_save, sender=Message)
+def update_unread_count_on_save(sender, instance, **kwargs):
+    previous = instance._unread_state
+    current = unread_state(instance)
+    if previous is None:
+        refresh_unread_count(instance.recipient_id)
+        schedule_header_invalidation(instance.recipient_id)
+    elif previous != current:
+        previous_recipient_id, was_unread = previous
+        if was_unread:
+            adjust_unread_count(previous_recipient_id, -1)
+            schedule_header_invalidation(previous_recipient_id)
+        if instance.counts_as_unread:
+            adjust_unread_count(instance.recipient_id, 1)
+            schedule_header_invalidation(instance.recipient_id)
+    instance._unread_state = current
+
+
+@receiver(post_delete, sender=Message)
+def update_unread_count_on_delete(sender, instance, **kwargs):
+    # Sin estado conocido no se toca (la fila ya no existe para recargarla); lo corrige rebuild_message_counters
+    previous = instance._unread_state
+    if previous and previous[1]:
+        adjust_unread_count(previous[0], -1)
+        schedule_header_invalidation(previous[0])
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 
 from gaming.models import DuckyCoin
+from .counters import mark_message_read
 from .models import Message
 from django.http import JsonResponse
 from django.db.models import Q
@@ -97,9 +98,8 @@ def view_message(request, pk):
     message = get_object_or_404(Message, pk=pk)
 
     # Cambiar el estado a leído solo si el usuario es el destinatario
-    if message.recipient == request.user and not message.is_read:
-        message.is_read = True
-        message.save()
+    if message.recipient_id == request.user.id and not message.is_read:
+        mark_message_read(message)
 
     # Manejar el formulario de respuesta
     if request.method == "POST":
@@ -23,4 +23,5 @@ admin.site.register(Publication)
 admin.site.register(RecognitionAward)
 admin.site.register(User_cv)
 admin.site.register(Level)
-admin.site.register(UserCvRelation)
\ No newline at end of file
+admin.site.register(UserCvRelation)
+admin.site.register(UserCvSection)
\ No newline at end of file
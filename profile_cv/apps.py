@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProfileCvConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "profile_cv"
+
+    def ready(self):
+        import profile_cv.signals  # noqa
@@ -0,0 +1,119 @@
+import logging
+
+from django.db import transaction
+
+from .legacy import backfill_cv_sections, mirror_relations
+from .models import User_cv, UserCvSection
+from .sections import CV_SECTIONS, SECTION_CODES, SECTION_NAMES
+from .snapshots import bump_cv_versions
+
+logger = logging.getLogger(__name__)
+
+# * |--------------------------------------------------------------------------
+# * | Composición de un CV (secciones UserCvSection)
+# * |--------------------------------------------------------------------------
+#
+# Cada sección seleccionada en el formulario del CV es una lista de ids (checkboxes
+# con el nombre de la sección). Se validan con una consulta por sección (solo los
+# elementos del propio Profile_CV) y las filas se escriben con un único
+# bulk_create dentro de una transacción. Al actualizar solo se borran/crean/mueven
+# las filas que cambian.
+
+
+def parse_ids(values):
+    # Ids enteros sin repetir, en el orden en que llegan; lo que no es un número se ignora
+    ids = []
+    for value in values:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            continue
+        if value not in ids:
+            ids.append(value)
+    return ids
+
+
+def selected_ids(data):
+    return {section: parse_ids(data.getlist(section)) for section, _, _ in CV_SECTIONS}
+
+
+def validate_selection(profile_cv, selection):
+    # {sección: ids válidos}, {sección: ids rechazados (no existen o son de otro perfil)}
+    valid, rejected = {}, {}
+    for section, _, model in CV_SECTIONS:
+        ids = selection.get(section) or []
+        if ids:
+            found = set(model.objects.filter(profile_user=profile_cv, id__in=ids).values_list('id', flat=True))
+        else:
+            found = set()
+        valid[section] = [object_id for object_id in ids if object_id in found]
+        rejected[section] = [object_id for object_id in ids if object_id not in found]
+    return valid, rejected
+
+
+def current_relations(user_cv):
+    # {sección: {id del elemento: (id de la fila, posición)}} con una sola consulta
+    queryset = UserCvSection.objects.filter(user_cv=user_cv).values_list('id', 'section_type', 'object_id', 'position')
+    rows = list(queryset)
+    if not rows and backfill_cv_sections([user_cv.pk]):
+        # CV anterior a UserCvSection: se edita sobre lo copiado de UserCvRelation
+        rows = list(queryset.all())
+    relations = {section: {} for section, _, _ in CV_SECTIONS}
+    for row_id, section_type, object_id, position in rows:
+        relations[SECTION_NAMES[section_type]][object_id] = (row_id, position)
+    return relations
+
+
+def selected_from_relations(user_cv):
+    # Lo que ya tiene el CV, en el formato de la plantilla del formulario ({sección: set de ids})
+    return {section: set(objects) for section, objects in current_relations(user_cv).items()}
+
+
+@transaction.atomic
+def compose_user_cv(user_cv, profile_cv, selection):
+    # Deja las secciones del CV iguales a la selección (en su orden); devuelve los contadores por sección
+    valid, rejected = validate_selection(profile_cv, selection)
+    existing = current_relations(user_cv)
+
+    to_create, to_move, to_delete, counts = [], [], [], {}
+    added_ids, removed_ids = {}, {}
+    for section, _, _ in CV_SECTIONS:
+        wanted = valid[section]
+        current = existing[section]
+        added = 0
+        for position, object_id in enumerate(wanted):
+            if object_id not in current:
+                to_create.append(UserCvSection(
+                    user_cv=user_cv, section_type=SECTION_CODES[section], object_id=object_id, position=position,
+                ))
+                added += 1
+            elif current[object_id][1] != position:
+                to_move.append(UserCvSection(id=current[object_id][0], position=position))
+        removed = [row_id for object_id, (row_id, _) in current.items() if object_id not in wanted]
+        to_delete.extend(removed)
+        added_ids[section] = [object_id for object_id in wanted if object_id not in current]
+        removed_ids[section] = [object_id for object_id in current if object_id not in wanted]
+        counts[section] = {
+            'selected': len(wanted),
+            'added': added,
+            'removed': len(removed),
+            'rejected': len(rejected[section]),
+        }
+
+    if to_delete:
+        UserCvSection.objects.filter(id__in=to_delete).delete()
+    if to_move:
+        UserCvSection.objects.bulk_update(to_move, ['position'], batch_size=500)
+    if to_create:
+        UserCvSection.objects.bulk_create(to_create, batch_size=500)
+    # Escritura doble mientras exista UserCvRelation (profile_cv/legacy.py)
+    mirror_relations(user_cv.pk, added_ids, removed_ids)
+    if to_create or to_move:
+        # bulk_create/bulk_update no envían post_save: nueva versión del contenido (profile_cv/snapshots.py)
+        bump_cv_versions(User_cv.objects.filter(pk=user_cv.pk))
+
+    logger.info(
+        "User_cv %s composed: %d added, %d moved, %d removed, %d rejected",
+        user_cv.pk, len(to_create), len(to_move), len(to_delete), sum(len(ids) for ids in rejected.values()),
+    )
+    return counts
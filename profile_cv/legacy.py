@@ -0,0 +1,91 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from .models import UserCvRelation, UserCvSection
+from .sections import CV_SECTIONS, SECTION_CODES
+
+# * |--------------------------------------------------------------------------
+# * | Transición UserCvRelation -> UserCvSection
+# * |--------------------------------------------------------------------------
+#
+# Mientras no se retire UserCvRelation:
+# - Un CV sin filas en UserCvSection se copia desde UserCvRelation la primera vez
+#   que se lee o se edita (backfill_cv_sections). Así nunca se pinta ni se cachea
+#   vacío un CV que aún no ha pasado por migrate_cv_sections.
+# - compose_user_cv escribe también en UserCvRelation (mirror_relations). La tabla
+#   antigua sigue completa: migrate_cv_sections --check cuadra y se puede volver atrás.
+
+COLUMNS = [f'{field}_id' for _, field, _ in CV_SECTIONS]
+FIELDS = {section: field for section, field, _ in CV_SECTIONS}
+
+
+def sections_from_relations(user_cv_ids):
+    # Filas UserCvSection equivalentes a las UserCvRelation de esos CV (posición = orden de creación)
+    rows, positions, seen = [], {}, set()
+    relations = (
+        UserCvRelation.objects.filter(user_cv_id__in=user_cv_ids)
+        .order_by('user_cv_id', 'id')
+        .values_list('user_cv_id', *COLUMNS)
+    )
+    for user_cv_id, *object_ids in relations:
+        for (section, _, _), object_id in zip(CV_SECTIONS, object_ids):
+            if object_id is None:
+                continue
+            key = (user_cv_id, SECTION_CODES[section], object_id)
+            if key in seen:
+                continue
+            seen.add(key)
+            position = positions.get(key[:2], 0)
+            positions[key[:2]] = position + 1
+            rows.append(UserCvSection(
+                user_cv_id=user_cv_id, section_type=key[1], object_id=object_id, position=position,
+            ))
+    return rows
+
+
+def backfill_cv_sections(user_cv_ids):
+    # Copia las secciones de los CV que aún no tienen ninguna fila en UserCvSection.
+    # Nunca toca un CV que ya tiene secciones; devuelve los ids de los CV copiados.
+    migrated = set(
+        UserCvSection.objects.filter(user_cv_id__in=user_cv_ids).values_list('user_cv_id', flat=True).distinct()
+    )
+    pending = [user_cv_id for user_cv_id in user_cv_ids if user_cv_id not in migrated]
+    if not pending:
+        return []
+    rows = sections_from_relations(pending)
+    # ignore_conflicts: dos lecturas simultáneas del mismo CV pueden copiarlo a la vez
+    UserCvSection.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return sorted({row.user_cv_id for row in rows})
+
+
+def relations_from_sections(user_cv_ids):
+    # Para los CV que ya tienen secciones pero ninguna UserCvRelation (creados solo en la tabla nueva)
+    with_relations = set(
+        UserCvRelation.objects.filter(user_cv_id__in=user_cv_ids).values_list('user_cv_id', flat=True).distinct()
+    )
+    fields = {SECTION_CODES[section]: field for section, field, _ in CV_SECTIONS}
+    return [
+        UserCvRelation(user_cv_id=user_cv_id, **{f'{fields[section_type]}_id': object_id})
+        for user_cv_id, section_type, object_id in (
+            UserCvSection.objects.filter(user_cv_id__in=user_cv_ids)
+            .exclude(user_cv_id__in=with_relations)
+            .order_by('user_cv_id', 'section_type', 'position')
+            .values_list('user_cv_id', 'section_type', 'object_id')
+        )
+    ]
+
+
+def mirror_relations(user_cv_id, added, removed):
+    # Refleja en UserCvRelation los cambios de compose_user_cv ({sección: [ids]})
+    conditions = [Q(**{f'{FIELDS[section]}_id__in': ids}) for section, ids in removed.items() if ids]
+    if conditions:
+        UserCvRelation.objects.filter(user_cv_id=user_cv_id).filter(reduce(or_, conditions)).delete()
+    relations = [
+        UserCvRelation(user_cv_id=user_cv_id, **{f'{FIELDS[section]}_id': object_id})
+        for section, ids in added.items()
+        for object_id in ids
+    ]
+    if relations:
+        UserCvRelation.objects.bulk_create(relations, batch_size=500)
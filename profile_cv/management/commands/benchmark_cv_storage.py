@@ -0,0 +1,133 @@
+import random
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand
+
+from profile_cv.models import User_cv, UserCvRelation
+from profile_cv.read_model import group_relations
+from profile_cv.sections import CV_SECTIONS
+
+SECTIONS = len(CV_SECTIONS)
+WIDE_COLUMNS = [f'{field}_id' for _, field, _ in CV_SECTIONS]
+
+# Mismos índices que crea Django: uno por FK en la tabla ancha; en la normalizada la FK,
+# la restricción única y los dos índices compuestos de UserCvSection
+WIDE_SCHEMA = [
+    "CREATE TABLE relation (id INTEGER PRIMARY KEY, user_cv_id INTEGER NOT NULL, "
+    + ", ".join(f"{column} INTEGER NULL" for column in WIDE_COLUMNS) + ")",
+    "CREATE INDEX relation_user_cv ON relation (user_cv_id)",
+    *[f"CREATE INDEX relation_{column} ON relation ({column})" for column in WIDE_COLUMNS],
+]
+NARROW_SCHEMA = [
+    "CREATE TABLE section (id INTEGER PRIMARY KEY, user_cv_id INTEGER NOT NULL, section_type SMALLINT NOT NULL, "
+    "object_id INTEGER NOT NULL, position INTEGER NOT NULL)",
+    "CREATE INDEX section_user_cv ON section (user_cv_id)",
+    "CREATE UNIQUE INDEX section_unique ON section (user_cv_id, section_type, object_id)",
+    "CREATE INDEX section_order ON section (user_cv_id, section_type, position)",
+    "CREATE INDEX section_item ON section (section_type, object_id)",
+]
+
+
+def synthetic_cvs(n_cvs, items_per_cv, seed):
+    # {cv_id: [(sección, object_id), ...]}
+    rng = random.Random(seed)
+    return {
+        cv_id: [(rng.randrange(SECTIONS), rng.randrange(1, 10 ** 7)) for _ in range(items_per_cv)]
+        for cv_id in range(1, n_cvs + 1)
+    }
+
+
+def wide_rows(cv_id, items):
+    for section, object_id in items:
+        row = [None] * SECTIONS
+        row[section] = object_id
+        yield (cv_id, *row)
+
+
+def narrow_rows(cv_id, items):
+    positions = {}
+    for section, object_id in items:
+        position = positions.get(section, 0)
+        positions[section] = position + 1
+        yield cv_id, section + 1, object_id, position
+
+
+def database(schema):
+    db = sqlite3.connect(':memory:', isolation_level=None)
+    for statement in schema:
+        db.execute(statement)
+    return db
+
+
+def size_bytes(db):
+    return db.execute("PRAGMA page_count").fetchone()[0] * db.execute("PRAGMA page_size").fetchone()[0]
+
+
+def timed(run, values):
+    started = time.perf_counter()
+    for value in values:
+        run(value)
+    return (time.perf_counter() - started) / len(values)
+
+
+class Command(BaseCommand):
+    help = "Read/write cost of the wide UserCvRelation table vs the normalized UserCvSection table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cvs', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--items', type=int, default=40, help="Items (rows) per CV.")
+        parser.add_argument('--reads', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--live', action='store_true', help="Also time reads of the real CVs with the ORM.")
+
+    def synthetic(self, options):
+        self.stdout.write(
+            f"{'cvs':>8} | {'table':>6} | {'write/cv':>10} | {'read/cv':>10} | {'size':>10}"
+        )
+        for n_cvs in options['cvs']:
+            cvs = synthetic_cvs(n_cvs, options['items'], options['seed'])
+            reads = random.Random(options['seed'] + 1).choices(list(cvs), k=options['reads'])
+            placeholders = ", ".join("?" * (SECTIONS + 1))
+            layouts = (
+                (
+                    'wide', WIDE_SCHEMA, wide_rows,
+                    f"INSERT INTO relation (user_cv_id, {', '.join(WIDE_COLUMNS)}) VALUES ({placeholders})",
+                    f"SELECT {', '.join(WIDE_COLUMNS)} FROM relation WHERE user_cv_id = ? ORDER BY id",
+                ),
+                (
+                    'narrow', NARROW_SCHEMA, narrow_rows,
+                    "INSERT INTO section (user_cv_id, section_type, object_id, position) VALUES (?, ?, ?, ?)",
+                    "SELECT section_type, object_id FROM section WHERE user_cv_id = ? ORDER BY section_type, position",
+                ),
+            )
+            for name, schema, rows, insert, select in layouts:
+                db = database(schema)
+
+                def write(cv_id):
+                    # Un CV = una transacción con todas sus filas, como compose_user_cv
+                    db.execute("BEGIN")
+                    db.executemany(insert, rows(cv_id, cvs[cv_id]))
+                    db.execute("COMMIT")
+
+                write_cost = timed(write, list(cvs))
+                read_cost = timed(lambda cv_id: db.execute(select, (cv_id,)).fetchall(), reads)
+                self.stdout.write(
+                    f"{n_cvs:>8} | {name:>6} | {write_cost * 1000:>8.3f}ms | {read_cost * 1000:>8.3f}ms | "
+                    f"{size_bytes(db) / 1024 / 1024:>8.2f}MB"
+                )
+                db.close()
+
+    def live(self, options):
+        user_cv_ids = list(User_cv.objects.values_list('id', flat=True)[:options['reads']])
+        if not user_cv_ids:
+            self.stdout.write("No CVs in the database.")
+            return
+        wide = timed(lambda cv_id: list(UserCvRelation.objects.filter(user_cv_id=cv_id).values_list(*WIDE_COLUMNS)), user_cv_ids)
+        narrow = timed(group_relations, user_cv_ids)
+        self.stdout.write(f"\nLive ({len(user_cv_ids)} CVs): UserCvRelation {wide * 1000:.3f}ms | UserCvSection {narrow * 1000:.3f}ms")
+
+    def handle(self, *args, **options):
+        self.synthetic(options)
+        if options['live']:
+            self.live(options)
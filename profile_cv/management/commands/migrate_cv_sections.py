@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from profile_cv.legacy import backfill_cv_sections, relations_from_sections, sections_from_relations
+from profile_cv.models import User_cv, UserCvRelation, UserCvSection
+from profile_cv.snapshots import bump_cv_versions
+
+
+class Command(BaseCommand):
+    help = "Copy the wide UserCvRelation rows into the normalized UserCvSection table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="CVs migrated per transaction.")
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only compare both tables per CV, without writing.",
+        )
+
+    def handle(self, *args, **options):
+        user_cv_ids = list(User_cv.objects.order_by('id').values_list('id', flat=True))
+        batch_size = options['batch_size']
+
+        if options['check']:
+            self.check_tables(user_cv_ids, batch_size)
+            return
+
+        migrated = relinked = 0
+        for start in range(0, len(user_cv_ids), batch_size):
+            batch = user_cv_ids[start:start + batch_size]
+            with transaction.atomic():
+                # Solo se copian los CV sin ninguna sección: lo editado en UserCvSection no se sobrescribe
+                copied = backfill_cv_sections(batch)
+                if copied:
+                    # Los snapshots cacheados de esos CV se pintaron sin secciones
+                    bump_cv_versions(User_cv.objects.filter(id__in=copied))
+                # CV creados solo en UserCvSection: se completa UserCvRelation para que --check cuadre
+                relations = relations_from_sections(batch)
+                UserCvRelation.objects.bulk_create(relations, batch_size=1000)
+            migrated += len(copied)
+            relinked += len({relation.user_cv_id for relation in relations})
+            self.stdout.write(f"{min(start + batch_size, len(user_cv_ids))}/{len(user_cv_ids)} CVs")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Copied {migrated} CV(s) to UserCvSection and {relinked} CV(s) back to UserCvRelation "
+            f"({len(user_cv_ids)} CV(s) checked; CVs that already had sections were left untouched)."
+        ))
+
+    def check_tables(self, user_cv_ids, batch_size):
+        mismatched = []
+        for start in range(0, len(user_cv_ids), batch_size):
+            batch = user_cv_ids[start:start + batch_size]
+            expected = {
+                (row.user_cv_id, row.section_type, row.object_id)
+                for row in sections_from_relations(batch)
+            }
+            stored = set(
+                UserCvSection.objects.filter(user_cv_id__in=batch).values_list('user_cv_id', 'section_type', 'object_id')
+            )
+            mismatched.extend(sorted({user_cv_id for user_cv_id, _, _ in expected ^ stored}))
+        if mismatched:
+            raise CommandError(f"{len(mismatched)} CV(s) differ between UserCvRelation and UserCvSection: {mismatched[:20]}")
+        self.stdout.write(self.style.SUCCESS("UserCvSection matches UserCvRelation."))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from profile_cv.pdf import prune_pdf_files
+from profile_cv.snapshots import prerender_cvs, snapshot_dir
+
+
+class Command(BaseCommand):
+    help = "Pre-render the HTML snapshot of every CV into CV_SNAPSHOT_DIR (and the cache)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+', help="Only these User_cv ids.")
+        parser.add_argument(
+            '--stale-only',
+            action='store_true',
+            help="Skip CVs that already have a file for their current content version.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rendered, pruned = prerender_cvs(options['ids'], only_stale=options['stale_only'])
+        # Los PDF no se pueden asociar a un CV (se nombran por hash): se limpian por antigüedad
+        pruned_pdfs = 0 if options['ids'] else prune_pdf_files()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {rendered} CV(s) into {snapshot_dir()} in {time.perf_counter() - started:.2f}s "
+            f"({pruned} outdated file(s) and {pruned_pdfs} unused PDF(s) removed)."
+        ))
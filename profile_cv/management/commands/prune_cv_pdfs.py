@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from profile_cv.pdf import pdf_dir, prune_pdf_files
+
+
+class Command(BaseCommand):
+    help = "Delete CV PDFs in CV_PDF_DIR that have not been served for CV_PDF_MAX_AGE_DAYS"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-days', type=int, help="Override CV_PDF_MAX_AGE_DAYS.")
+
+    def handle(self, *args, **options):
+        removed = prune_pdf_files(options['max_age_days'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} unused PDF(s) from {pdf_dir()}."))
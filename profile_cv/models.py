@@ -58,10 +58,13 @@ class User_cv(models.Model):
     has_recognitions_awards = models.BooleanField(blank=True, null=True)
     has_certifications_courses = models.BooleanField(blank=True, null=True)
     relations = models.ManyToManyField("UserCvRelation", blank=True,  related_name="user_cvs")
+    content_version = models.PositiveIntegerField(default=1)  # Sube con cualquier cambio del contenido (profile_cv/signals.py)
 
     def __str__(self):
         return self.profile_user.user.username
 
+# Formato anterior de las secciones (una FK por sección); se mantiene en paralelo a UserCvSection
+# hasta retirarlo (profile_cv/legacy.py)
 class UserCvRelation(models.Model):
     user_cv = models.ForeignKey('User_cv', on_delete=models.CASCADE)
     work_experience = models.ForeignKey('WorkExperience', on_delete=models.CASCADE, null=True, blank=True)
@@ -77,6 +80,38 @@ class UserCvRelation(models.Model):
     publication = models.ForeignKey('Publication', on_delete=models.CASCADE, null=True, blank=True)
     recognition_award = models.ForeignKey('RecognitionAward', on_delete=models.CASCADE, null=True, blank=True)
 
+# Secciones de un CV en formato normalizado: una fila (CV, tipo de sección, id del elemento, posición).
+# Sustituye a UserCvRelation (una columna FK por sección); los códigos no deben cambiar.
+CV_SECTION_TYPES = (
+    (1, 'work_experiences'),
+    (2, 'academic_educations'),
+    (3, 'hard_skills'),
+    (4, 'soft_skills'),
+    (5, 'languages'),
+    (6, 'categories'),
+    (7, 'sectors'),
+    (8, 'incorporations'),
+    (9, 'volunteerings'),
+    (10, 'projects'),
+    (11, 'publications'),
+    (12, 'recognitions_awards'),
+)
+
+class UserCvSection(models.Model):
+    user_cv = models.ForeignKey('User_cv', on_delete=models.CASCADE, related_name='sections')
+    section_type = models.PositiveSmallIntegerField(choices=CV_SECTION_TYPES)
+    object_id = models.PositiveBigIntegerField()  # id del elemento del perfil (WorkExperience, HardSkillUser, ...)
+    position = models.PositiveIntegerField(default=0)  # Orden dentro de la sección
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_cv', 'section_type', 'object_id'], name='unique_user_cv_section_item'),
+        ]
+        indexes = [
+            models.Index(fields=['user_cv', 'section_type', 'position'], name='user_cv_section_order_idx'),
+            models.Index(fields=['section_type', 'object_id'], name='user_cv_section_item_idx'),  # Borrar un elemento de todos los CV
+        ]
+
 # Model to represent a work experience
 class WorkExperience(models.Model):
     profile_user = models.ForeignKey(Profile_CV, on_delete=models.CASCADE)  # One-to-one relationship with the User model
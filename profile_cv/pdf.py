@@ -0,0 +1,383 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+
+from .models import User_cv
+from .snapshots import get_cv_html
+
+logger = logging.getLogger(__name__)
+
+# * |--------------------------------------------------------------------------
+# * | Generación de PDF de los CV
+# * |--------------------------------------------------------------------------
+#
+# El HTML del PDF se construye con el snapshot del CV (profile_cv/snapshots.py) y
+# el PDF se genera con weasyprint en un pool de procesos acotado (CV_PDF_WORKERS),
+# fuera del hilo de la petición. Si ya hay CV_PDF_MAX_PENDING PDFs en cola la
+# petición falla con PdfBusy en lugar de encolar sin límite.
+#
+# Los ficheros se guardan en CV_PDF_DIR con el hash del HTML como nombre: el
+# mismo contenido no se vuelve a generar y dos peticiones simultáneas del mismo
+# CV comparten el mismo trabajo. La respuesta admite peticiones Range.
+#
+# Si un worker muere (OOM, segfault de weasyprint...) el ProcessPoolExecutor queda
+# roto para siempre: se descarta, los PDFs en curso fallan y el siguiente PDF crea
+# un pool nuevo. Cada uso de un PDF actualiza su mtime; prune_pdf_files borra los
+# que llevan más de CV_PDF_MAX_AGE_DAYS sin usarse.
+
+DEFAULT_PDF_WORKERS = 2
+DEFAULT_PDF_MAX_PENDING = 16
+DEFAULT_PDF_TIMEOUT = 60
+DEFAULT_PDF_MAX_AGE_DAYS = 30
+PDF_TEMPLATE = 'user_cv/user_cv_pdf.html'
+CHUNK_SIZE = 64 * 1024
+
+
+class PdfBusy(Exception):
+    pass
+
+
+def pdf_dir():
+    return str(getattr(settings, 'CV_PDF_DIR', os.path.join(settings.BASE_DIR, 'cv_pdfs')))
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+def pdf_path(digest):
+    return os.path.join(pdf_dir(), f'{digest}.pdf')
+
+
+def touch(path):
+    # True si el PDF existe; actualiza su mtime para que prune_pdf_files no lo borre mientras se use
+    try:
+        os.utime(path)
+    except OSError:
+        return False
+    return True
+
+
+def prune_pdf_files(max_age_days=None):
+    # Los PDF se nombran por el hash del HTML: se borran los que no se han usado en max_age_days
+    max_age_days = max_age_days or getattr(settings, 'CV_PDF_MAX_AGE_DAYS', DEFAULT_PDF_MAX_AGE_DAYS)
+    directory = pdf_dir()
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for name in os.listdir(directory):
+        if not name.endswith(('.pdf', '.tmp')):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def cv_pdf_html(user_cv_id, version):
+    return render_to_string(PDF_TEMPLATE, {'cv_html': get_cv_html(user_cv_id, version)})
+
+
+# * |---------------------------------------------------------------------------
+# * | Worker (se ejecuta en los procesos del pool)
+# * |---------------------------------------------------------------------------
+
+def _init_worker():
+    # Con el método 'spawn' el proceso empieza sin Django cargado
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _local_file(url):
+    # Las URLs de /media/ y /static/ se leen del disco en lugar de pedirlas al propio servidor
+    from django.contrib.staticfiles import finders
+
+    if settings.MEDIA_URL and url.startswith(settings.MEDIA_URL):
+        return os.path.join(settings.MEDIA_ROOT, url[len(settings.MEDIA_URL):])
+    if url.startswith(settings.STATIC_URL):
+        return finders.find(url[len(settings.STATIC_URL):].split('?')[0])
+    return None
+
+
+def _url_fetcher(url):
+    from weasyprint import default_url_fetcher  # type: ignore
+
+    path = _local_file(url)
+    if path and os.path.exists(path):
+        return default_url_fetcher('file://' + os.path.abspath(path))
+    return default_url_fetcher(url)
+
+
+def _render_pdf(html, path):
+    from weasyprint import HTML  # type: ignore
+
+    started = time.perf_counter()
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        HTML(string=html, base_url='/', url_fetcher=_url_fetcher).write_pdf(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return time.perf_counter() - started
+
+
+# * |---------------------------------------------------------------------------
+# * | Pool y caché
+# * |---------------------------------------------------------------------------
+
+class PdfRenderer:
+    def __init__(self, workers=DEFAULT_PDF_WORKERS, max_pending=DEFAULT_PDF_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._generation = 0  # Sube cada vez que se sustituye un pool roto
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'joined': 0,
+            'rendered': 0,
+            'failed': 0,
+            'pool_restarts': 0,
+            'render_seconds': 0.0,
+            'max_render_seconds': 0.0,
+        }
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._executor
+
+    def _discard_executor(self, generation, error):
+        # Llamar con self._lock. Solo se descarta el pool de esa generación (otro hilo puede haberlo sustituido ya)
+        if generation != self._generation or self._executor is None:
+            return
+        broken, self._executor = self._executor, None
+        self._generation += 1
+        self._stats['pool_restarts'] += 1
+        logger.error("CV PDF process pool is broken, starting a new one: %s", error)
+        # Los PDFs en curso de ese pool no van a terminar: fallan ya en lugar de esperar al timeout
+        for digest, (result, job_generation) in list(self._in_flight.items()):
+            if job_generation == generation:
+                del self._in_flight[digest]
+                if not result.done():
+                    result.set_exception(error)
+        broken.shutdown(wait=False)
+
+    def submit(self, html, block=False):
+        # Devuelve (hash, Future con la ruta del PDF)
+        digest = content_hash(html)
+        path = pdf_path(digest)
+        with self._lock:
+            self._stats['requests'] += 1
+            if touch(path):
+                self._stats['cache_hits'] += 1
+                future = Future()
+                future.set_result(path)
+                return digest, future
+            if digest in self._in_flight:
+                self._stats['joined'] += 1
+                return digest, self._in_flight[digest][0]
+
+        if not self._slots.acquire(blocking=block):
+            raise PdfBusy()
+
+        with self._lock:
+            # Otro hilo puede haberlo encolado mientras se esperaba el hueco
+            if digest in self._in_flight:
+                self._slots.release()
+                self._stats['joined'] += 1
+                return digest, self._in_flight[digest][0]
+            result = Future()
+            try:
+                try:
+                    generation = self._generation
+                    job = self.executor.submit(_render_pdf, html, path)
+                except BrokenProcessPool as error:
+                    # El pool se rompió antes de que ningún callback lo viera: uno nuevo y se reintenta una vez
+                    self._discard_executor(generation, error)
+                    generation = self._generation
+                    job = self.executor.submit(_render_pdf, html, path)
+            except BaseException:
+                self._slots.release()
+                raise
+            self._in_flight[digest] = (result, generation)
+
+        job.add_done_callback(lambda done: self._finish(digest, path, done, result, generation))
+        return digest, result
+
+    def _finish(self, digest, path, done, result, generation):
+        self._slots.release()
+        error = done.exception()
+        with self._lock:
+            if self._in_flight.get(digest, (None,))[0] is result:
+                del self._in_flight[digest]
+            if error is None:
+                seconds = done.result()
+                self._stats['rendered'] += 1
+                self._stats['render_seconds'] += seconds
+                self._stats['max_render_seconds'] = max(self._stats['max_render_seconds'], seconds)
+            else:
+                self._stats['failed'] += 1
+                if isinstance(error, BrokenProcessPool):
+                    self._discard_executor(generation, error)
+        if result.done():
+            # Ya se falló al descartar el pool
+            return
+        if error is None:
+            result.set_result(path)
+        else:
+            logger.warning("CV PDF render failed: %s", error)
+            result.set_exception(error)
+
+    def render(self, html, timeout=None, block=False):
+        return self.submit(html, block=block)[1].result(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._in_flight)
+        rendered = stats['rendered'] or 1
+        stats['queue_depth'] = stats['in_flight']
+        stats['workers'] = self.workers
+        stats['max_pending'] = self.max_pending
+        stats['avg_render_ms'] = round(stats.pop('render_seconds') / rendered * 1000, 1)
+        stats['max_render_ms'] = round(stats.pop('max_render_seconds') * 1000, 1)
+        stats['cache_hit_ratio'] = round(stats['cache_hits'] / (stats['requests'] or 1), 3)
+        return stats
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_pdf_renderer():
+    # Instancia única por proceso; el pool de procesos se crea con el primer PDF
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = PdfRenderer(
+                    workers=getattr(settings, 'CV_PDF_WORKERS', DEFAULT_PDF_WORKERS),
+                    max_pending=getattr(settings, 'CV_PDF_MAX_PENDING', DEFAULT_PDF_MAX_PENDING),
+                )
+    return _renderer
+
+
+def pdf_metrics():
+    if _renderer is None:
+        return {'started': False}
+    return {'started': True, **_renderer.stats()}
+
+
+def render_cv_pdf(user_cv_id, version, timeout=None):
+    timeout = timeout or getattr(settings, 'CV_PDF_TIMEOUT', DEFAULT_PDF_TIMEOUT)
+    return get_pdf_renderer().render(cv_pdf_html(user_cv_id, version), timeout=timeout)
+
+
+def generate_cv_pdfs(profile_ids, timeout=None):
+    # PDF del CV más reciente de cada perfil; todos se encolan a la vez y se esperan al final
+    latest = {}
+    for row in User_cv.objects.filter(profile_user_id__in=profile_ids).order_by('profile_user_id', '-id').values(
+        'id', 'profile_user_id', 'content_version'
+    ):
+        latest.setdefault(row['profile_user_id'], row)
+
+    renderer = get_pdf_renderer()
+    jobs = []
+    for profile_id, row in latest.items():
+        _, future = renderer.submit(cv_pdf_html(row['id'], row['content_version']), block=True)
+        jobs.append((profile_id, row['id'], future))
+
+    results = []
+    for profile_id, user_cv_id, future in jobs:
+        try:
+            results.append({'profile_id': profile_id, 'user_cv_id': user_cv_id, 'path': future.result(timeout)})
+        except Exception as error:
+            results.append({'profile_id': profile_id, 'user_cv_id': user_cv_id, 'error': str(error)})
+    missing = set(profile_ids) - set(latest)
+    results.extend({'profile_id': profile_id, 'user_cv_id': None, 'error': 'no CV'} for profile_id in sorted(missing))
+    return results
+
+
+# * |---------------------------------------------------------------------------
+# * | Respuesta con soporte de Range
+# * |---------------------------------------------------------------------------
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    # Un único rango 'bytes=a-b', 'bytes=a-' o 'bytes=-n'; None si no es válido o no se puede satisfacer
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        length = int(end)
+        if length == 0:
+            return None
+        start, end = max(size - length, 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+def iter_file_range(path, start, end):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(request, path, filename, content_type='application/pdf'):
+    size = os.path.getsize(path)
+    header = request.META.get('HTTP_RANGE')
+    if not header:
+        response = FileResponse(open(path, 'rb'), content_type=content_type, filename=filename)
+    else:
+        byte_range = parse_range(header, size)
+        if byte_range is None:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        start, end = byte_range
+        response = StreamingHttpResponse(iter_file_range(path, start, end), status=206, content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
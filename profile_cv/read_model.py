@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+
+from django.http import Http404
+
+from .legacy import backfill_cv_sections
+from .models import User_cv, UserCvSection
+from .sections import CV_SECTIONS, SECTION_MODELS, SECTION_NAMES
+
+# * |--------------------------------------------------------------------------
+# * | Lectura de un CV completo (snapshot inmutable)
+# * |--------------------------------------------------------------------------
+#
+# Número de consultas constante sea cual sea el tamaño del CV: el User_cv con su
+# perfil, todas sus filas de UserCvSection de una vez (agrupadas por tipo de
+# sección) y una consulta por sección no vacía con los select_related que usa la
+# plantilla. Los elementos borrados del perfil se ignoran.
+
+# FKs que muestra la plantilla de cada sección
+SECTION_RELATED = {
+    'work_experiences': ('hard_skills__hard_skill',),
+    'hard_skills': ('hard_skill',),
+    'soft_skills': ('soft_skill',),
+    'languages': ('language', 'level'),
+    'categories': ('category__sector',),
+    'sectors': ('sector',),
+    'incorporations': ('incorporation',),
+}
+
+
+@dataclass(frozen=True)
+class CvSnapshot:
+    user_cv: User_cv
+    profile_cv: object
+    work_experiences: tuple = ()
+    academic_educations: tuple = ()
+    hard_skills: tuple = ()
+    soft_skills: tuple = ()
+    languages: tuple = ()
+    categories: tuple = ()
+    sectors: tuple = ()
+    incorporations: tuple = ()
+    volunteerings: tuple = ()
+    projects: tuple = ()
+    publications: tuple = ()
+    recognitions_awards: tuple = ()
+
+    def sections(self):
+        return {section: getattr(self, section) for section, _, _ in CV_SECTIONS}
+
+    def as_context(self):
+        return {'user_cv': self.user_cv, 'profile_cv': self.profile_cv, **self.sections()}
+
+
+def group_relations(user_cv_id):
+    # {sección: [ids]} en el orden de cada sección (índice user_cv, section_type, position)
+    queryset = (
+        UserCvSection.objects.filter(user_cv_id=user_cv_id)
+        .order_by('section_type', 'position')
+        .values_list('section_type', 'object_id')
+    )
+    rows = list(queryset)
+    if not rows and backfill_cv_sections([user_cv_id]):
+        # CV anterior a UserCvSection: se copia desde UserCvRelation en lugar de pintarlo vacío
+        rows = list(queryset.all())
+    grouped = {section: [] for section, _, _ in CV_SECTIONS}
+    for section_type, object_id in rows:
+        grouped[SECTION_NAMES[section_type]].append(object_id)
+    return grouped
+
+
+def load_cv_snapshot(user_cv_id):
+    try:
+        user_cv = User_cv.objects.select_related('profile_user__user').get(id=user_cv_id)
+    except User_cv.DoesNotExist:
+        raise Http404("User_cv does not exist")
+
+    sections = {}
+    for section, ids in group_relations(user_cv_id).items():
+        if not ids:
+            continue
+        objects = SECTION_MODELS[section].objects.select_related(*SECTION_RELATED.get(section, ())).in_bulk(ids)
+        sections[section] = tuple(objects[object_id] for object_id in dict.fromkeys(ids) if object_id in objects)
+
+    return CvSnapshot(user_cv=user_cv, profile_cv=user_cv.profile_user, **sections)
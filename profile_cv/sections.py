@@ -0,0 +1,25 @@
+from .models import (
+    CV_SECTION_TYPES, AcademicEducation, CategoryUser, HardSkillUser, IncorporationUser, LanguageUser, Project,
+    Publication, RecognitionAward, SectorUser, SoftSkillUser, Volunteering, WorkExperience,
+)
+
+# Secciones de un CV: (campo del formulario, FK de la antigua UserCvRelation, modelo)
+CV_SECTIONS = (
+    ('work_experiences', 'work_experience', WorkExperience),
+    ('academic_educations', 'academic_education', AcademicEducation),
+    ('hard_skills', 'hard_skill', HardSkillUser),
+    ('soft_skills', 'soft_skill', SoftSkillUser),
+    ('languages', 'language', LanguageUser),
+    ('categories', 'category', CategoryUser),
+    ('sectors', 'sector', SectorUser),
+    ('incorporations', 'incorporation', IncorporationUser),
+    ('volunteerings', 'volunteering', Volunteering),
+    ('projects', 'project', Project),
+    ('publications', 'publication', Publication),
+    ('recognitions_awards', 'recognition_award', RecognitionAward),
+)
+
+# Código de UserCvSection.section_type de cada sección y al revés
+SECTION_CODES = {name: code for code, name in CV_SECTION_TYPES}
+SECTION_NAMES = dict(CV_SECTION_TYPES)
+SECTION_MODELS = {section: model for section, _, model in CV_SECTIONS}
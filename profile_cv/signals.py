@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    AcademicEducation, Category, CategoryUser, HardSkill, HardSkillUser, Incorporation, IncorporationUser, Language,
+    LanguageUser, Level, Profile_CV, Project, Publication, RecognitionAward, Sector, SectorUser, SoftSkill,
+    SoftSkillUser, User_cv, UserCvSection, Volunteering, WorkExperience,
+)
+from .sections import SECTION_CODES, SECTION_MODELS
+from .snapshots import bump_cv_versions
+
+# Elementos de un Profile_CV que puede mostrar cualquiera de sus CV
+PROFILE_ITEMS = (
+    WorkExperience, AcademicEducation, HardSkillUser, SoftSkillUser, LanguageUser, CategoryUser, SectorUser,
+    IncorporationUser, Volunteering, Project, Publication, RecognitionAward,
+)
+
+SECTION_BY_MODEL = {model: section for section, model in SECTION_MODELS.items()}
+
+# Catálogos cuyos nombres aparecen en los CV (cambian muy poco: se invalidan todos)
+CATALOGS = (HardSkill, SoftSkill, Language, Level, Category, Sector, Incorporation)
+
+
+def bump_profile_cvs_on_item_change(sender, instance, **kwargs):
+    bump_cv_versions(User_cv.objects.filter(profile_user_id=instance.profile_user_id))
+
+
+def delete_cv_sections_on_item_delete(sender, instance, **kwargs):
+    # UserCvSection no tiene FK al elemento: se quitan aquí sus filas en los CV
+    UserCvSection.objects.filter(section_type=SECTION_CODES[SECTION_BY_MODEL[sender]], object_id=instance.pk).delete()
+
+
+def bump_all_cvs_on_catalog_change(sender, instance, created=False, **kwargs):
+    if not created:
+        bump_cv_versions(User_cv.objects.all())
+
+
+for model in PROFILE_ITEMS:
+    post_save.connect(bump_profile_cvs_on_item_change, sender=model)
+    post_delete.connect(bump_profile_cvs_on_item_change, sender=model)
+    post_delete.connect(delete_cv_sections_on_item_delete, sender=model)
+
+for model in CATALOGS:
+    post_save.connect(bump_all_cvs_on_catalog_change, sender=model)
+    post_delete.connect(bump_all_cvs_on_catalog_change, sender=model)
+
+
+@receiver(post_save, sender=Profile_CV)
+def bump_cvs_on_profile_change(sender, instance, created, **kwargs):
+    if not created:
+        bump_cv_versions(User_cv.objects.filter(profile_user=instance))
+
+
+@receiver(post_save, sender=User)
+def bump_cvs_on_user_change(sender, instance, created, update_fields=None, **kwargs):
+    # El login solo actualiza last_login, que no aparece en el CV
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    bump_cv_versions(User_cv.objects.filter(profile_user__user=instance))
+
+
+@receiver(post_save, sender=User_cv)
+def bump_cv_on_save(sender, instance, created, **kwargs):
+    if not created:
+        bump_cv_versions(User_cv.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=UserCvSection)
+@receiver(post_delete, sender=UserCvSection)
+def bump_cv_on_section_change(sender, instance, **kwargs):
+    bump_cv_versions(User_cv.objects.filter(pk=instance.user_cv_id))
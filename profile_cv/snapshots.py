@@ -0,0 +1,126 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.http import Http404
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import User_cv
+from .read_model import load_cv_snapshot
+
+# * |--------------------------------------------------------------------------
+# * | HTML renderizado de los CV (snapshots)
+# * |--------------------------------------------------------------------------
+#
+# El contenido de un CV (user_cv/user_cv_content.html, sin la cabecera de la
+# página, que depende del usuario) se guarda ya renderizado con la clave
+# (id del CV, content_version). content_version es una columna de User_cv que
+# suben las señales de profile_cv/signals.py cuando cambia el CV, sus relaciones,
+# el perfil o cualquier elemento del perfil; así la versión es la misma para
+# todos los procesos y las copias antiguas simplemente dejan de usarse.
+#
+# Los CV consultados se guardan en la caché; prerender_cvs exporta además todos
+# los CV a ficheros en CV_SNAPSHOT_DIR, que se leen cuando la caché no los tiene.
+
+DEFAULT_SNAPSHOT_TTL = 60 * 60 * 24
+CONTENT_TEMPLATE = 'user_cv/user_cv_content.html'
+
+
+def snapshot_key(user_cv_id, version):
+    return f'cv_html:{user_cv_id}:{version}'
+
+
+def snapshot_dir():
+    return str(getattr(settings, 'CV_SNAPSHOT_DIR', os.path.join(settings.BASE_DIR, 'cv_snapshots')))
+
+
+def snapshot_path(user_cv_id, version):
+    return os.path.join(snapshot_dir(), f'{user_cv_id}-{version}.html')
+
+
+def bump_cv_versions(queryset):
+    # Un UPDATE sin señales; las copias con la versión anterior ya no se vuelven a servir
+    return queryset.update(content_version=F('content_version') + 1)
+
+
+def render_cv_content(user_cv_id):
+    snapshot = load_cv_snapshot(user_cv_id)
+    return snapshot.user_cv.content_version, render_to_string(CONTENT_TEMPLATE, snapshot.as_context())
+
+
+def cache_snapshot(user_cv_id, version, html):
+    cache.set(snapshot_key(user_cv_id, version), html, getattr(settings, 'CV_SNAPSHOT_TTL', DEFAULT_SNAPSHOT_TTL))
+
+
+def read_snapshot_file(user_cv_id, version):
+    try:
+        with open(snapshot_path(user_cv_id, version), encoding='utf-8') as handle:
+            return handle.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshot_file(user_cv_id, version, html):
+    # Escritura atómica (fichero temporal + rename) para no servir nunca un fichero a medias
+    directory = snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+        handle.write(html)
+    os.replace(tmp_path, snapshot_path(user_cv_id, version))
+
+
+def prune_snapshot_files(current, user_cv_ids=None):
+    # Borra los ficheros de versiones antiguas (y de CV borrados si no se limita a unos ids)
+    directory = snapshot_dir()
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for name in os.listdir(directory):
+        user_cv_id, _, rest = name.partition('-')
+        if not rest.endswith('.html') or name in current:
+            continue
+        if user_cv_ids is not None and user_cv_id not in user_cv_ids:
+            continue
+        os.remove(os.path.join(directory, name))
+        removed += 1
+    return removed
+
+
+def get_cv_html(user_cv_id, version):
+    # Caché -> fichero exportado -> render; devuelve el HTML de la versión pedida
+    html = cache.get(snapshot_key(user_cv_id, version))
+    if html is None:
+        html = read_snapshot_file(user_cv_id, version)
+        if html is None:
+            rendered_version, html = render_cv_content(user_cv_id)
+            if rendered_version != version:
+                # El CV ha cambiado entre la lectura de la versión y el render
+                version = rendered_version
+        cache_snapshot(user_cv_id, version, html)
+    return mark_safe(html)
+
+
+def prerender_cvs(user_cv_ids=None, only_stale=False):
+    # Exporta los CV a CV_SNAPSHOT_DIR (y a la caché); devuelve (renderizados, ficheros antiguos borrados)
+    queryset = User_cv.objects.order_by('id')
+    if user_cv_ids:
+        queryset = queryset.filter(id__in=user_cv_ids)
+    rendered = 0
+    current = set()
+    for user_cv_id, version in queryset.values_list('id', 'content_version').iterator():
+        if not (only_stale and os.path.exists(snapshot_path(user_cv_id, version))):
+            try:
+                version, html = render_cv_content(user_cv_id)
+            except Http404:
+                # Borrado mientras se exportaba
+                continue
+            write_snapshot_file(user_cv_id, version, html)
+            cache_snapshot(user_cv_id, version, html)
+            rendered += 1
+        current.add(os.path.basename(snapshot_path(user_cv_id, version)))
+    pruned = prune_snapshot_files(current, {str(user_cv_id) for user_cv_id in user_cv_ids} if user_cv_ids else None)
+    return rendered, pruned
@@ -1,13 +1,21 @@
+import logging
 import random
 import string
-from django.http import HttpResponse
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
-# from weasyprint import HTML
 from .models import *
 from .forms import *
 from django.template.loader import get_template
 from django.contrib.auth.models import User
 from courses.models import Course
+from django.db import transaction
+from .composition import compose_user_cv, selected_from_relations, selected_ids
+from .pdf import PdfBusy, pdf_metrics, ranged_file_response, render_cv_pdf
+from .snapshots import get_cv_html
+
+logger = logging.getLogger(__name__)
 
 # * |--------------------------------------------------------------------------
 # * | Home
@@ -486,126 +494,45 @@ def user_cv_list(request, profile_id):
     user_cv = User_cv.objects.filter(profile_user=profile)
     return render(request, "user_cv/user_cv_list.html", {"user_cv": user_cv})
 
+def user_cv_form_context(profile_cv, form, selected, user_cv=None):
+    # Elementos del perfil que se pueden incluir en el CV; selected marca los checkboxes ya elegidos
+    return {
+        'form': form,
+        'user_cv': user_cv,
+        'profile_cv': profile_cv,
+        'selected': selected,
+        'work_experiences': WorkExperience.objects.filter(profile_user=profile_cv),
+        'academic_educations': AcademicEducation.objects.filter(profile_user=profile_cv),
+        'hard_skills': HardSkillUser.objects.filter(profile_user=profile_cv).select_related('hard_skill'),
+        'soft_skills': SoftSkillUser.objects.filter(profile_user=profile_cv).select_related('soft_skill'),
+        'languages': LanguageUser.objects.filter(profile_user=profile_cv).select_related('language', 'level'),
+        'categories': CategoryUser.objects.filter(profile_user=profile_cv).select_related('category__sector'),
+        'sectors': SectorUser.objects.filter(profile_user=profile_cv).select_related('sector'),
+        'incorporations': IncorporationUser.objects.filter(profile_user=profile_cv).select_related('incorporation'),
+        'volunteerings': Volunteering.objects.filter(profile_user=profile_cv),
+        'projects': Project.objects.filter(profile_user=profile_cv),
+        'publications': Publication.objects.filter(profile_user=profile_cv),
+        "courses": profile_cv.user.enrolled_courses.filter(status__name='completed'),
+        'recognitions_awards': RecognitionAward.objects.filter(profile_user=profile_cv),
+    }
+
 #? Función para crear un CV
 def user_cv_create(request, profile_id):
     profile_cv = get_object_or_404(Profile_CV, id=profile_id)
-    user_cv = User_cv.objects.filter(profile_user=profile_cv)
-    work_experiences = WorkExperience.objects.filter(profile_user=profile_cv)
-    academic_educations = AcademicEducation.objects.filter(profile_user=profile_cv)
-    hard_skills = HardSkillUser.objects.filter(profile_user=profile_cv)
-    soft_skills = SoftSkillUser.objects.filter(profile_user=profile_cv)
-    languages = LanguageUser.objects.filter(profile_user=profile_cv)
-    categories = CategoryUser.objects.filter(profile_user=profile_cv)
-    sectors = SectorUser.objects.filter(profile_user=profile_cv)
-    incorporations = IncorporationUser.objects.filter(profile_user=profile_cv)
-    volunteerings = Volunteering.objects.filter(profile_user=profile_cv)
-    projects = Project.objects.filter(profile_user=profile_cv)
-    publications = Publication.objects.filter(profile_user=profile_cv)
-    recognitions_awards = RecognitionAward.objects.filter(profile_user=profile_cv)
+    selected = {}
 
     if request.method == "POST":
         form = UserCvForm(request.POST)
+        # Secciones seleccionadas (work_experiences, hard_skills, languages, ...)
+        selected = selected_ids(request.POST)
         if form.is_valid():
-            user_cv = form.save(commit=False)
-            user_cv.profile_user = profile_cv  # Asigna el perfil del usuario
-            user_cv.save()
-
-            # Obtener las experiencias laborales seleccionadas
-            selected_experiences = request.POST.getlist('work_experiences')
-            for experience_id in selected_experiences:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    work_experience_id=experience_id
-                )
-
-            # Obtener las educaciones académicas seleccionadas
-            selected_academic_educations = request.POST.getlist('academic_educations')
-            for education_id in selected_academic_educations:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    academic_education_id=education_id
-                )
-
-            # Obtener las habilidades duras seleccionadas
-            selected_hard_skills = request.POST.getlist('hard_skills')
-            for skill_id in selected_hard_skills:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    hard_skill_id=skill_id
-                )
-
-            # Obtener las habilidades blandas seleccionadas
-            selected_soft_skills = request.POST.getlist('soft_skills')
-            for skill_id in selected_soft_skills:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    soft_skill_id=skill_id
-                )
-
-            # Obtener los idiomas seleccionados
-            selected_languages = request.POST.getlist('languages')
-            for language_id in selected_languages:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    language_id=language_id
-                )
-
-            # Obtener las categorías seleccionadas
-            selected_categories = request.POST.getlist('categories')
-            for category_id in selected_categories:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    category_id=category_id
-                )
-
-            # Obtener los sectores seleccionados
-            selected_sectors = request.POST.getlist('sectors')
-            for sector_id in selected_sectors:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    sector_id=sector_id
-                )
-
-            # Obtener las incorporaciones seleccionadas
-            selected_incorporations = request.POST.getlist('incorporations')
-            for incorporation_id in selected_incorporations:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    incorporation_id=incorporation_id
-                )
-
-            # Obtener los voluntariados seleccionados
-            selected_volunteerings = request.POST.getlist('volunteerings')
-            for volunteering_id in selected_volunteerings:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    volunteering_id=volunteering_id
-                )
-
-            # Obtener los proyectos seleccionados
-            selected_projects = request.POST.getlist('projects')
-            for project_id in selected_projects:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    project_id=project_id
-                )
-
-            # Obtener las publicaciones seleccionadas
-            selected_publications = request.POST.getlist('publications')
-            for publication_id in selected_publications:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    publication_id=publication_id
-                )
-
-            # Obtener los reconocimientos y premios seleccionados
-            selected_recognitions = request.POST.getlist('recognitions_awards')
-            for recognition_id in selected_recognitions:
-                UserCvRelation.objects.create(
-                    user_cv=user_cv,
-                    recognition_award_id=recognition_id
-                )
-            
+            with transaction.atomic():
+                user_cv = form.save(commit=False)
+                user_cv.profile_user = profile_cv  # Asigna el perfil del usuario
+                user_cv.save()
+                # Valida los ids (una consulta por sección) y crea todas las relaciones con un bulk_create
+                compose_user_cv(user_cv, profile_cv, selected)
+
             # Obtener cursos
             # selected_course = request.POST.getlist('course')
             # for course_id in selected_course:
@@ -620,39 +547,28 @@ def user_cv_create(request, profile_id):
         initial_urlCV = f"https://{profile_cv.user.username}-{random_numbers}.com"
         form = UserCvForm(initial={'urlCV': initial_urlCV})
 
-    context = {
-        'form': form,
-        'profile_cv': profile_cv,
-        'work_experiences': work_experiences,
-        'academic_educations': academic_educations,
-        'hard_skills': hard_skills,
-        'soft_skills': soft_skills,
-        'languages': languages,
-        'categories': categories,
-        'sectors': sectors,
-        'incorporations': incorporations,
-        'volunteerings': volunteerings,
-        'projects': projects,
-        'publications': publications,
-        "courses": profile_cv.user.enrolled_courses.filter(status__name='completed'),
-        'recognitions_awards': recognitions_awards,
-    }
-
+    context = user_cv_form_context(profile_cv, form, selected)
     return render(request, "user_cv/user_cv_form.html", context)
 
 #? Función para actualizar un CV
 def user_cv_update(request, user_cv_id):
-    user_cv = get_object_or_404(User_cv, id=user_cv_id)
-    profile_id = user_cv.profile_user.id  # Obtén el profile_id del user_cv
-    profile_cv = get_object_or_404(Profile_CV, id=profile_id)
+    user_cv = get_object_or_404(User_cv.objects.select_related('profile_user__user'), id=user_cv_id)
+    profile_cv = user_cv.profile_user
+    profile_id = profile_cv.id  # Obtén el profile_id del user_cv
     if request.method == "POST":
         form = UserCvForm(request.POST, instance=user_cv)
+        selected = selected_ids(request.POST)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
+                # Solo se borran/crean las relaciones que han cambiado
+                compose_user_cv(user_cv, profile_cv, selected)
             return redirect("user_cv_list", profile_id=profile_id)  # Pasa el profile_id aquí
     else:
         form = UserCvForm(instance=user_cv)
-    return render(request, "user_cv/user_cv_form.html", {"form": form, "user_cv": user_cv, "profile_cv": profile_cv})
+        selected = selected_from_relations(user_cv)
+    context = user_cv_form_context(profile_cv, form, selected, user_cv=user_cv)
+    return render(request, "user_cv/user_cv_form.html", context)
 
 #? Función para eliminar un CV
 def user_cv_delete(request, user_cv_id):
@@ -666,83 +582,38 @@ def user_cv_delete(request, user_cv_id):
 
 #? Función para ver los detalles de un CV
 def user_cv_view_details(request, user_cv_id, profile_cv_id):
-    user_cv = get_object_or_404(User_cv, id=user_cv_id)
-    profile_cv = get_object_or_404(Profile_CV, id=profile_cv_id)
-
-    # Filtrar solo los campos asociadas al User_cv
-    user_cv_relations = UserCvRelation.objects.filter(user_cv=user_cv)
-
-    work_experiences = WorkExperience.objects.filter(id__in=user_cv_relations.values('work_experience'))
-    academic_educations = AcademicEducation.objects.filter(id__in=user_cv_relations.values('academic_education'))
-    hard_skills = HardSkillUser.objects.filter(id__in=user_cv_relations.values('hard_skill'))
-    soft_skills = SoftSkillUser.objects.filter(id__in=user_cv_relations.values('soft_skill'))
-    languages = LanguageUser.objects.filter(id__in=user_cv_relations.values('language'))
-    categories = CategoryUser.objects.filter(id__in=user_cv_relations.values('category'))
-    sectors = SectorUser.objects.filter(id__in=user_cv_relations.values('sector'))
-    incorporations = IncorporationUser.objects.filter(id__in=user_cv_relations.values('incorporation'))
-    volunteerings = Volunteering.objects.filter(id__in=user_cv_relations.values('volunteering'))
-    projects = Project.objects.filter(id__in=user_cv_relations.values('project'))
-    publications = Publication.objects.filter(id__in=user_cv_relations.values('publication'))
-    recognitions_awards = RecognitionAward.objects.filter(id__in=user_cv_relations.values('recognition_award'))
-
-    context = {
-        'user_cv': user_cv,
-        'profile_cv': profile_cv,
-        'work_experiences': work_experiences,
-        'academic_educations': academic_educations,
-        'hard_skills': hard_skills,
-        'soft_skills': soft_skills,
-        'languages': languages,
-        'categories': categories,
-        'sectors': sectors,
-        'incorporations': incorporations,
-        'volunteerings': volunteerings,
-        'projects': projects,
-        'publications': publications,
-        'recognitions_awards': recognitions_awards,
-    }
+    user_cv = User_cv.objects.filter(id=user_cv_id).values('profile_user_id', 'content_version').first()
+    if user_cv is None or user_cv['profile_user_id'] != profile_cv_id:
+        raise Http404("User_cv does not exist for this profile")
 
-    return render(request, 'user_cv/user_cv_view_details.html', context)
+    # HTML del CV desde el snapshot de su versión actual; solo se renderiza (read_model) si no existe
+    cv_html = get_cv_html(user_cv_id, user_cv['content_version'])
+    return render(request, 'user_cv/user_cv_view_details.html', {'cv_html': cv_html})
 
 def user_cv_pdf_view(request, user_cv_id, profile_cv_id):
-    # user_cv = get_object_or_404(User_cv, id=user_cv_id)
-    # profile_cv = get_object_or_404(Profile_CV, id=profile_cv_id)
-    # work_experiences = WorkExperience.objects.filter(profile_user=profile_cv)
-    # academic_educations = AcademicEducation.objects.filter(profile_user=profile_cv)
-    # hard_skills = HardSkillUser.objects.filter(profile_user=profile_cv)
-    # soft_skills = SoftSkillUser.objects.filter(profile_user=profile_cv)
-    # languages = LanguageUser.objects.filter(profile_user=profile_cv)
-    # categories = CategoryUser.objects.filter(profile_user=profile_cv)
-    # sectors = SectorUser.objects.filter(profile_user=profile_cv)
-    # incorporations = IncorporationUser.objects.filter(profile_user=profile_cv)
-    # volunteerings = Volunteering.objects.filter(profile_user=profile_cv)
-    # projects = Project.objects.filter(profile_user=profile_cv)
-    # publications = Publication.objects.filter(profile_user=profile_cv)
-    # recognitions_awards = RecognitionAward.objects.filter(profile_user=profile_cv)
-
-    # context = {
-    #     'user_cv': user_cv,
-    #     'profile_cv': profile_cv,
-    #     'work_experiences': work_experiences,
-    #     'academic_educations': academic_educations,
-    #     'hard_skills': hard_skills,
-    #     'soft_skills': soft_skills,
-    #     'languages': languages,
-    #     'categories': categories,
-    #     'sectors': sectors,
-    #     'incorporations': incorporations,
-    #     'volunteerings': volunteerings,
-    #     'projects': projects,
-    #     'publications': publications,
-    #     'recognitions_awards': recognitions_awards,
-    # }
-
-    # template = get_template('user_cv/user_cv_view_details.html')
-    # html_content = template.render(context)
-
-    # pdf_file = HTML(string=html_content).write_pdf()
-
-    # response = HttpResponse(pdf_file, content_type='application/pdf')
-    # response['Content-Disposition'] = "inline; filename='user_cv.pdf'"
-
-    return response
\ No newline at end of file
+    user_cv = User_cv.objects.filter(id=user_cv_id).values('profile_user_id', 'content_version').first()
+    if user_cv is None or user_cv['profile_user_id'] != profile_cv_id:
+        raise Http404("User_cv does not exist for this profile")
+
+    # El PDF se genera en el pool de procesos (profile_cv/pdf.py) y se reutiliza mientras el contenido no cambie
+    try:
+        path = render_cv_pdf(user_cv_id, user_cv['content_version'])
+    except (PdfBusy, FutureTimeoutError):
+        response = HttpResponse("The PDF is being generated, please try again in a few seconds.", status=503)
+        response['Retry-After'] = '5'
+        return response
+    except Exception:
+        # Fallo de weasyprint o del pool de procesos (que se recrea solo): 503 en lugar de un 500
+        logger.exception("CV PDF generation failed for User_cv %s", user_cv_id)
+        response = HttpResponse("The PDF could not be generated, please try again later.", status=503)
+        response['Retry-After'] = '30'
+        return response
+
+    return ranged_file_response(request, path, f'user_cv_{user_cv_id}.pdf')
+
+@login_required
+def user_cv_pdf_metrics_view(request):
+    # Cola, tiempos de render y aciertos de la caché de PDFs (solo staff)
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'forbidden'}, status=403)
+    return JsonResponse(pdf_metrics())
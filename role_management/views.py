@@ -1,15 +1,12 @@
 from django.shortcuts import redirect, render
 from django.contrib.auth.decorators import login_required
 
+from users.roles import primary_role
+
 @login_required
 def dashboard(request):
-    # Obtén los grupos del usuario
-    user_groups = request.user.groups.all()
-    
-    # Verifica el grupo del usuario
-    user_role = None
-    if user_groups.exists():
-        user_role = user_groups[0].name  # Obtén el nombre del primer grupo asociado al usuario
+    # Grupos del usuario (request.roles, cargados una vez por RolesMiddleware)
+    user_role = primary_role(request.roles)  # Nombre del primer grupo asociado al usuario
     context = {}  # Inicializa el contexto
 
     if user_role == 'premium' or user_role == 'freemium':
@@ -46,8 +43,7 @@ def dashboard(request):
 @login_required
 def teacher_chat(request):
     # Verifica que el usuario tenga el rol de "teacher"
-    user_groups = request.user.groups.all()
-    if not user_groups.filter(name="teacher").exists():
+    if "teacher" not in request.roles:
         # Si el usuario no es un "teacher", redirige o muestra un mensaje de error
         return render(request, 'role_management/access_denied.html', {
             'message': 'You do not have permission to access this page.',
@@ -64,8 +60,7 @@ def teacher_chat(request):
 @login_required
 def headhunter_chat(request):
     # Verifica que el usuario tenga el rol de "teacher"
-    user_groups = request.user.groups.all()
-    if not user_groups.filter(name="headhunter").exists():
+    if "headhunter" not in request.roles:
         # Si el usuario no es un "teacher", redirige o muestra un mensaje de error
         return render(request, 'role_management/access_denied.html', {
             'message': 'You do not have permission to access this page.',
@@ -82,8 +77,7 @@ def headhunter_chat(request):
 @login_required
 def premium_chat(request):
     # Verifica que el usuario tenga el rol de "teacher"
-    user_groups = request.user.groups.all()
-    if not user_groups.filter(name="premium").exists():
+    if "premium" not in request.roles:
         # Si el usuario no es un "premium", redirige o muestra un mensaje de error
         return render(request, 'role_management/access_denied.html', {
             'message': 'You do not have permission to access this page.',
@@ -104,8 +98,7 @@ def teacher_dashboard(request):
 @login_required
 def headhunter_dashboard(request):
     # Verifica que el usuario tenga el rol de "teacher"
-    user_groups = request.user.groups.all()
-    if not user_groups.filter(name="headhunter").exists():
+    if "headhunter" not in request.roles:
         # Si el usuario no es un "teacher", redirige o muestra un mensaje de error
         return render(request, 'role_management/access_denied.html', {
             'message': 'You do not have permission to access this page.',
@@ -123,8 +116,8 @@ def headhunter_dashboard(request):
 @login_required
 def premium_dashboard(request):
     # Verifica que el usuario tenga el rol de "teacher"
-    user_freemium = request.user.groups.filter(name="freemium").exists()
-    user_premium = request.user.groups.filter(name="premium").exists()
+    user_freemium = "freemium" in request.roles
+    user_premium = "premium" in request.roles
     if not user_freemium and not user_premium:
         # Si el usuario no es un "premium", redirige o muestra un mensaje de error
         return render(request, 'role_management/access_denied.html', {
@@ -139,8 +132,7 @@ def premium_dashboard(request):
 @login_required
 def premium_profile(request):
     # Verifica que el usuario tenga el rol de "profile"
-    user_groups = request.user.groups.all()
-    if not user_groups.filter(name="premium").exists():
+    if "premium" not in request.roles:
         # Si el usuario no es un "premium", redirige o muestra un mensaje de error
         return render(request, 'role_management/access_denied.html', {
             'message': 'You do not have permission to access this page.',
@@ -0,0 +1,135 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Q
+
+from search.documents import get_document
+
+# * |--------------------------------------------------------------------------
+# * | Backends de búsqueda
+# * |--------------------------------------------------------------------------
+#
+# SQLiteFTSBackend: índice invertido FTS5 con ranking bm25 (título con más peso).
+# IcontainsBackend: el filtrado de siempre, para bases de datos sin FTS5.
+# Otro backend (p. ej. PostgreSQL) solo tiene que implementar los mismos métodos
+# y configurarse en SEARCH_BACKEND con su ruta completa.
+
+KIND_BITS = 16  # rowid = object_id * KIND_BITS + código del tipo de documento
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+def query_terms(query):
+    return re.findall(r'\w+', (query or '').lower())
+
+
+class IcontainsBackend:
+    ranked = False
+
+    def ensure_index(self):
+        pass
+
+    def index(self, kind, object_id, title, body):
+        pass
+
+    def remove(self, kind, object_id):
+        pass
+
+    def clear(self, kinds=None):
+        pass
+
+    def search_ids(self, kind, query, limit, queryset=None):
+        document = get_document(kind)
+        condition = reduce(or_, (Q(**{f'{lookup}__icontains': query}) for lookup in document.lookups))
+        if queryset is None:
+            queryset = document.model.objects.all()
+        return list(queryset.order_by().filter(condition).values_list('pk', flat=True).distinct()[:limit])
+
+
+class SQLiteFTSBackend:
+    ranked = True
+    table = 'search_index'
+
+    def __init__(self):
+        self._ready = False
+
+    def ensure_index(self):
+        # Crea la tabla virtual la primera vez; si no existía se rellena con todo el contenido actual
+        if self._ready:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.table])
+            exists = cursor.fetchone() is not None
+            if not exists:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {self.table} USING fts5("
+                    "title, body, tokenize = 'unicode61 remove_diacritics 1')"
+                )
+        self._ready = True
+        if not exists:
+            from search.index import rebuild_index
+            rebuild_index()
+
+    def rowid(self, kind, object_id):
+        return object_id * KIND_BITS + get_document(kind).code
+
+    def index(self, kind, object_id, title, body):
+        self.ensure_index()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [self.rowid(kind, object_id)])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, body) VALUES (%s, %s, %s)",
+                [self.rowid(kind, object_id), title, body],
+            )
+
+    def remove(self, kind, object_id):
+        self.ensure_index()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [self.rowid(kind, object_id)])
+
+    def clear(self, kinds=None):
+        # Con kinds solo se borran las filas de esos tipos; el resto del índice sigue igual
+        if kinds:
+            self.ensure_index()
+            with connection.cursor() as cursor:
+                for kind in kinds:
+                    cursor.execute(
+                        f"DELETE FROM {self.table} WHERE rowid %% {KIND_BITS} = %s", [get_document(kind).code]
+                    )
+            return
+        self._ready = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {self.table} USING fts5("
+                "title, body, tokenize = 'unicode61 remove_diacritics 1')"
+            )
+
+    def search_ids(self, kind, query, limit, queryset=None):
+        # Todos los términos deben aparecer (AND) y cada uno admite prefijo: "djan" encuentra "django"
+        terms = query_terms(query)
+        if not terms:
+            return []
+        self.ensure_index()
+        expression = ' '.join(f'"{term}"*' for term in terms)
+        sql = f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s AND rowid %% {KIND_BITS} = %s"
+        params = [expression, get_document(kind).code]
+        if queryset is not None:
+            # Los filtros de la vista (is_active, status...) van en la misma consulta, antes del LIMIT
+            subquery, subquery_params = queryset.order_by().values('pk').query.sql_with_params()
+            sql += f" AND rowid / {KIND_BITS} IN ({subquery})"
+            params.extend(subquery_params)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{sql} ORDER BY bm25({self.table}, {TITLE_WEIGHT}, {BODY_WEIGHT}) LIMIT %s",
+                params + [limit],
+            )
+            return [rowid // KIND_BITS for rowid, in cursor.fetchall()]
+
+
+BACKENDS = {
+    'fts5': SQLiteFTSBackend,
+    'icontains': IcontainsBackend,
+}
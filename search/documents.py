@@ -0,0 +1,64 @@
+from django.apps import apps
+from django.utils.html import strip_tags
+
+# * |--------------------------------------------------------------------------
+# * | Documentos del índice de búsqueda
+# * |--------------------------------------------------------------------------
+#
+# Cada tipo de documento indica de qué modelo sale, cómo se construye su texto
+# (título + cuerpo) y qué campos usa el backend icontains cuando no hay FTS.
+# El código numérico forma parte del rowid del índice FTS, así que no debe cambiar.
+
+
+class SearchDocument:
+    def __init__(self, kind, code, model, text, lookups, prefetch=()):
+        self.kind = kind
+        self.code = code
+        self.model_label = model
+        self.text = text
+        self.lookups = lookups
+        self.prefetch = prefetch
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def queryset(self):
+        return self.model.objects.prefetch_related(*self.prefetch)
+
+
+def course_text(course):
+    skills = ' '.join(skill.name_hard_skill for skill in course.hardskills.all())
+    return course.title, f"{course.description or ''} {skills}"
+
+
+def resource_text(resource):
+    return resource.name, ' '.join(skill.name_hard_skill for skill in resource.hardskill.all())
+
+
+def post_text(post):
+    # El contenido viene de summernote (HTML)
+    return post.title, strip_tags(post.content or '')
+
+
+def topic_text(topic):
+    return topic.title, ' '.join(reply.content for reply in topic.replies.all())
+
+
+DOCUMENTS = {
+    document.kind: document
+    for document in (
+        SearchDocument('course', 1, 'courses.Course', course_text,
+                       ('title', 'description', 'hardskills__name_hard_skill'), ('hardskills',)),
+        SearchDocument('resource', 2, 'courses.Resource', resource_text,
+                       ('name', 'hardskill__name_hard_skill'), ('hardskill',)),
+        SearchDocument('post', 3, 'blog.Post', post_text,
+                       ('title', 'content')),
+        SearchDocument('topic', 4, 'forum.Topic', topic_text,
+                       ('title', 'replies__content'), ('replies',)),
+    )
+}
+
+
+def get_document(kind):
+    return DOCUMENTS[kind]
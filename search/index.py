@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils.module_loading import import_string
+
+from search.backends import BACKENDS
+from search.documents import DOCUMENTS, get_document
+
+# * |--------------------------------------------------------------------------
+# * | Índice de búsqueda
+# * |--------------------------------------------------------------------------
+#
+# SEARCH_BACKEND = 'auto' usa FTS5 en SQLite e icontains en el resto de bases de
+# datos; también acepta 'fts5', 'icontains' o la ruta de una clase propia.
+
+DEFAULT_MAX_RESULTS = 500
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        name = getattr(settings, 'SEARCH_BACKEND', 'auto')
+        if name == 'auto':
+            name = 'fts5' if connection.vendor == 'sqlite' else 'icontains'
+        _backend = BACKENDS[name]() if name in BACKENDS else import_string(name)()
+    return _backend
+
+
+def index_object(kind, object_id):
+    # Reindexa un objeto; si ya no existe se elimina del índice
+    document = get_document(kind)
+    instance = document.queryset().filter(pk=object_id).first()
+    if instance is None:
+        get_backend().remove(kind, object_id)
+        return
+    title, body = document.text(instance)
+    get_backend().index(kind, object_id, title, body)
+
+
+def schedule_index_update(kind, object_ids):
+    # Se indexa al confirmar la transacción, con el estado final de los objetos
+    object_ids = [object_id for object_id in set(object_ids) if object_id is not None]
+    if object_ids:
+        transaction.on_commit(lambda: [index_object(kind, object_id) for object_id in object_ids])
+
+
+@transaction.atomic
+def rebuild_index(kinds=None):
+    backend = get_backend()
+    backend.clear(kinds)
+    total = 0
+    for kind in kinds or DOCUMENTS:
+        document = get_document(kind)
+        for instance in document.queryset().iterator(chunk_size=500):
+            title, body = document.text(instance)
+            backend.index(kind, instance.pk, title, body)
+            total += 1
+    return total
+
+
+def search_ids(kind, query, limit=None, queryset=None):
+    # Con queryset, el límite se aplica a los resultados que ya cumplen sus filtros
+    limit = limit or getattr(settings, 'SEARCH_MAX_RESULTS', DEFAULT_MAX_RESULTS)
+    return get_backend().search_ids(kind, query, limit, queryset=queryset)
+
+
+def search_queryset(kind, queryset, query):
+    # Filtra el queryset por la búsqueda y lo ordena por relevancia (anotación search_rank, 0 = más relevante)
+    if not query:
+        return queryset
+    ids = search_ids(kind, query, queryset=queryset)
+    if not ids or not get_backend().ranked:
+        relevance = Value(0, output_field=IntegerField())
+    else:
+        relevance = Case(*[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(pk__in=ids).annotate(search_rank=relevance).order_by('search_rank', 'pk')
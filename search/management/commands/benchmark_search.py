@@ -0,0 +1,85 @@
+import random
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from search.documents import DOCUMENTS, get_document
+from search.index import search_queryset
+
+
+def synthetic_documents(n_documents, vocabulary, seed):
+    rng = random.Random(seed)
+    for _ in range(n_documents):
+        yield ' '.join(rng.choices(vocabulary, k=6)), ' '.join(rng.choices(vocabulary, k=120))
+
+
+def timed(run, queries):
+    started = time.perf_counter()
+    for query in queries:
+        run(query)
+    return (time.perf_counter() - started) / len(queries)
+
+
+class Command(BaseCommand):
+    help = "Latency of the FTS5 index against the icontains (LIKE '%term%') scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--live',
+            nargs='+',
+            metavar='TERM',
+            help="Also time the real search (ORM icontains vs search index) for every document type with these terms.",
+        )
+
+    def synthetic(self, options):
+        rng = random.Random(options['seed'])
+        vocabulary = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(4, 10))) for _ in range(20000)]
+        queries = rng.choices(vocabulary, k=options['queries'])
+
+        self.stdout.write(f"{'documents':>10} | {'icontains':>10} | {'fts5':>10} | speedup")
+        for n_documents in options['documents']:
+            db = sqlite3.connect(':memory:')
+            db.execute("CREATE TABLE docs (id INTEGER PRIMARY KEY, title TEXT, body TEXT)")
+            db.execute("CREATE VIRTUAL TABLE docs_index USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 1')")
+            documents = list(synthetic_documents(n_documents, vocabulary, options['seed']))
+            db.executemany("INSERT INTO docs (title, body) VALUES (?, ?)", documents)
+            db.execute("INSERT INTO docs_index (rowid, title, body) SELECT id, title, body FROM docs")
+
+            like = timed(lambda term: db.execute(
+                "SELECT id FROM docs WHERE title LIKE ? OR body LIKE ? LIMIT ?",
+                (f'%{term}%', f'%{term}%', options['limit']),
+            ).fetchall(), queries)
+            fts = timed(lambda term: db.execute(
+                "SELECT rowid FROM docs_index WHERE docs_index MATCH ? ORDER BY bm25(docs_index, 10.0, 1.0) LIMIT ?",
+                (f'"{term}"*', options['limit']),
+            ).fetchall(), queries)
+            self.stdout.write(f"{n_documents:>10} | {like * 1000:>8.2f}ms | {fts * 1000:>8.2f}ms | {like / fts:>6.1f}x")
+            db.close()
+
+    def live(self, terms):
+        self.stdout.write(f"\n{'kind':>10} | {'icontains':>10} | {'index':>10}")
+        for kind in DOCUMENTS:
+            document = get_document(kind)
+            model = document.model
+
+            def icontains(term):
+                condition = Q()
+                for lookup in document.lookups:
+                    condition |= Q(**{f'{lookup}__icontains': term})
+                return list(model.objects.filter(condition).distinct().values_list('pk', flat=True))
+
+            def indexed(term):
+                return list(search_queryset(kind, model.objects.all(), term).values_list('pk', flat=True))
+
+            self.stdout.write(f"{kind:>10} | {timed(icontains, terms) * 1000:>8.2f}ms | {timed(indexed, terms) * 1000:>8.2f}ms")
+
+    def handle(self, *args, **options):
+        self.synthetic(options)
+        if options['live']:
+            self.live(options['live'])
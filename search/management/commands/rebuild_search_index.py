@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from search.documents import DOCUMENTS
+from search.index import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from the indexed models"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', nargs='+', choices=sorted(DOCUMENTS), help="Only reindex these document types.")
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        total = rebuild_index(options['kind'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} document(s) with {type(backend).__name__}."))
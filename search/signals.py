@@ -0,0 +1,63 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from blog.models import Post
+from courses.models import Course, Resource
+from forum.models import Reply, Topic
+from profile_cv.models import HardSkill
+from search.index import schedule_index_update
+
+# * |--------------------------------------------------------------------------
+# * | Actualización incremental del índice de búsqueda
+# * |--------------------------------------------------------------------------
+
+INDEXED_MODELS = {
+    Course: 'course',
+    Resource: 'resource',
+    Post: 'post',
+    Topic: 'topic',
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def update_document(sender, instance, **kwargs):
+    kind = INDEXED_MODELS.get(sender)
+    if kind:
+        schedule_index_update(kind, [instance.pk])
+
+
+@receiver(post_save, sender=Reply)
+@receiver(post_delete, sender=Reply)
+def update_topic_replies(sender, instance, **kwargs):
+    # El texto de las respuestas forma parte del documento del topic
+    schedule_index_update('topic', [instance.topic_id])
+
+
+def update_hardskill_relation(kind, related_ids, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            schedule_index_update(kind, [instance.pk])
+    elif action in ('post_add', 'post_remove') and pk_set:
+        schedule_index_update(kind, pk_set)
+    elif action == 'pre_clear':
+        # hardskill.course_set.clear(): los documentos afectados solo se conocen antes de borrar las filas
+        schedule_index_update(kind, related_ids(instance))
+
+
+@receiver(m2m_changed, sender=Course.hardskills.through)
+def update_course_hardskills(sender, **kwargs):
+    update_hardskill_relation('course', lambda skill: skill.course_set.values_list('id', flat=True), **kwargs)
+
+
+@receiver(m2m_changed, sender=Resource.hardskill.through)
+def update_resource_hardskills(sender, **kwargs):
+    update_hardskill_relation('resource', lambda skill: skill.hardskills.values_list('id', flat=True), **kwargs)
+
+
+@receiver(post_save, sender=HardSkill)
+@receiver(pre_delete, sender=HardSkill)
+def update_hardskill_documents(sender, instance, **kwargs):
+    # Un cambio de nombre (o el borrado) de la hardskill afecta a los cursos y recursos que la usan
+    schedule_index_update('course', instance.course_set.values_list('id', flat=True))
+    schedule_index_update('resource', instance.hardskills.values_list('id', flat=True))
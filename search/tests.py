@@ -0,0 +1,40 @@
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from blog.models import Post
+from forum.models import Reply, Topic
+from search.backends import SQLiteFTSBackend
+from search.index import get_backend, rebuild_index, search_ids
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "The FTS5 index needs SQLite")
+class RebuildIndexTests(TestCase):
+
+    def setUp(self):
+        if not isinstance(get_backend(), SQLiteFTSBackend):
+            self.skipTest("SEARCH_BACKEND is not fts5")
+        user = User.objects.create_user('search-test', password='search-test')
+        self.post = Post.objects.create(title="Zebra crossing", slug='zebra', author=user, content="<p>stripes</p>")
+        self.topic = Topic.objects.create(title="Giraffe questions", creator=user)
+        Reply.objects.create(topic=self.topic, content="long necks", creator=user)
+        rebuild_index()
+
+    def test_rebuilding_one_kind_keeps_the_others(self):
+        self.assertEqual(search_ids('post', 'zebra'), [self.post.pk])
+
+        rebuild_index(['course'])
+
+        self.assertEqual(search_ids('post', 'zebra'), [self.post.pk])
+        self.assertEqual(search_ids('topic', 'necks'), [self.topic.pk])
+
+    def test_rebuilding_one_kind_replaces_its_rows(self):
+        Post.objects.filter(pk=self.post.pk).update(title="Okapi crossing")
+
+        rebuild_index(['post'])
+
+        self.assertEqual(search_ids('post', 'zebra'), [])
+        self.assertEqual(search_ids('post', 'okapi'), [self.post.pk])
+        self.assertEqual(search_ids('topic', 'giraffe'), [self.topic.pk])
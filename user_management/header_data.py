@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from messaging.counters import refresh_unread_count
+
+# * |--------------------------------------------------------------------------
+# * | Datos de la cabecera (DuckyCoins y mensajes no leídos)
+# * |--------------------------------------------------------------------------
+#
+# Los context processors de gaming y messaging no consultan nada: pasan a la plantilla
+# funciones y Django solo las llama si la plantilla lee la variable. La primera lectura
+# carga los dos valores con una sola consulta (saldo de DuckyCoin y contador de
+# messaging.MessageCounter), se guardan en la petición para los siguientes renders y en
+# la caché por usuario durante HEADER_DATA_CACHE_TTL segundos. Las señales de gaming y
+# messaging borran la entrada de la caché cuando cambian el saldo o el contador.
+
+DEFAULT_HEADER_DATA_TTL = 30
+ANONYMOUS_HEADER_DATA = {'duckycoins': None, 'unread_messages_count': 0}
+
+
+def header_cache_key(user_id):
+    return f'header_data:{user_id}'
+
+
+def invalidate_header_data(user_id):
+    cache.delete(header_cache_key(user_id))
+
+
+def load_header_data(user_id):
+    row = (
+        User.objects.filter(pk=user_id)
+        .values('duckycoins__balance', 'message_counter__unread_count')
+        .first()
+    ) or {}
+    unread_count = row.get('message_counter__unread_count')
+    if unread_count is None:
+        # Usuario sin fila de contador todavía
+        unread_count = refresh_unread_count(user_id)
+    return {
+        'duckycoins': row.get('duckycoins__balance') or 0,
+        'unread_messages_count': unread_count,
+    }
+
+
+def get_header_data(request):
+    if not hasattr(request, '_header_data'):
+        user = request.user
+        if not user.is_authenticated:
+            request._header_data = ANONYMOUS_HEADER_DATA
+        else:
+            key = header_cache_key(user.pk)
+            data = cache.get(key)
+            if data is None:
+                data = load_header_data(user.pk)
+                cache.set(key, data, getattr(settings, 'HEADER_DATA_CACHE_TTL', DEFAULT_HEADER_DATA_TTL))
+            request._header_data = data
+    return request._header_data
+
+
+def lazy_header_value(request, name):
+    # Las plantillas llaman a los callables al resolver la variable
+    return lambda: get_header_data(request)[name]
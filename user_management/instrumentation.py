@@ -0,0 +1,178 @@
+import contextvars
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends import django as django_backend
+
+logger = logging.getLogger(__name__)
+
+# * |--------------------------------------------------------------------------
+# * | Instrumentación de peticiones (consultas SQL, tiempos y presupuestos)
+# * |--------------------------------------------------------------------------
+#
+# QueryInstrumentationMiddleware cuenta las consultas de cada petición con
+# connection.execute_wrapper (no necesita DEBUG ni debug_toolbar), su tiempo total,
+# las consultas repetidas (misma SQL con distintos parámetros, el patrón de un N+1)
+# y el tiempo de render de las plantillas. Con DEBUG se devuelven como cabeceras
+# X-Query-*; en producción se escribe una línea JSON en el logger
+# user_management.instrumentation.
+#
+# Cada vista puede tener un presupuesto de consultas: QUERY_BUDGETS en settings
+# (por nombre de URL, p. ej. 'courses:courses-list') o el decorador @query_budget(n).
+# Si se supera se registra un warning y, con QUERY_BUDGET_STRICT (activo al ejecutar
+# los tests), se lanza QueryBudgetExceeded para que el test falle.
+
+IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+WHITESPACE = re.compile(r'\s+')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries):
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def fingerprint(sql):
+    # Los parámetros ya vienen separados (%s); solo se normalizan las listas IN y los espacios
+    return WHITESPACE.sub(' ', IN_LIST.sub('IN (...)', sql)).strip()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.query_time = 0.0
+        self.render_time = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - started
+            self.query_count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+    def as_dict(self, top_duplicates=5):
+        return {
+            'queries': self.query_count,
+            'sql_ms': round(self.query_time * 1000, 2),
+            'render_ms': round(self.render_time * 1000, 2),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'duplicate_queries': sum(count - 1 for _, count in self.duplicates()),
+            'duplicates': [
+                {'fingerprint': short_hash(sql), 'count': count, 'sql': sql[:200]}
+                for sql, count in self.duplicates()[:top_duplicates]
+            ],
+        }
+
+
+def short_hash(sql):
+    return hashlib.sha1(sql.encode()).hexdigest()[:10]
+
+
+_original_render = django_backend.Template.render
+
+
+def _timed_render(self, context=None, request=None):
+    metrics = _current.get()
+    if metrics is None:
+        return _original_render(self, context, request)
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        metrics.render_time += time.perf_counter() - started
+
+
+def install_render_timer():
+    # Mide render()/render_to_string (backend de plantillas de Django); los {% include %} quedan dentro
+    django_backend.Template.render = _timed_render
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'INSTRUMENTATION_ENABLED', True)
+        self.headers = getattr(settings, 'INSTRUMENTATION_HEADERS', settings.DEBUG)
+        self.log = getattr(settings, 'INSTRUMENTATION_LOG', not settings.DEBUG)
+        self.budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        if self.enabled:
+            install_render_timer()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        view_name, budget = self.budget_for(request)
+        data = metrics.as_dict()
+        over_budget = budget is not None and metrics.query_count > budget
+
+        if self.headers:
+            response['X-Query-Count'] = str(data['queries'])
+            response['X-Query-Time-Ms'] = str(data['sql_ms'])
+            response['X-Render-Time-Ms'] = str(data['render_ms'])
+            response['X-Response-Time-Ms'] = str(data['total_ms'])
+            response['X-Duplicate-Queries'] = str(data['duplicate_queries'])
+            if data['duplicates']:
+                response['X-Duplicate-Query-Fingerprints'] = ','.join(
+                    f"{duplicate['fingerprint']}x{duplicate['count']}" for duplicate in data['duplicates']
+                )
+            if budget is not None:
+                response['X-Query-Budget'] = str(budget)
+
+        if self.log or over_budget:
+            record = {
+                'method': request.method,
+                'path': request.path,
+                'view': view_name,
+                'status': response.status_code,
+                'budget': budget,
+                **data,
+            }
+            logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps(record))
+
+        if over_budget and self.strict:
+            duplicates = '\n'.join(f"  {count}x {sql[:200]}" for sql, count in metrics.duplicates()[:5])
+            raise QueryBudgetExceeded(
+                f"{view_name} ran {metrics.query_count} queries (budget {budget}).\n{duplicates}".rstrip()
+            )
+        return response
+
+    def budget_for(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return None, None
+        budget = getattr(match.func, 'query_budget', None)
+        if budget is None:
+            budget = self.budgets.get(match.view_name)
+        return match.view_name, budget
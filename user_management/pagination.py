@@ -0,0 +1,173 @@
+import base64
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+# * |--------------------------------------------------------------------------
+# * | Paginación por cursor (keyset)
+# * |--------------------------------------------------------------------------
+#
+# En lugar de COUNT(*) + OFFSET, cada página se pide con una condición sobre la
+# clave de ordenación de la última fila vista, p. ej. (created_on, id) < (c, i).
+# El coste no crece al avanzar páginas y no hay consulta de conteo. El cursor es
+# opaco (base64 de los valores de la clave y la dirección).
+#
+# La ordenación debe terminar en una columna única (normalmente 'id') para que
+# la clave identifique una sola fila.
+
+CURSOR_PARAM = 'cursor'
+
+
+def _dump_value(value):
+    # Los datetime se guardan con microsegundos completos para que la igualdad de la clave sea exacta
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values, forward=True):
+    payload = json.dumps({'v': [_dump_value(value) for value in values], 'f': forward}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    # Devuelve (valores, forward) o None si el cursor no es válido
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return list(payload['v']), bool(payload['f'])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def parse_ordering(ordering):
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def reverse_ordering(ordering):
+    return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+
+def keyset_condition(ordering, values, forward):
+    # (a, b) después de (va, vb) == a > va OR (a = va AND b > vb), con el sentido de cada campo
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(parse_ordering(ordering), values):
+        lookup = 'lt' if descending == forward else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+class CursorPage:
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor, params, cursor_param):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._params = params
+        self.cursor_param = cursor_param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def query_for(self, cursor):
+        # Querystring con el resto de filtros del request y el cursor sustituido
+        params = self._params.copy()
+        params.pop('page', None)
+        params[self.cursor_param] = cursor
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        return self.query_for(self.next_cursor) if self.next_cursor else ''
+
+    @property
+    def previous_query(self):
+        return self.query_for(self.previous_cursor) if self.previous_cursor else ''
+
+
+class CursorPaginator:
+    def __init__(self, queryset, per_page, ordering=('-id',), cursor_param=CURSOR_PARAM):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.cursor_param = cursor_param
+
+    def cursor_values(self, cursor):
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None or len(decoded[0]) != len(self.ordering):
+            return None, True
+        values, forward = decoded
+        model = self.queryset.model
+        try:
+            # Campos del modelo: se convierten al tipo de Python (fechas, decimales...); las anotaciones se usan tal cual
+            values = [
+                model._meta.get_field(name).to_python(value) if self._is_model_field(name) else value
+                for (name, _), value in zip(parse_ordering(self.ordering), values)
+            ]
+        except ValidationError:
+            return None, True
+        return values, forward
+
+    def _is_model_field(self, name):
+        try:
+            self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    def row_values(self, row):
+        return [getattr(row, name) for name, _ in parse_ordering(self.ordering)]
+
+    def page(self, params):
+        values, forward = self.cursor_values(params.get(self.cursor_param))
+        queryset = self.queryset.order_by(*(self.ordering if forward else reverse_ordering(self.ordering)))
+        if values is not None:
+            queryset = queryset.filter(keyset_condition(self.ordering, values, forward))
+
+        # Una fila de más para saber si hay otra página sin hacer COUNT
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        has_next = has_more if forward else values is not None
+        has_previous = values is not None if forward else has_more
+        next_cursor = encode_cursor(self.row_values(rows[-1])) if has_next and rows else None
+        previous_cursor = encode_cursor(self.row_values(rows[0]), forward=False) if has_previous and rows else None
+        return CursorPage(rows, has_next, has_previous, next_cursor, previous_cursor, params, self.cursor_param)
+
+
+def paginate_by_cursor(request, queryset, per_page, ordering=('-id',)):
+    return CursorPaginator(queryset, per_page, ordering).page(request.GET)
+
+
+class CursorPaginationMixin:
+    # Para ListView: sustituye Paginator por CursorPaginator (page_obj es un CursorPage, paginator es None)
+    cursor_ordering = ('-id',)
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        page = CursorPaginator(queryset, page_size, self.get_cursor_ordering()).page(self.request.GET)
+        return None, page, page.object_list, page.has_other_pages()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # To keep secret keys in environment variables
@@ -47,6 +48,82 @@ SUMMERNOTE_CONFIG = {
     ],
 }
 
+# Pesos de cada señal en la matriz de interacciones del recomendador de cursos (courses/recommendations.py)
+COURSE_INTERACTION_WEIGHTS = {
+    'wishlist': 1.0,
+    'enrolled': 2.0,
+    'completed': 3.0,
+    'lesson_progress': 2.0,
+    'rating': 0.5,
+}
+
+# Índices de vecinos aproximados del recomendador (courses/ann.py): 'ivf' (NumPy), 'exact' o 'hnsw' (requiere hnswlib)
+COURSE_ANN_BACKEND = 'ivf'
+COURSE_ANN_INDEX_DIR = BASE_DIR / 'courses' / 'ann_index'
+
+# Micro-batching del chatbot: tamaño máximo del lote, espera máxima para juntar mensajes concurrentes
+# y segundos que un mensaje espera su predicción antes de responder que el chatbot está ocupado
+CHATBOT_BATCH_MAX_SIZE = 32
+CHATBOT_BATCH_MAX_WAIT_MS = 5
+CHATBOT_BATCH_TIMEOUT_SECONDS = 10
+
+# Caché de tags del chatbot por mensaje preprocesado: número máximo de entradas y caducidad en segundos
+CHATBOT_CACHE_MAX_SIZE = 1024
+CHATBOT_CACHE_TTL = 3600
+
+# Pool de inferencia del chatbot por websocket: hilos y máximo de peticiones pendientes antes de responder "ocupado"
+CHATBOT_EXECUTOR_WORKERS = 4
+CHATBOT_EXECUTOR_MAX_PENDING = 64
+
+# Lecciones completadas: se escriben por lotes cada LESSON_COMPLETION_FLUSH_INTERVAL_MS (False = escritura inmediata)
+LESSON_COMPLETION_BUFFERED = True
+LESSON_COMPLETION_FLUSH_INTERVAL_MS = 500
+LESSON_COMPLETION_MAX_PENDING = 1000
+
+# Segundos que request.roles puede reutilizar los grupos guardados en la sesión (solo con una caché
+# compartida entre procesos en CACHES; con la caché local se cargan en cada petición, users/roles.py)
+ROLES_CACHE_TTL = 300
+
+# Segundos que se cachean por usuario los DuckyCoins y los mensajes no leídos de la cabecera
+HEADER_DATA_CACHE_TTL = 30
+
+# Instrumentación (user_management/instrumentation.py): cabeceras X-Query-* con DEBUG y log JSON en producción
+INSTRUMENTATION_ENABLED = True
+INSTRUMENTATION_HEADERS = DEBUG
+INSTRUMENTATION_LOG = not DEBUG
+
+# Máximo de consultas SQL por vista (nombre de URL). Al superarse se registra un warning;
+# al ejecutar los tests (QUERY_BUDGET_STRICT) la petición falla con QueryBudgetExceeded.
+QUERY_BUDGETS = {
+    'courses:courses-list': 12,
+    'courses:course-detail': 15,
+    'courses:teacher-course-list': 12,
+    'courses:resources-list': 12,
+    'courses:course-user-list': 12,
+    'user_cv_view_details': 20,
+    'user_cv_create': 40,
+    'user_cv_update': 40,
+}
+QUERY_BUDGET_STRICT = sys.argv[1:2] == ['test']
+
+# HTML renderizado de los CV (profile_cv/snapshots.py): segundos en caché y carpeta de la exportación de prerender_cvs
+CV_SNAPSHOT_TTL = 60 * 60 * 24
+CV_SNAPSHOT_DIR = os.path.join(BASE_DIR, 'cv_snapshots')
+
+# PDF de los CV (profile_cv/pdf.py): procesos de weasyprint, PDFs en cola como máximo, espera de la petición y carpeta de PDFs
+CV_PDF_WORKERS = 2
+CV_PDF_MAX_PENDING = 16
+CV_PDF_TIMEOUT = 60
+CV_PDF_DIR = os.path.join(BASE_DIR, 'cv_pdfs')
+CV_PDF_MAX_AGE_DAYS = 30  # prerender_cvs y prune_cv_pdfs borran los PDF que llevan más días sin usarse
+
+# Búsqueda: 'auto' (FTS5 en SQLite, icontains en otras bases de datos), 'fts5', 'icontains' o ruta a un backend propio
+SEARCH_BACKEND = 'auto'
+SEARCH_MAX_RESULTS = 500
+
+# Backend del chatbot: 'numpy' (exportado con courses/chatbot/export_numpy.py), 'keras' o 'auto' (numpy si existe)
+CHATBOT_BACKEND = 'auto'
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -56,6 +133,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'channels',
     'users.apps.UserConfig',
     'social_django',
     "blog",
@@ -69,26 +147,36 @@ INSTALLED_APPS = [
     "gaming",
     "messaging",
     "forum",
+    "search",
 ]
 
-ASGI_APPLICATION = 'chat_project.asgi.application'
+ASGI_APPLICATION = 'user_management.asgi.application'
 
-# Configuración de Channels
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        'CONFIG': {
-            "hosts": [("127.0.0.1", 6379)],  # Asegúrate de que Redis esté corriendo
+# Configuración de Channels: Redis por defecto; CHANNEL_LAYER_BACKEND=memory para desarrollo y tests sin Redis
+if os.getenv('CHANNEL_LAYER_BACKEND') == 'memory':
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
         },
-    },
-}
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                "hosts": [("127.0.0.1", 6379)],  # Asegúrate de que Redis esté corriendo
+            },
+        },
+    }
 
 MIDDLEWARE = [
+    'user_management.instrumentation.QueryInstrumentationMiddleware',  # Consultas SQL y tiempos por petición
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.RolesMiddleware',  # request.roles (grupos del usuario, cacheados en sesión)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'users.middleware.Custom404Middleware',  # Middleware personalizado
@@ -208,3 +296,14 @@ SESSION_COOKIE_AGE = 60 * 60 * 24 * 30
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'user_management.instrumentation': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import ResolverMatch
+
+from user_management.instrumentation import QueryBudgetExceeded, QueryInstrumentationMiddleware, query_budget
+
+
+def run_queries(count):
+    def view(request):
+        with connection.cursor() as cursor:
+            for _ in range(count):
+                cursor.execute("SELECT 1")
+        return HttpResponse()
+    return view
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True, INSTRUMENTATION_LOG=False, INSTRUMENTATION_HEADERS=True)
+class QueryBudgetTests(TestCase):
+
+    def get(self, view, view_name='budget-test'):
+        request = RequestFactory().get('/')
+
+        def get_response(request):
+            request.resolver_match = ResolverMatch(view, (), {}, url_name=view_name)
+            return view(request)
+
+        return QueryInstrumentationMiddleware(get_response)(request)
+
+    def test_budgets_are_strict_under_manage_py_test(self):
+        self.assertTrue(settings.QUERY_BUDGET_STRICT)
+
+    @override_settings(QUERY_BUDGETS={'budget-test': 2})
+    def test_settings_budget_fails_when_exceeded(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.get(run_queries(3))
+
+    @override_settings(QUERY_BUDGETS={'budget-test': 3})
+    def test_settings_budget_passes_within_limit(self):
+        response = self.get(run_queries(3))
+        self.assertEqual(response['X-Query-Count'], '3')
+        self.assertEqual(response['X-Query-Budget'], '3')
+
+    @override_settings(QUERY_BUDGETS={'budget-test': 10})
+    def test_decorator_budget_takes_precedence(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.get(query_budget(1)(run_queries(2)))
+
+    @override_settings(QUERY_BUDGETS={'budget-test': 2}, QUERY_BUDGET_STRICT=False)
+    def test_budget_only_logs_when_not_strict(self):
+        with self.assertLogs('user_management.instrumentation', level='WARNING'):
+            response = self.get(run_queries(3))
+        self.assertEqual(response.status_code, 200)
@@ -11,7 +11,10 @@ from users.views import custom_logout,CustomLoginView, ResetPasswordView, Change
 from users.forms import LoginForm
 
 # from django.contrib.sitemaps.views import sitemap
-import debug_toolbar
+try:
+    import debug_toolbar
+except ImportError:  # Opcional: la instrumentación propia (user_management/instrumentation.py) no lo necesita
+    debug_toolbar = None
 from django.conf.urls import handler404
 from users.views import custom_404_view
 from django.urls import re_path
@@ -48,7 +51,6 @@ urlpatterns = [
 
     path("blog/", include("blog.urls"), name="blog-urls"),
     re_path(r"^summernote/", include("django_summernote.urls")),
-    path('__debug__/', include(debug_toolbar.urls)),
     path('', include('courses.urls')),
 #     path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="sitemap"),
 
@@ -65,3 +67,6 @@ urlpatterns = [
 
 
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if debug_toolbar is not None:
+    urlpatterns.insert(0, path('__debug__/', include(debug_toolbar.urls)))
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'user_management.settings')
 
 application = get_wsgi_application()
+
+# Cargar y calentar el modelo del chatbot una sola vez por worker
+from courses.chatbot_runtime import warm_chatbot_runtime  # noqa: E402
+
+warm_chatbot_runtime()
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from users.roles import SESSION_KEY
+
+DEFAULT_URLS = [
+    '/role/',
+    '/role/premium_dashboard/',
+    '/role/headhunter_dashboard/',
+    '/role/teacher_chat/',
+    '/teacher/courses/',
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    group_queries = sum('"auth_group"' in query['sql'] for query in context.captured_queries)
+    return response.status_code, len(context.captured_queries), group_queries
+
+
+class Command(BaseCommand):
+    help = "Queries per request (total and auth_group) with a cold and a warm request.roles session cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--urls', nargs='+', default=DEFAULT_URLS)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+
+        self.stdout.write(f"{'url':>40} | {'status':>6} | {'cold':>11} | {'warm':>11}")
+        # Las sesiones y lo que escriban las vistas se deshace al terminar
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+                client = Client()
+                client.force_login(user)
+                for url in options['urls']:
+                    session = client.session
+                    session.pop(SESSION_KEY, None)
+                    session.save()
+                    status, cold_total, cold_groups = count_queries(client, url)
+                    _, warm_total, warm_groups = count_queries(client, url)
+                    self.stdout.write(
+                        f"{url:>40} | {status:>6} | {cold_total:>4} ({cold_groups} grp) | {warm_total:>4} ({warm_groups} grp)"
+                    )
+                raise Rollback()
+        except Rollback:
+            pass
@@ -2,6 +2,9 @@ from django.shortcuts import redirect
 from django.urls import resolve, reverse
 from django.http import HttpResponseNotFound
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from users.roles import get_request_roles
 
 class Custom404Middleware(MiddlewareMixin):
     def process_response(self, request, response):
@@ -11,3 +14,9 @@ class Custom404Middleware(MiddlewareMixin):
             from users.views import pre_404_view
             return pre_404_view(request)
         return response
+
+
+class RolesMiddleware(MiddlewareMixin):
+    # request.roles se carga la primera vez que se usa (una vez por petición; en la sesión si hay caché compartida)
+    def process_request(self, request):
+        request.roles = SimpleLazyObject(lambda: get_request_roles(request))
@@ -0,0 +1,88 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# * |--------------------------------------------------------------------------
+# * | Roles (grupos) del usuario
+# * |--------------------------------------------------------------------------
+#
+# RolesMiddleware expone request.roles: la tupla de nombres de grupo del usuario,
+# en el orden de los grupos (id), cargada como mucho una vez por petición.
+#
+# Con una caché compartida entre procesos (Redis, Memcached, base de datos...) los
+# roles se guardan además en la sesión junto con un token de versión del usuario
+# que vive en esa caché: una petición con la sesión al día no hace ninguna consulta.
+# Los cambios de grupos (users/signals.py) borran el token y la sesión se recarga.
+# Con la caché local por proceso (la de por defecto) no hay forma de invalidar las
+# sesiones desde otro worker, así que no se guardan en la sesión.
+
+SESSION_KEY = '_roles'
+DEFAULT_ROLES_TTL = 300
+
+
+def user_version_key(user_id):
+    return f'roles_version:{user_id}'
+
+
+def shared_cache():
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def current_version(user_id):
+    # Token de la versión actual; si no existe (invalidado o expulsado de la caché) se crea uno nuevo
+    key = user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_user_roles(user_ids):
+    if shared_cache():
+        cache.delete_many([user_version_key(user_id) for user_id in user_ids])
+
+
+def invalidate_group_roles(group):
+    # Todos los miembros del grupo (renombrar o borrar un grupo, group.user_set.clear())
+    if shared_cache():
+        invalidate_user_roles(group.user_set.values_list('id', flat=True))
+
+
+def load_roles(user):
+    return tuple(user.groups.order_by('id').values_list('name', flat=True))
+
+
+def get_request_roles(request):
+    user = request.user
+    if not user.is_authenticated:
+        return ()
+    if not shared_cache():
+        return load_roles(user)
+
+    version = current_version(user.pk)
+    cached = request.session.get(SESSION_KEY)
+    if (
+        cached
+        and cached['user'] == user.pk
+        and cached['version'] == version
+        and cached['loaded_at'] + getattr(settings, 'ROLES_CACHE_TTL', DEFAULT_ROLES_TTL) > time.time()
+    ):
+        return tuple(cached['roles'])
+
+    roles = load_roles(user)
+    request.session[SESSION_KEY] = {
+        'user': user.pk,
+        'roles': list(roles),
+        'version': version,
+        'loaded_at': time.time(),
+    }
+    return roles
+
+
+def primary_role(roles):
+    return roles[0] if roles else None
@@ -1,8 +1,9 @@
-from django.db.models.signals import post_save
-from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.contrib.auth.models import Group, User
 from django.dispatch import receiver
 
 from .models import Profile
+from .roles import invalidate_group_roles, invalidate_user_roles
 
 
 @receiver(post_save, sender=User)
@@ -15,3 +16,25 @@ def create_profile(sender, instance, created, **kwargs):
 def save_profile(sender, instance, **kwargs):
     instance.profile.save()
 
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_user_roles([instance.pk])
+    elif action in ('post_add', 'post_remove') and pk_set:
+        invalidate_user_roles(pk_set)
+    elif action == 'pre_clear':
+        # group.user_set.clear(): los miembros solo se conocen antes de borrar las filas
+        invalidate_group_roles(instance)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_roles_on_group_rename(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_group_roles(instance)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_roles_on_group_delete(sender, instance, **kwargs):
+    invalidate_group_roles(instance)
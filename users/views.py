@@ -7,7 +7,6 @@ from django.views import View
 from django.contrib.auth.decorators import login_required
 from blog.models import Post
 from courses.models import Course
-from gaming.models import DuckyCoin
 from .forms import RegisterForm, LoginForm, UpdateUserForm, UpdateProfileForm
 
 from django.contrib.auth import logout
@@ -41,20 +40,12 @@ def home(request):
     posts3MaxLike = Post.objects.filter(status=1).order_by('-likes')[:3]  # Limitar a los 3 primeros
     courses  = Course.objects.filter(is_active=True).order_by('-title') 
     courses  = Course.objects.all()
-    # Inicializa la variable para evitar el error
-    user_duckycoins = None
-
-    if request.user.is_authenticated:
-        try:
-            user_duckycoins = request.user.duckycoins.balance
-        except DuckyCoin.DoesNotExist:
-            user_duckycoins = 0  # Valor predeterminado si no tiene DuckyCoins
+    # user_duckycoins lo aporta el context processor de gaming (solo se consulta si la plantilla lo usa)
 
     return render(request, 'users/home.html', {
         'latest_post': latest_post,
         'posts3MaxLike': posts3MaxLike,
         'courses':courses,
-        'user_duckycoins': user_duckycoins,
     })
     
 